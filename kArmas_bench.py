@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+kArmas_bench
+Offline benchmark suite for the kArmas tools.
+Starts a local mock server that emulates every site in the registry
+(profiles, 404s, not-found pages, 429s, redirects, email reset endpoints,
+reputation API) plus a synthetic page graph for the scraper, then runs each
+tool/mode in its own process and reports throughput, p50/p99 latency,
+CPU time and peak RSS. Results are JSON so runs can be diffed.
+Made in l0v3 by kArmasec
+
+  python kArmas_bench.py                         # everything, default profile
+  python kArmas_bench.py --tools username --latency 80 --p429 0.05
+  python kArmas_bench.py -o new.json --compare old.json
+  python kArmas_bench.py --tools links --body-size 262144    # link extraction only, no server
+  python kArmas_bench.py --tools startup       # import time per entry point, exits 1 over budget
+"""
+
+import argparse
+import asyncio
+import gzip
+import importlib.util
+import io
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+MODES = {
+    "ultimate": ("single", "batch", "batch-pool", "sharded"),
+    "username": ("serial", "parallel"),
+    "scraper":  ("serial", "async", "async-pool"),
+    "links":    ("bs4", "html.parser") + (("lxml",) if importlib.util.find_spec("lxml") else ()),
+    "startup":  ("ultimate", "username", "scraper", "dns"),
+}
+PARSE_WORKERS = 2      # processes for the *-pool modes and the sharded job-queue workers
+# Entry point modules and their `python -X importtime` budget (ms, median, interpreter + site excluded).
+# Heavy dependencies a run may not need (aiohttp for --help, multiprocessing without a
+# parse pool) must be imported lazily to stay inside these.
+STARTUP_MODULES = {"ultimate": "kArmas_ultimate_osint", "username": "kArmas_usernameOSAINT",
+                   "scraper": "kArmasec_scraper", "dns": "kArmas_dns"}
+STARTUP_BUDGET_MS = {"ultimate": 120, "username": 200, "scraper": 200, "dns": 80}
+STARTUP_RUNS = 7
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+SITEMAP_LASTMOD = "2024-01-01"
+FILLER = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+TOPICS = ("alpha bravo charlie delta echo foxtrot golf hotel india juliett kilo lima mike november oscar "
+          "papa quebec romeo sierra tango uniform victor whiskey xray yankee zulu").split()
+
+
+# ─── Mock server ─────────────────────────────────────────────
+class MockConfig:
+    def __init__(self, latency=20.0, jitter=5.0, p404=0.3, p_notfound_page=0.2, p429=0.0,
+                 p_redirect=0.1, body_size=32 * 1024, pages=200, fanout=5, traps=False):
+        self.latency = latency / 1000          # seconds
+        self.jitter = jitter / 1000
+        self.p404 = p404                       # share of missing users answered with 404
+        self.p_notfound_page = p_notfound_page # ... answered 200 + the site's not-found text
+        self.p429 = p429                       # per request, random
+        self.p_redirect = p_redirect
+        self.body_size = body_size
+        self.pages = pages
+        self.fanout = fanout
+        self.traps = traps                     # graph pages also link into a calendar and session-id URLs
+
+
+def _bucket(path: str) -> float:
+    """Deterministic [0, 1) per path, so a user is always found/missing the same way."""
+    return (zlib.crc32(path.encode()) & 0xFFFFFFFF) / 2 ** 32
+
+
+def _pad(body: str, size: int) -> bytes:
+    if len(body) < size:
+        body = body.replace("</body>", FILLER * ((size - len(body)) // len(FILLER) + 1) + "</body>")
+    return body.encode()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"         # keep-alive, like the real sites
+    config: MockConfig = None
+    indicators: dict = {}                 # site slug → not-found / exists indicators
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", ctype="text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _delay(self):
+        cfg = self.config
+        time.sleep(max(0.0, random.gauss(cfg.latency, cfg.jitter)))
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = self.rfile.read(length).decode(errors="replace")
+        self._delay()
+        if random.random() < self.config.p429:
+            return self._send(429, headers={"Retry-After": "0"})
+        m = re.match(r"^/e/([^/?]+)", self.path)
+        if not m:
+            return self._send(404)
+        inds = self.indicators.get(m.group(1), {})
+        exists = _bucket(payload) < 0.5
+        text = (inds.get("exists") if exists else inds.get("not_exists")) or ""
+        if "json" in (self.headers.get("Content-Type") or ""):
+            return self._send(200, json.dumps({"result": text}).encode(), "application/json")
+        return self._send(200, _pad(f"<html><body><p>{text}</p></body></html>", 2048))
+
+    def do_GET(self):
+        cfg = self.config
+        self._delay()
+        path = self.path
+        if path == "/robots.txt":
+            body = ("User-agent: *\nDisallow: /private\nDisallow: /g/*3$\n"
+                    f"Sitemap: http://{self.headers.get('Host')}/sitemap_index.xml\n")
+            return self._send(200, body.encode(), "text/plain")
+        if path == "/sitemap_index.xml":
+            return self._send(200, (f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">'
+                                    f'<sitemap><loc>http://{self.headers.get("Host")}/sitemap-g.xml.gz</loc></sitemap>'
+                                    '</sitemapindex>').encode(), "application/xml")
+        if path == "/sitemap-g.xml.gz":                  # every graph page, gzipped, fixed lastmod
+            urls = "".join(f'<url><loc>http://{self.headers.get("Host")}/g/{n}</loc><lastmod>{SITEMAP_LASTMOD}</lastmod></url>'
+                           for n in range(cfg.pages))
+            body = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">{urls}</urlset>'
+            return self._send(200, gzip.compress(body.encode()), "application/x-gzip")
+        if random.random() < cfg.p429:
+            return self._send(429, headers={"Retry-After": "0"})
+
+        if path.startswith("/g/"):                       # scraper page graph
+            n = int(re.sub(r"\D", "", path.split("?")[0]) or 0)
+            links = "".join(f'<a href="/g/{(n * 7 + k * 13 + 1) % cfg.pages}">page</a> '
+                            for k in range(cfg.fanout))
+            if cfg.traps:                                # same page under a fresh session id, endless calendar
+                links += (f'<a href="/g/{n}?sid={random.getrandbits(64):016x}">refresh</a> '
+                          f'<a href="/cal/{2024 + n // 12}-{n % 12 + 1:02d}">calendar</a>')
+            text = " ".join(random.Random(n).sample(TOPICS, 12))
+            return self._send(200, _pad(f"<html><body><h1>page {n}</h1><p>{text}</p>{links}</body></html>",
+                                        cfg.body_size))
+
+        m = re.match(r"^/cal/(\d+)-(\d+)$", path)
+        if m and cfg.traps:
+            month = int(m.group(1)) * 12 + int(m.group(2)) - 1
+            nav = "".join(f'<a href="/cal/{(month + d) // 12}-{(month + d) % 12 + 1:02d}">{label}</a> '
+                          for d, label in ((-1, "prev"), (1, "next")))
+            return self._send(200, _pad(f"<html><body><h1>events</h1><p>no events this month</p>{nav}</body></html>",
+                                        cfg.body_size))
+
+        if path.startswith("/rep/"):                     # emailrep.io lookalike
+            data = {"reputation": "medium", "suspicious": False, "references": 3,
+                    "details": {"profiles": ["github"], "blacklisted": False,
+                                "data_breach": True, "credentials_leaked": False},
+                    "summary": "mock"}
+            return self._send(200, json.dumps(data).encode(), "application/json")
+
+        m = re.match(r"^/u/([^/]+)/([^/?]+)(/?)(\?r=1)?$", path)
+        if not m:
+            return self._send(404)
+        slug, user, _, redirected = m.groups()
+        b = _bucket(path.split("?")[0].rstrip("/"))
+        if not redirected and random.random() < cfg.p_redirect:
+            return self._send(302, headers={"Location": f"/u/{slug}/{user}?r=1"})
+        if user.startswith("found") or b >= cfg.p404 + cfg.p_notfound_page:
+            body = f"<html><body><h1>{user}</h1><p>profile of {user}</p></body></html>"
+            return self._send(200, _pad(body, cfg.body_size))
+        if b < cfg.p404:
+            return self._send(404, b"<html><body>nope</body></html>")
+        text = self.indicators.get(slug, {}).get("not_found") or "page not found"
+        return self._send(200, _pad(f"<html><body><p>{text}</p></body></html>", cfg.body_size))
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that stop reading early (matchers, byte caps) drop the connection
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def start_server(config: MockConfig, indicators: dict):
+    handler = type("Handler", (MockHandler,), {"config": config, "indicators": indicators})
+    server = MockServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def mock_registry(base: str, path: str) -> dict:
+    """Copy the real registry with every site pointed at the mock server; returns indicator map."""
+    with open(os.path.join(HERE, "kArmas_sites.json"), encoding="utf-8") as f:
+        raw = json.load(f)
+    indicators = {}
+    for name, info in raw.get("username", {}).items():
+        s = slug(name)
+        info["url"] = f"{base}/u/{s}/{{}}"
+        indicators[s] = {"not_found": (info.get("not_found_indicators") or [None])[0]}
+    for name, info in raw.get("email", {}).items():
+        s = slug(name)
+        info["url"] = f"{base}/e/{s}"
+        indicators[s] = {"exists": (info.get("exists_indicators") or [None])[0],
+                         "not_exists": (info.get("not_exists_indicators") or [None])[0]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(raw, f)
+    return indicators
+
+
+# ─── Workers (run in a child process each) ───────────────────
+def timed(fn, latencies):
+    if asyncio.iscoroutinefunction(fn):
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - start)
+    else:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - start)
+    return wrapper
+
+
+def run_ultimate(mode, spec, latencies):
+    import kArmas_ultimate_osint as tool
+
+    tool.REPUTATION_URL = spec["base"] + "/rep/{}"
+    tool.check_username_site = timed(tool.check_username_site, latencies)
+    tool.check_email_registration = timed(tool.check_email_registration, latencies)
+    sites = tool.select_sites(None, spec["sites"])
+    targets = [f"user{i}" if i % 4 else f"user{i}@mail.test" for i in range(spec["targets"])]
+
+    async def single():
+        for target in targets:                     # one session per target, like main()
+            async with tool.make_session() as session:
+                await tool.investigate(session, target, sites=sites)
+
+    if mode == "single":
+        asyncio.run(single())
+    elif mode == "sharded":
+        import multiprocessing
+        from kArmas_jobqueue import JobQueue
+
+        workdir = tempfile.mkdtemp(prefix="kArmas_bench_")
+        queue = JobQueue(os.path.join(workdir, "jobs.sqlite"))
+        queue.enqueue(targets, spec["sites"])
+        # like run_workers, but each process times its checks and hands the latencies back
+        outs = [os.path.join(workdir, f"latencies-{i}.json") for i in range(PARSE_WORKERS)]
+        procs = [multiprocessing.Process(target=shard_worker, args=(queue.path, i, spec["base"], out))
+                 for i, out in enumerate(outs)]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        for out in outs:
+            if os.path.exists(out):
+                with open(out, encoding="utf-8") as f:
+                    latencies.extend(json.load(f))
+    else:
+        workers = PARSE_WORKERS if mode == "batch-pool" else 0
+        asyncio.run(tool.batch(io.StringIO("\n".join(targets)), io.StringIO(), sites=sites, parse_workers=workers))
+    return len(latencies)
+
+
+def shard_worker(path, index, base, out):
+    """One sharded job-queue worker process with its checks timed (written to `out` as JSON)."""
+    import kArmas_ultimate_osint as tool
+    from kArmas_jobqueue import work
+
+    latencies = []
+    tool.REPUTATION_URL = base + "/rep/{}"
+    tool.check_username_site = timed(tool.check_username_site, latencies)
+    tool.check_email_registration = timed(tool.check_email_registration, latencies)
+    with redirect_stdout(io.StringIO()):
+        asyncio.run(work(path, f"bench-{index}"))
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(latencies, f)
+
+
+def run_username(mode, spec, latencies):
+    import kArmas_usernameOSAINT as tool
+    from kArmas_sites import load_sites
+
+    tool.check_profile_exists = timed(tool.check_profile_exists, latencies)
+    registry = load_sites("username", None, spec["sites"])
+    matchers = {name: info["profile_matcher"] for name, info in registry.items()}
+    workers = 1 if mode == "serial" else 8
+    session = tool.get_session(pool_size=workers)
+    for i in range(spec["targets"]):
+        sites = {name: info["url"].format(f"user{i}") for name, info in registry.items()}
+        for _ in tool.check_sites(sites, session, workers=workers, delay=0, matchers=matchers):
+            pass
+    return len(latencies)
+
+
+def run_scraper(mode, spec, latencies):
+    import kArmasec_scraper as tool
+    from kArmas_dedup import TrapDetector
+
+    tool.OUTPUT_DIR = tempfile.mkdtemp(prefix="kArmas_bench_")
+    tool.traps = TrapDetector()
+    tool.fetch = timed(tool.fetch, latencies)
+    seed = spec["base"] + "/g/0"
+    if mode == "serial":
+        tool.crawl(seed, max_pages=spec["pages"], delay=0)
+    else:
+        workers = PARSE_WORKERS if mode == "async-pool" else 0
+        asyncio.run(tool.crawl_async([seed], max_pages=spec["pages"], delay=0, concurrency=8, parse_workers=workers))
+    return len(latencies)
+
+
+def link_page(n: int, size: int) -> str:
+    """Synthetic link-heavy page: relative, absolute, external, nofollow and mailto links in text."""
+    rng = random.Random(n)
+    parts = ["<html><head><title>p</title><link rel=canonical href='/canon'></head><body>"]
+    length = 0
+    while length < size:
+        kind = rng.random()
+        if kind < 0.5:
+            tag = f'<a href="/g/{rng.randrange(10**6)}?a=1#top">internal</a>'
+        elif kind < 0.7:
+            tag = f'<a href="https://bench.test/p/{rng.randrange(10**6)}" class="x y">abs</a>'
+        elif kind < 0.85:
+            tag = f'<a href="https://elsewhere.test/{rng.randrange(10**6)}">ext</a>'
+        elif kind < 0.95:
+            tag = f'<a rel="nofollow" href="/nf/{rng.randrange(10**6)}">nf</a>'
+        else:
+            tag = '<a href="mailto:x@bench.test">mail</a>'
+        chunk = f"<p><span>{FILLER[:rng.randrange(20, 80)]}</span>{tag}</p>\n"
+        parts.append(chunk)
+        length += len(chunk)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def bs4_links(base_url, html):
+    """The scraper's previous extract_links (full BeautifulSoup tree), for comparison."""
+    from bs4 import BeautifulSoup
+    from urllib.parse import urljoin, urlparse
+
+    soup = BeautifulSoup(html, "html.parser")
+    links = set()
+    for a in soup.find_all("a", href=True):
+        href = a["href"].strip()
+        if href.startswith(("mailto:", "tel:", "javascript:", "#")):
+            continue
+        full = urljoin(base_url, href)
+        if urlparse(full).netloc == urlparse(base_url).netloc:
+            links.add(full.split("#")[0])
+    return links
+
+
+def run_links(mode, spec, latencies):
+    from kArmas_links import extract_links
+
+    url = "https://bench.test/g/0"
+    pages = [link_page(i, spec["body_size"]) for i in range(min(spec["targets"], 20))]
+    if mode == "bs4":
+        parse = timed(bs4_links, latencies)
+    else:
+        parse = timed(lambda u, h: extract_links(u, h, backend=mode).links, latencies)
+    for i in range(spec["pages"] // 4 or 1):
+        parse(url, pages[i % len(pages)])
+    return len(latencies)
+
+
+def run_startup(mode, spec, latencies):
+    """Import the entry point in fresh interpreters; latency = the module's cumulative importtime."""
+    module = STARTUP_MODULES[mode]
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}   # time cached bytecode, not compile()
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    subprocess.run(cmd, cwd=HERE, env=env, capture_output=True)      # warm-up: writes .pyc, fills the page cache
+    for _ in range(STARTUP_RUNS):
+        proc = subprocess.run(cmd, cwd=HERE, env=env, capture_output=True, text=True)
+        lines = proc.stderr.splitlines()
+        noise = [line for line in lines if not line.startswith("import time:")]
+        if proc.returncode or proc.stdout or noise:
+            raise RuntimeError(f"import {module} must not fail or print anything:\n{proc.stdout}{chr(10).join(noise)}")
+        latencies.append(int(lines[-1].split("|")[1]) / 1e6)          # "import time: self | cumulative | module"
+    return len(latencies)
+
+
+RUNNERS = {"ultimate": run_ultimate, "username": run_username, "scraper": run_scraper, "links": run_links,
+           "startup": run_startup}
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * len(values) + 0.5)) - 1)]
+
+
+def _children_cpu() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def worker(spec: dict) -> dict:
+    """
+    Run one tool/mode. cpu_s includes finished child processes (parse pools,
+    sharded workers); peak_rss_kb is the largest of this process and any child.
+    """
+    latencies = []
+    cpu0 = time.process_time() + _children_cpu()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):           # tools are chatty
+        items = RUNNERS[spec["tool"]](spec["mode"], spec, latencies)
+    wall = time.perf_counter() - start
+    return {
+        "tool": spec["tool"],
+        "mode": spec["mode"],
+        "items": items,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(items / wall, 2) if wall else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        "cpu_s": round(time.process_time() + _children_cpu() - cpu0, 3),
+        "peak_rss_kb": max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                           resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss),
+    }
+
+
+# ─── Driver ──────────────────────────────────────────────────
+def print_table(results):
+    cols = ("tool", "mode", "items", "wall_s", "throughput_per_s", "p50_ms", "p99_ms", "cpu_s", "peak_rss_kb")
+    print("  ".join(f"{c:>16}" for c in cols))
+    for r in results:
+        print("  ".join(f"{str(r.get(c)):>16}" for c in cols))
+
+
+def print_compare(results, old_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["tool"], r["mode"]): r for r in json.load(f)["results"]}
+    print(f"\nvs {old_path}:")
+    for r in results:
+        before = old.get((r["tool"], r["mode"]))
+        if not before:
+            continue
+        deltas = []
+        for key in ("throughput_per_s", "p50_ms", "p99_ms", "cpu_s", "peak_rss_kb"):
+            a, b = before.get(key), r.get(key)
+            if a and b is not None:
+                deltas.append(f"{key} {(b - a) / a * 100:+.1f}%")
+        print(f"  {r['tool']}/{r['mode']}: " + ", ".join(deltas))
+
+
+def check_startup(results, failed=()) -> bool:
+    """
+    Print startup results against STARTUP_BUDGET_MS; False if any entry point
+    is over, or its run failed (the import raised or printed something).
+    """
+    ok = True
+    for r in results:
+        if r["tool"] == "startup":
+            budget = STARTUP_BUDGET_MS[r["mode"]]
+            over = r["p50_ms"] > budget
+            ok &= not over
+            print(f"  import {STARTUP_MODULES[r['mode']]}: {r['p50_ms']:.1f} ms (budget {budget} ms)"
+                  + (" ← OVER BUDGET" if over else ""))
+    for tool, mode in failed:
+        if tool == "startup":
+            ok = False
+            print(f"  import {STARTUP_MODULES[mode]}: FAILED (see error above) ← OVER BUDGET")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="kArmas offline benchmark (local mock sites)")
+    parser.add_argument("--tools", default=",".join(MODES), help="Comma-separated tools (default all)")
+    parser.add_argument("--modes", help="Comma-separated modes to run (default all modes of each tool)")
+    parser.add_argument("--targets", type=int, default=20, help="Usernames/emails per OSINT run (default 20)")
+    parser.add_argument("--pages", type=int, default=200, help="Pages in the scraper graph (default 200)")
+    parser.add_argument("--latency", type=float, default=20, help="Mean server latency in ms (default 20)")
+    parser.add_argument("--jitter", type=float, default=5, help="Latency std-dev in ms (default 5)")
+    parser.add_argument("--p404", type=float, default=0.3, help="Share of users answered 404 (default 0.3)")
+    parser.add_argument("--p-notfound-page", type=float, default=0.2, help="Share answered 200 + not-found text (default 0.2)")
+    parser.add_argument("--p429", type=float, default=0.0, help="Per-request chance of 429 (default 0)")
+    parser.add_argument("--redirects", type=float, default=0.1, help="Per-request chance of a 302 (default 0.1)")
+    parser.add_argument("--traps", action="store_true",
+                        help="Scraper graph pages also link into crawl traps (session-id URLs, an endless calendar)")
+    parser.add_argument("--body-size", type=int, default=32 * 1024, help="Page body size in bytes (default 32768)")
+    parser.add_argument("-o", "--output", help="Write results JSON here")
+    parser.add_argument("--compare", metavar="OLD.json", help="Show deltas against an earlier results file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(json.loads(args.worker))))
+        return
+
+    config = MockConfig(args.latency, args.jitter, args.p404, args.p_notfound_page, args.p429,
+                        args.redirects, args.body_size, args.pages, traps=args.traps)
+    workdir = tempfile.mkdtemp(prefix="kArmas_bench_")
+    sites_path = os.path.join(workdir, "sites.json")
+    server = start_server(config, {})
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    server.RequestHandlerClass.indicators = mock_registry(base, sites_path)
+
+    wanted_modes = set(args.modes.split(",")) if args.modes else None
+    results = []
+    failed = []                                    # (tool, mode) of runs that crashed
+    for tool in args.tools.split(","):
+        for mode in MODES[tool]:
+            if wanted_modes and mode not in wanted_modes:
+                continue
+            spec = {"tool": tool, "mode": mode, "base": base, "sites": sites_path,
+                    "targets": args.targets, "pages": args.pages, "body_size": args.body_size}
+            print(f"… {tool}/{mode}", file=sys.stderr)
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", json.dumps(spec)],
+                                  capture_output=True, text=True, cwd=workdir)
+            if proc.returncode != 0:
+                print(proc.stderr, file=sys.stderr)
+                failed.append((tool, mode))
+                continue
+            results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    server.shutdown()
+
+    print_table(results)
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("worker", "output", "compare")},
+              "python": sys.version.split()[0], "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nResults → {args.output}")
+    if args.compare:
+        print_compare(results, args.compare)
+    if failed:
+        print(f"\nfailed: {', '.join(f'{tool}/{mode}' for tool, mode in failed)}")
+    if any(r["tool"] == "startup" for r in results) or any(tool == "startup" for tool, _ in failed):
+        print("\nstartup:")
+        if not check_startup(results, failed):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+kArmas_blobstore
+Content-addressed page storage for the kArmas scraper.
+Response bytes are streamed to a temp file while being hashed (sha256)
+and optionally compressed (zstd if the zstandard package is installed,
+else gzip), then moved to blobs/ab/<sha256>; identical pages are stored
+once. index.jsonl maps every saved URL to its blob, one line per save.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:          # optional: pip install zstandard
+    zstandard = None
+
+SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+DEFAULT_COMPRESS = "zstd" if zstandard else "gzip"
+
+
+class BlobWriter:
+    """One page being written: hash + size of the raw bytes, compressed temp file."""
+
+    def __init__(self, tmp_dir: str, compress: str):
+        self._tmp = tempfile.NamedTemporaryFile(dir=tmp_dir, prefix="blob-", delete=False)
+        self._hash = hashlib.sha256()
+        self.size = 0
+        if compress == "gzip":
+            self._out = gzip.GzipFile(fileobj=self._tmp, mode="wb", compresslevel=6, mtime=0)
+        elif compress == "zstd":
+            self._out = zstandard.ZstdCompressor(level=3).stream_writer(self._tmp, closefd=False)
+        else:
+            self._out = self._tmp
+
+    @property
+    def tmp_path(self) -> str:
+        return self._tmp.name
+
+    def write(self, data: bytes):
+        self._hash.update(data)
+        self.size += len(data)
+        self._out.write(data)
+
+    def finish(self) -> str:
+        if self._out is not self._tmp:
+            self._out.close()
+        self._tmp.close()
+        return self._hash.hexdigest()
+
+    def abort(self):
+        try:
+            if self._out is not self._tmp:
+                self._out.close()
+            self._tmp.close()
+        finally:
+            with contextlib.suppress(OSError):
+                os.unlink(self._tmp.name)
+
+
+class BlobStore:
+    """
+    Thread-safe: writers are independent temp files, only the final
+    rename and the index append take the lock.
+    """
+
+    def __init__(self, root: str, compress: str = DEFAULT_COMPRESS):
+        if compress not in SUFFIXES:
+            raise ValueError(f"unknown compression {compress!r} (choose from {', '.join(SUFFIXES)})")
+        if compress == "zstd" and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package (pip install zstandard)")
+        self.root = root
+        self.compress = compress
+        self.blob_dir = os.path.join(root, "blobs")
+        self.tmp_dir = os.path.join(root, "blobs", "tmp")
+        self.index_path = os.path.join(root, "index.jsonl")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.saved = 0            # pages committed
+        self.duplicates = 0       # … whose content was already stored
+        self.bytes_in = 0         # raw page bytes
+        self.bytes_stored = 0     # bytes added to disk (compressed, new blobs only)
+        self._lock = threading.Lock()
+        self._index = open(self.index_path, "a", encoding="utf-8")
+
+    def writer(self) -> BlobWriter:
+        return BlobWriter(self.tmp_dir, self.compress)
+
+    def commit(self, writer: BlobWriter, url: str, **meta) -> dict:
+        """Finish `writer`, keep its blob unless the content is already stored, index `url`."""
+        digest = writer.finish()
+        target = os.path.join(self.blob_dir, digest[:2], digest + SUFFIXES[self.compress])
+        with self._lock:
+            if self.path(digest):
+                os.unlink(writer.tmp_path)
+                self.duplicates += 1
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                self.bytes_stored += os.path.getsize(writer.tmp_path)
+                os.replace(writer.tmp_path, target)
+            self.saved += 1
+            self.bytes_in += writer.size
+            rec = {"url": url, "sha256": digest, "size": writer.size, **meta, "ts": round(time.time(), 3)}
+            self._index.write(json.dumps(rec, separators=(",", ":")) + "\n")
+            self._index.flush()
+        return rec
+
+    # ── reading back ─────────────────────────────────────────
+    def path(self, digest: str) -> str | None:
+        """Stored blob for `digest`, whatever compression it was written with."""
+        base = os.path.join(self.blob_dir, digest[:2], digest)
+        for suffix in SUFFIXES.values():
+            if os.path.exists(base + suffix):
+                return base + suffix
+        return None
+
+    def read(self, digest: str) -> bytes:
+        path = self.path(digest)
+        if path is None:
+            raise KeyError(digest)
+        with open(path, "rb") as f:
+            if path.endswith(".gz"):
+                return gzip.decompress(f.read())
+            if path.endswith(".zst"):
+                if zstandard is None:
+                    raise RuntimeError("blob is zstd-compressed; pip install zstandard to read it")
+                return zstandard.ZstdDecompressor().stream_reader(f).read()
+            return f.read()
+
+    def lookup(self, url: str) -> dict | None:
+        """Latest index record for `url`."""
+        found = None
+        needle = json.dumps(url)
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                if needle in line:                   # cheap pre-filter before parsing
+                    rec = json.loads(line)
+                    if rec["url"] == url:
+                        found = rec
+        return found
+
+    def last_saved(self) -> dict[str, float]:
+        """URL → time it was last saved, for every URL in the index."""
+        saved = {}
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue                         # torn last line after a crash
+                saved[rec["url"]] = rec["ts"]
+        return saved
+
+    def stats(self) -> dict:
+        return {
+            "saved": self.saved,
+            "duplicates": self.duplicates,
+            "bytes_in": self.bytes_in,
+            "bytes_stored": self.bytes_stored,
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"store: {s['saved']} page(s), {s['duplicates']} duplicate(s), "
+                f"{s['bytes_in']:,} bytes → {s['bytes_stored']:,} on disk ({self.compress})")
+
+    def close(self):
+        with self._lock:
+            self._index.close()
+
+
+if __name__ == "__main__":
+    # Read a stored page back: python kArmas_blobstore.py ROOT URL > page.html
+    # or list the index:      python kArmas_blobstore.py ROOT
+    root = sys.argv[1] if len(sys.argv) > 1 else "scraped_pages"
+    store = BlobStore(root, compress="none")
+    if len(sys.argv) > 2:
+        rec = store.lookup(sys.argv[2])
+        if rec is None:
+            sys.exit(f"{sys.argv[2]} is not in {store.index_path}")
+        sys.stdout.buffer.write(store.read(rec["sha256"]))
+    else:
+        with open(store.index_path, encoding="utf-8") as f:
+            for line in f:
+                rec = json.loads(line)
+                print(f"{rec['sha256'][:12]}  {rec['size']:>9,}  {rec['url']}")
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+kArmas_daemon
+Long-running lookup service: kArmas_ultimate_osint's investigate() and
+the username checker behind a local HTTP/JSON (or Unix socket) API.
+Sessions, warm connection pools, the DNS cache, the response cache and
+the compiled site registry stay resident, so a lookup costs only its
+own requests. Jobs wait in a bounded queue (full → 503) and every
+client has its own concurrency limit (exceeded → 429).
+
+  POST /lookup    {"target": "name" | "name@mail.tld", "tags": [...]}
+  POST /username  {"username": "name", "tags": [...]}
+  GET  /stats     queue, clients, connection and cache counters
+  GET  /metrics   Prometheus text (with --metrics)
+  GET  /healthz
+
+Usage: python kArmas_daemon.py --port 8088        (or --unix /tmp/kArmas.sock)
+       curl -s localhost:8088/lookup -d '{"target": "usernamə"}'
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+import kArmas_ultimate_osint as ultimate
+import kArmas_usernameOSAINT as usernames
+from kArmas_httpcache import ResponseCache, DEFAULT_CACHE, DEFAULT_TTL
+from kArmas_metrics import Metrics, instrument_session
+from kArmas_netcache import NET
+from kArmas_sites import DEFAULT_SITES, load_sites, parse_tags
+
+DEFAULT_PORT = 8088
+WORKERS = 8                # jobs running at once
+QUEUE_SIZE = 1000          # jobs waiting; beyond that → 503
+PER_CLIENT = 32            # jobs queued + running per client; beyond that → 429
+USERNAME_THREADS = 8       # threads per username job (like the CLI)
+USERNAME_DELAY = 0.3       # seconds between requests to one host within a username job
+
+
+class Rejected(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LookupService:
+    """Resident state + job queue. start() inside the running loop, stop() on shutdown."""
+
+    def __init__(self, tags=None, sites_path=DEFAULT_SITES, cache=None, metrics=None, max_concurrent=30,
+                 workers=WORKERS, queue_size=QUEUE_SIZE, per_client=PER_CLIENT, warmup=True, deadline=None):
+        self.tags = tags
+        self.deadline = deadline                # seconds per /lookup; stragglers are reported as "timeout"
+        self.sites_path = sites_path
+        self.cache = cache
+        self.metrics = metrics
+        self.max_concurrent = max_concurrent
+        self.workers = workers
+        self.per_client = per_client
+        self.warmup = warmup
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.clients: dict[str, int] = {}       # client → jobs queued or running
+        self.running = 0
+        self.served = 0
+        self.failed = 0
+        self.rejected = {429: 0, 503: 0}
+        self.started = time.time()
+        self.session = None                     # aiohttp, for /lookup
+        self.requests_session = None            # requests, for /username
+        self.controller = ultimate.HostController()   # shared: per-host limits keep learning across jobs
+        self._threads = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="username")
+        self._tasks = []
+
+    # ── lifecycle ────────────────────────────────────────────
+    async def start(self):
+        self.session = ultimate.make_session(self.max_concurrent, metrics=self.metrics, net=NET)
+        sites = self.sites()
+        registry = load_sites("username", None, self.sites_path)
+        self.requests_session = usernames.get_session(pool_size=USERNAME_THREADS * self.workers,
+                                                      pool_hosts=max(32, len(registry)))
+        if self.metrics:
+            instrument_session(self.requests_session, self.metrics)
+        NET.install(self.requests_session)
+        if self.warmup:
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            warmed, _ = await asyncio.gather(
+                NET.warm_aiohttp(self.session, ultimate.site_urls(sites)),
+                loop.run_in_executor(self._threads, NET.warm_requests, self.requests_session,
+                                     [info["url"] for info in registry.values()]))
+            print(f"pre-warmed {warmed} host(s) in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.session:
+            await self.session.close()
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        if self.requests_session:
+            self.requests_session.close()
+        if self.cache:
+            self.cache.close()
+
+    # ── jobs ─────────────────────────────────────────────────
+    def sites(self, tags=None) -> dict:
+        tags = tags or self.tags
+        return ultimate.select_sites(None if tags == ["all"] else tags, self.sites_path)
+
+    async def submit(self, client: str, kind: str, target: str, tags=None):
+        """Queue a job and wait for its result; Rejected(503/429) when the service or the client is at its limit."""
+        if self.clients.get(client, 0) >= self.per_client:
+            self.rejected[429] += 1
+            raise Rejected(429, f"client {client!r} already has {self.per_client} job(s) in flight")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((kind, target, tags, future))
+        except asyncio.QueueFull:
+            self.rejected[503] += 1
+            raise Rejected(503, "queue full, retry later")
+        self.clients[client] = self.clients.get(client, 0) + 1
+        try:
+            return await future
+        finally:
+            future.cancel()                     # client went away: the worker skips the job
+            self.clients[client] -= 1
+            if not self.clients[client]:
+                del self.clients[client]
+
+    async def _worker(self):
+        while True:
+            kind, target, tags, future = await self.queue.get()
+            try:
+                if future.done():
+                    continue
+                self.running += 1
+                try:
+                    if kind == "lookup":
+                        result = await ultimate.investigate(self.session, target, self.cache, self.sites(tags),
+                                                            self.controller, self.metrics, deadline=self.deadline)
+                    else:
+                        result = await asyncio.get_running_loop().run_in_executor(
+                            self._threads, self.check_username, target, tags)
+                except Exception as e:
+                    self.failed += 1
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    self.served += 1
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    self.running -= 1
+            finally:
+                self.queue.task_done()
+
+    def check_username(self, username: str, tags=None) -> dict:
+        """kArmas_usernameOSAINT's check over the resident requests session (runs in a thread)."""
+        registry = load_sites("username", None if tags == ["all"] else tags, self.sites_path)
+        sites = {name: info["url"].format(username) for name, info in registry.items()}
+        matchers = {name: info["profile_matcher"] for name, info in registry.items()}
+        found, missed, failed = [], [], []
+        for site, url, exists in usernames.check_sites(sites, self.requests_session, workers=USERNAME_THREADS,
+                                                       delay=USERNAME_DELAY, cache=self.cache, matchers=matchers,
+                                                       metrics=self.metrics):
+            (failed if exists is None else found if exists else missed).append({"site": site, "url": url})
+        return {"username": username,
+                "found": sorted(found, key=lambda r: r["site"]),
+                "missed": sorted(missed, key=lambda r: r["site"]),
+                "failed": sorted(failed, key=lambda r: r["site"])}
+
+    def stats(self) -> dict:
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "queued": self.queue.qsize(),
+            "running": self.running,
+            "served": self.served,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "clients": dict(self.clients),
+            "net": NET.stats(),
+            "cache": self.cache.stats() if self.cache else None,
+            "hosts": self.controller.stats(),
+        }
+
+
+# ─── HTTP API ────────────────────────────────────────────────
+def client_id(request: web.Request) -> str:
+    """X-Client-Id header, else the peer address (one id for all Unix-socket clients)."""
+    if request.headers.get("X-Client-Id"):
+        return request.headers["X-Client-Id"]
+    peer = request.transport.get_extra_info("peername") if request.transport else None
+    return peer[0] if isinstance(peer, tuple) else "unix"
+
+
+async def read_job(request: web.Request, field: str) -> tuple[str, list | None]:
+    try:
+        body = await request.json()
+    except (ValueError, UnicodeDecodeError):
+        raise web.HTTPBadRequest(text=json.dumps({"error": "body must be JSON"}), content_type="application/json")
+    value = body.get(field) if isinstance(body, dict) else None
+    if not isinstance(value, str) or not value.strip():
+        raise web.HTTPBadRequest(text=json.dumps({"error": f"missing {field!r}"}), content_type="application/json")
+    tags = body.get("tags")
+    if isinstance(tags, str):
+        tags = parse_tags(tags)
+    return value.strip(), tags or None
+
+
+async def run_job(request: web.Request, kind: str, field: str) -> web.Response:
+    service: LookupService = request.app["service"]
+    target, tags = await read_job(request, field)
+    try:
+        result = await service.submit(client_id(request), kind, target, tags)
+    except Rejected as e:
+        return web.json_response({"error": str(e)}, status=e.status, headers={"Retry-After": "1"})
+    except Exception as e:
+        return web.json_response({"error": f"{type(e).__name__}: {e}"}, status=500)
+    return web.json_response(result)
+
+
+async def lookup(request):
+    return await run_job(request, "lookup", "target")
+
+
+async def username(request):
+    return await run_job(request, "username", "username")
+
+
+async def stats(request):
+    return web.json_response(request.app["service"].stats())
+
+
+async def healthz(request):
+    return web.json_response({"ok": True})
+
+
+async def metrics_text(request):
+    metrics = request.app["service"].metrics
+    if not metrics:
+        raise web.HTTPNotFound(text="start the daemon with --metrics")
+    return web.Response(text=metrics.to_prometheus(), content_type="text/plain")
+
+
+def make_app(service: LookupService) -> web.Application:
+    app = web.Application()
+    app["service"] = service
+    app.router.add_post("/lookup", lookup)
+    app.router.add_post("/username", username)
+    app.router.add_get("/stats", stats)
+    app.router.add_get("/metrics", metrics_text)
+    app.router.add_get("/healthz", healthz)
+
+    async def on_startup(app):
+        await service.start()
+
+    async def on_cleanup(app):
+        await service.stop()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+async def serve(service: LookupService, host: str, port: int, unix: str | None = None):
+    runner = web.AppRunner(make_app(service), access_log=None)
+    await runner.setup()
+    if unix:
+        if os.path.exists(unix):
+            os.unlink(unix)                 # stale socket from an earlier run
+        site = web.UnixSite(runner, unix)
+    else:
+        site = web.TCPSite(runner, host, port)
+    await site.start()
+    print(f"kArmas daemon listening on {unix or f'http://{host}:{port}'} "
+          f"({service.workers} worker(s), queue {service.queue.maxsize}, {service.per_client} per client)", file=sys.stderr)
+    stop = asyncio.Event()
+    with contextlib.suppress(NotImplementedError):         # no signal handlers on Windows
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+        if unix:
+            with contextlib.suppress(OSError):
+                os.unlink(unix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="kArmas lookup daemon (HTTP/JSON API)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default {DEFAULT_PORT})")
+    parser.add_argument("--unix", metavar="PATH", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"Jobs running at once (default {WORKERS})")
+    parser.add_argument("--queue", type=int, default=QUEUE_SIZE, help=f"Jobs waiting before 503 (default {QUEUE_SIZE})")
+    parser.add_argument("--per-client", type=int, default=PER_CLIENT,
+                        help=f"Jobs in flight per client (X-Client-Id or address) before 429 (default {PER_CLIENT})")
+    parser.add_argument("--max-concurrent", type=int, default=30, help="Global cap on in-flight requests (default 30)")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="Answer /lookup within SECONDS; checks still running are reported as 'timeout'")
+    parser.add_argument("--tags", help=f"Default site tags (default {','.join(ultimate.DEFAULT_TAGS)}; 'all' = every site)")
+    parser.add_argument("--sites", default=DEFAULT_SITES, help="Site registry file (default kArmas_sites.json)")
+    parser.add_argument("--cache", action="store_true", help="Reuse cached profile pages (ETag/Last-Modified revalidation)")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE, help=f"Cache database (default {DEFAULT_CACHE})")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL, help=f"Seconds before a cached page is revalidated (default {DEFAULT_TTL})")
+    parser.add_argument("--metrics", action="store_true", help="Record per-site stage timings, served at GET /metrics")
+    parser.add_argument("--no-warmup", action="store_true", help="Don't pre-open connections to every site host at startup")
+    args = parser.parse_args()
+
+    service = LookupService(
+        tags=parse_tags(args.tags) or ultimate.DEFAULT_TAGS, sites_path=args.sites,
+        cache=ResponseCache(args.cache_path, ttl=args.cache_ttl) if args.cache else None,
+        metrics=Metrics() if args.metrics else None, max_concurrent=args.max_concurrent,
+        workers=args.workers, queue_size=args.queue, per_client=args.per_client, warmup=not args.no_warmup,
+        deadline=args.deadline)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("\nstopped", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
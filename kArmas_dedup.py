@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+kArmas_dedup
+Near-duplicate and crawl-trap detection for the kArmas scraper.
+Every fetched HTML page gets a 64-bit SimHash of its visible text (word
+3-shingles, tags/scripts/styles stripped), built while the page streams.
+A page within NEAR_DISTANCE bits of an earlier one is a near-duplicate.
+URLs are grouped into clusters – their shape (host + path with numbers,
+dates and ids replaced, + query keys without values) and one cluster per
+query key – and a cluster that keeps producing near-duplicates is
+deferred and then dropped, so calendars, session-id URLs and faceted
+search stop eating the page budget. `avoided` counts the fetches saved.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter
+from urllib.parse import urlsplit, parse_qsl
+
+SHINGLE        = 3        # words per shingle
+NEAR_DISTANCE  = 3        # max differing SimHash bits for a near-duplicate
+BANDS          = 4        # 16-bit bands: two hashes NEAR_DISTANCE apart share at least one
+SUSPECT_RATIO  = 0.5      # cluster's duplicate share from which new URLs wait for the rest
+TRAP_MIN_PAGES = 4        # pages a cluster needs before it can be judged a trap
+TRAP_RATIO     = 0.7      # … and the duplicate share from which its URLs are dropped
+MAX_CARRY      = 64 * 1024   # unterminated markup kept between chunks before it is read as text
+
+FETCH, DEFER, DROP = "fetch", "defer", "drop"
+
+_MARKUP = re.compile(r"<script\b.*?</script\s*>|<style\b.*?</style\s*>|<!--.*?-->"
+                     r"|<(?!script\b|style\b|!--)[a-zA-Z/!?][^>]*>", re.S | re.I)
+_WORD = re.compile(r"\w+")
+_OPEN = re.compile(r"<[a-zA-Z/!?]|<$")     # "a < b" is text, "<p" / a "<" at the chunk end may be markup
+_DATE = re.compile(r"^\d{4}([-_/.]\d{1,2}){1,2}$|^(19|20)\d{2}(0[1-9]|1[0-2])(\d\d)?$")
+_ID = re.compile(r"^(?=.*\d)[0-9a-f-]{8,}$|^(?=.*\d)(?=.*[a-z])[\w-]{16,}$", re.I)
+_NUM = re.compile(r"\d+")
+
+
+class SimHasher:
+    """feed() page text (HTML) as it arrives, then digest()."""
+
+    def __init__(self):
+        self._carry = ""
+        self._words: list[str] = []           # last SHINGLE-1 words of the previous chunk
+        self._shingles: set[tuple] = set()
+
+    def feed(self, text: str):
+        text = self._carry + text
+        end = 0
+        parts = []
+        for m in _MARKUP.finditer(text):
+            gap = text[end:m.start()]
+            if _OPEN.search(gap):             # an earlier tag/script/comment is still open
+                break
+            parts.append(gap)
+            end = m.end()
+        rest = text[end:]
+        opened = _OPEN.search(rest)           # … wait for its end
+        if opened and len(rest) - opened.start() <= MAX_CARRY:
+            parts.append(rest[:opened.start()])
+            self._carry = rest[opened.start():]
+        else:
+            parts.append(rest)
+            self._carry = ""
+        text = " ".join(parts)
+        if not self._carry:                   # a word may continue in the next chunk
+            start = len(text)
+            while start and _WORD.match(text, start - 1):
+                start -= 1
+            text, self._carry = text[:start], text[start:]
+        words = self._words + _WORD.findall(text.lower())
+        self._shingles.update(zip(*(words[i:] for i in range(SHINGLE))))
+        self._words = words[-(SHINGLE - 1):]
+
+    def digest(self) -> int | None:
+        """64-bit SimHash of the distinct shingles (None for a page without text)."""
+        if self._carry:
+            self._carry, text = "", self._carry
+            self.feed(text.replace("<", " "))
+        if not self._shingles:
+            return None
+        data = b"".join(hashlib.blake2b(" ".join(shingle).encode(), digest_size=8).digest()
+                        for shingle in self._shingles)      # each distinct shingle hashed once
+        total = len(self._shingles)
+        value = 0
+        for pos in range(8):                  # per byte position: count byte values at C speed, then bits
+            ones = [0] * 8
+            for byte, count in Counter(data[pos::8]).items():
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        ones[bit] += count
+            for bit in range(8):
+                if 2 * ones[bit] > total:
+                    value |= 1 << (56 - 8 * pos + bit)
+        return value
+
+
+def simhash(text: str) -> int | None:
+    hasher = SimHasher()
+    hasher.feed(text)
+    return hasher.digest()
+
+
+def _segment(seg: str) -> str:
+    if not seg or not any(c.isdigit() for c in seg):
+        return seg
+    if _DATE.match(seg):
+        return "{date}"
+    if _ID.match(seg):
+        return "{id}"
+    return _NUM.sub("{n}", seg)
+
+
+def url_shape(url: str) -> str:
+    """host/path with variable parts as placeholders + sorted query keys: /cal/2024-05?sid=x → host/cal/{date}?sid"""
+    parts = urlsplit(url)
+    path = parts.path.split(";")[0]           # ;jsessionid=… path parameters
+    keys = sorted({k for k, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    shape = (parts.hostname or "") + "/".join(_segment(seg) for seg in path.split("/"))
+    return shape + ("?" + "&".join(keys) if keys else "")
+
+
+def clusters(url: str) -> list[str]:
+    """The URL's shape plus one host-wide cluster per query key (session ids sit on every path)."""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    keys = sorted({k for k, _ in parse_qsl(parts.query, keep_blank_values=True)})
+    return [url_shape(url), *(f"{host}/*?{k}" for k in keys)]
+
+
+class TrapDetector:
+    """
+    observe() each fetched page's SimHash; route() decides what to do with a
+    URL before it is queued or fetched. Not thread-safe on its own – the
+    scraper calls it from the event loop / its single crawl loop.
+    """
+
+    def __init__(self, distance: int = NEAR_DISTANCE, min_pages: int = TRAP_MIN_PAGES,
+                 trap_ratio: float = TRAP_RATIO, suspect_ratio: float = SUSPECT_RATIO):
+        self.distance = distance
+        self.min_pages = min_pages
+        self.trap_ratio = trap_ratio
+        self.suspect_ratio = suspect_ratio
+        self.pages = 0            # pages fingerprinted
+        self.duplicates = 0       # … of which near-duplicates of an earlier page
+        self.deferred = 0         # URLs queued behind everything else
+        self.avoided = 0          # URLs dropped instead of fetched
+        self._bands: dict[tuple[int, int], list[int]] = {}
+        self._stats: dict[str, list[int]] = {}    # cluster → [pages, duplicates]
+        self._traps: dict[str, None] = {}         # clusters judged traps, in order
+
+    def _near(self, fingerprint: int) -> bool:
+        width = 64 // BANDS
+        mask = (1 << width) - 1
+        found = False
+        for band in range(BANDS):
+            bucket = self._bands.setdefault((band, fingerprint >> band * width & mask), [])
+            if not found:
+                found = any(bin(fingerprint ^ other).count("1") <= self.distance for other in bucket)
+            bucket.append(fingerprint)
+        return found
+
+    def observe(self, url: str, fingerprint: int | None) -> bool:
+        """Record a fetched page; True if it is a near-duplicate of one seen before."""
+        if fingerprint is None:
+            return False
+        duplicate = self._near(fingerprint)
+        self.pages += 1
+        self.duplicates += duplicate
+        for cluster in clusters(url):
+            stats = self._stats.setdefault(cluster, [0, 0])
+            stats[0] += 1
+            stats[1] += duplicate
+            if (cluster not in self._traps and stats[0] >= self.min_pages
+                    and stats[1] >= self.trap_ratio * stats[0]):
+                self._traps[cluster] = None
+        return duplicate
+
+    def _verdict(self, url: str) -> str:
+        verdict = FETCH
+        for cluster in clusters(url):
+            if cluster in self._traps:
+                return DROP
+            stats = self._stats.get(cluster)
+            if stats and stats[1] and stats[1] >= self.suspect_ratio * stats[0]:
+                verdict = DEFER
+        return verdict
+
+    def route(self, url: str, via_duplicate: bool = False) -> str:
+        """
+        FETCH, DEFER (queue behind everything else) or DROP for a URL about
+        to be queued. Links found on a near-duplicate page are deferred too.
+        """
+        verdict = self._verdict(url)
+        if verdict == FETCH and via_duplicate:
+            verdict = DEFER
+        if verdict == DROP:
+            self.avoided += 1
+        elif verdict == DEFER:
+            self.deferred += 1
+        return verdict
+
+    def skip(self, url: str) -> bool:
+        """True (and counted as avoided) if a queued URL's cluster has become a trap since."""
+        if self._traps and self._verdict(url) == DROP:
+            self.avoided += 1
+            return True
+        return False
+
+    def traps(self) -> list[str]:
+        return list(self._traps)
+
+    def stats(self) -> dict:
+        return {"pages": self.pages, "near_duplicates": self.duplicates, "traps": self.traps(),
+                "deferred": self.deferred, "fetches_avoided": self.avoided}
+
+    def summary(self) -> str:
+        traps = self.traps()
+        shown = ", ".join(traps[:3]) + (f" (+{len(traps) - 3} more)" if len(traps) > 3 else "")
+        return (f"dedup: {self.duplicates}/{self.pages} page(s) near-duplicate, "
+                f"{len(traps)} crawl trap(s){f' ({shown})' if traps else ''}, "
+                f"{self.deferred} URL(s) deferred, {self.avoided} fetch(es) avoided")
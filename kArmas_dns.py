@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+kArmas_dns
+Asynchronous DNS stub resolver for the kArmas tools (stdlib only).
+Queries go out over one UDP socket per nameserver and are matched back
+by transaction id, so thousands of lookups can be in flight at once
+without a thread or a `dig`/`host` process each. Truncated answers are
+retried over TCP. resolve_many() streams results for bulk lists such as
+subdomain wordlists.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import socket
+import struct
+import time
+from typing import NamedTuple
+
+QTYPES = {"A": 1, "NS": 2, "CNAME": 5, "SOA": 6, "PTR": 12, "MX": 15, "TXT": 16, "AAAA": 28}
+QTYPE_NAMES = {v: k for k, v in QTYPES.items()}
+NOERROR, SERVFAIL, NXDOMAIN = 0, 2, 3
+RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+DEFAULT_NAMESERVERS = ["1.1.1.1", "8.8.8.8"]
+RESOLV_CONF = ("/etc/resolv.conf", os.path.join(os.environ.get("PREFIX", ""), "etc/resolv.conf"))  # Termux keeps it under $PREFIX
+DEFAULT_TIMEOUT = 2.0       # seconds per try
+DEFAULT_RETRIES = 2         # extra tries, rotating nameservers
+DEFAULT_CONCURRENCY = 200   # queries in flight (public resolvers rate-limit bursts beyond a few thousand/s)
+RECV_BUFFER = 1 << 20       # UDP receive buffer asked for, so reply bursts are not dropped
+
+
+class Record(NamedTuple):
+    type: str
+    value: str
+    ttl: int
+
+
+class Answer(NamedTuple):
+    name: str
+    rcode: int
+    records: list           # Record, CNAME chain included
+
+    @property
+    def ok(self) -> bool:
+        return self.rcode == NOERROR and bool(self.records)
+
+    def values(self, rdtype: str) -> list[str]:
+        return [r.value for r in self.records if r.type == rdtype]
+
+
+class DNSError(Exception):
+    pass
+
+
+def system_nameservers() -> list[str]:
+    for path in RESOLV_CONF:
+        try:
+            with open(path, encoding="utf-8") as f:
+                servers = [line.split()[1] for line in f
+                           if line.startswith("nameserver") and len(line.split()) > 1]
+        except OSError:
+            continue
+        if servers:
+            return servers
+    return list(DEFAULT_NAMESERVERS)
+
+
+# ─── Wire format (RFC 1035) ──────────────────────────────────
+def build_query(qid: int, name: str, qtype: int) -> bytes:
+    header = struct.pack(">HHHHHH", qid, 0x0100, 1, 0, 0, 0)      # RD=1, one question
+    labels = name.rstrip(".").encode("idna").split(b".") if name.strip(".") else []     # "" → root
+    qname = b"".join(bytes([len(label)]) + label for label in labels) + b"\0"
+    return header + qname + struct.pack(">HH", qtype, 1)
+
+
+def _read_name(data: bytes, offset: int) -> tuple[str, int]:
+    labels, end, jumps = [], None, 0
+    while True:
+        if offset >= len(data):
+            raise DNSError("name runs past the packet")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:                                 # compression pointer
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            jumps += 1
+            if jumps > 32:
+                raise DNSError("compression loop")
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode("ascii", "replace"))
+        offset += length
+    return ".".join(labels), end if end is not None else offset
+
+
+def _rdata(data: bytes, offset: int, rtype: int, length: int) -> str:
+    rd = data[offset:offset + length]
+    if rtype == 1 and length == 4:
+        return socket.inet_ntop(socket.AF_INET, rd)
+    if rtype == 28 and length == 16:
+        return socket.inet_ntop(socket.AF_INET6, rd)
+    if rtype in (2, 5, 12):
+        return _read_name(data, offset)[0]
+    if rtype == 15:
+        return f"{struct.unpack('>H', rd[:2])[0]} {_read_name(data, offset + 2)[0]}"
+    if rtype == 16:
+        parts, i = [], 0
+        while i < len(rd):
+            parts.append(rd[i + 1:i + 1 + rd[i]].decode("utf-8", "replace"))
+            i += 1 + rd[i]
+        return "".join(parts)
+    if rtype == 6:
+        mname, i = _read_name(data, offset)
+        rname, i = _read_name(data, i)
+        serial = struct.unpack(">I", data[i:i + 4])[0]
+        return f"{mname} {rname} {serial}"
+    return rd.hex()
+
+
+def parse_response(data: bytes) -> tuple[int, int, bool, str, list]:
+    """(id, rcode, truncated, question name, records)"""
+    if len(data) < 12:
+        raise DNSError("short packet")
+    qid, flags, qdcount, ancount, _, _ = struct.unpack(">HHHHHH", data[:12])
+    offset, qname = 12, ""
+    for _ in range(qdcount):
+        qname, offset = _read_name(data, offset)
+        offset += 4
+    records = []
+    for _ in range(ancount):
+        _, offset = _read_name(data, offset)
+        rtype, _, ttl, length = struct.unpack(">HHIH", data[offset:offset + 10])
+        offset += 10
+        if rtype in QTYPE_NAMES:
+            records.append(Record(QTYPE_NAMES[rtype], _rdata(data, offset, rtype, length), ttl))
+        offset += length
+    return qid, flags & 0x000F, bool(flags & 0x0200), qname, records
+
+
+# ─── Transport ───────────────────────────────────────────────
+class _UDPChannel(asyncio.DatagramProtocol):
+    """One connected UDP socket to one nameserver; replies are matched by id."""
+
+    def __init__(self):
+        self.transport = None
+        self.pending: dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+        sock = transport.get_extra_info("socket")
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)   # bursts of replies
+        except (OSError, AttributeError):
+            pass
+
+    def datagram_received(self, data, addr):
+        if len(data) < 2:
+            return
+        future = self.pending.get(struct.unpack(">H", data[:2])[0])
+        if future is not None and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        pass                                        # ICMP unreachable etc.: the query times out and is retried
+
+    def connection_lost(self, exc):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("DNS socket closed"))
+
+
+def _expire(future: asyncio.Future):
+    if not future.done():
+        future.set_exception(asyncio.TimeoutError())
+
+
+class Resolver:
+    """
+    async with Resolver() as resolver:
+        answer = await resolver.query("example.com", "MX")
+        async for answer in resolver.resolve_many(names):
+            ...
+    """
+
+    def __init__(self, nameservers: list[str] | None = None, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, concurrency: int = DEFAULT_CONCURRENCY, port: int = 53):
+        self.nameservers = nameservers or system_nameservers()
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.concurrency = concurrency
+        self.sent = 0
+        self.answered = 0
+        self.timeouts = 0
+        self.tcp = 0
+        self.elapsed = 0.0        # wall time spent in resolve_many
+        self._channels: dict[str, _UDPChannel] = {}
+        self._sem = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    async def _channel(self, server: str) -> _UDPChannel:
+        channel = self._channels.get(server)
+        if channel is None or channel.transport is None or channel.transport.is_closing():
+            loop = asyncio.get_running_loop()
+            family = socket.AF_INET6 if ":" in server else socket.AF_INET
+            _, channel = await loop.create_datagram_endpoint(_UDPChannel, remote_addr=(server, self.port), family=family)
+            self._channels[server] = channel
+        return channel
+
+    async def _udp(self, server: str, name: str, qtype: int) -> bytes:
+        channel = await self._channel(server)
+        qid = random.getrandbits(16)
+        while qid in channel.pending:
+            qid = random.getrandbits(16)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        channel.pending[qid] = future
+        timer = loop.call_later(self.timeout, _expire, future)    # a timer handle, cheaper than wait_for()'s task
+        try:
+            channel.transport.sendto(build_query(qid, name, qtype))
+            self.sent += 1
+            return await future
+        finally:
+            timer.cancel()
+            channel.pending.pop(qid, None)
+
+    async def _tcp(self, server: str, name: str, qtype: int) -> bytes:
+        self.tcp += 1
+        query = build_query(random.getrandbits(16), name, qtype)
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(server, self.port), self.timeout)
+        try:
+            writer.write(struct.pack(">H", len(query)) + query)
+            await writer.drain()
+            length = struct.unpack(">H", await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            return await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        finally:
+            writer.close()
+
+    async def query(self, name: str, rdtype: str = "A") -> Answer:
+        """One lookup. NXDOMAIN is an answer (rcode 3), not an error; DNSError after all tries time out."""
+        qtype = QTYPES[rdtype.upper()]
+        try:
+            name = name.rstrip(".").lower().encode("idna").decode("ascii")
+        except UnicodeError as e:
+            raise DNSError(f"{name!r}: {e}")
+        async with self._sem:
+            last = None
+            for attempt in range(self.retries + 1):
+                server = self.nameservers[attempt % len(self.nameservers)]
+                try:
+                    data = await self._udp(server, name, qtype)
+                    _, rcode, truncated, qname, records = parse_response(data)
+                    if qname.lower() != name:
+                        raise DNSError(f"answer for {qname!r}, asked {name!r}")
+                    if truncated:
+                        _, rcode, _, _, records = parse_response(await self._tcp(server, name, qtype))
+                    if rcode == SERVFAIL and attempt < self.retries:
+                        continue
+                    self.answered += 1
+                    return Answer(name, rcode, records)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    last = DNSError(f"{name} {rdtype}: timeout")
+                except (OSError, DNSError, struct.error, IndexError) as e:
+                    last = DNSError(f"{name} {rdtype}: {e}")
+            raise last
+
+    async def resolve(self, name: str, rdtype: str = "A") -> list[str]:
+        """Values of the requested type ([] for NXDOMAIN / no data / failure)."""
+        try:
+            return (await self.query(name, rdtype)).values(rdtype.upper())
+        except DNSError:
+            return []
+
+    async def resolve_many(self, names, rdtype: str = "A"):
+        """Yield an Answer per name as they complete (failed lookups are skipped), `concurrency` in flight."""
+        start = time.perf_counter()
+        names = iter(names)                     # shared: each worker takes the next name when it is free
+        results = asyncio.Queue()
+        finished = object()
+
+        async def worker():
+            for name in names:
+                try:
+                    results.put_nowait(await self.query(name, rdtype))
+                except DNSError:
+                    pass
+            results.put_nowait(finished)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            running = len(workers)
+            while running:
+                answer = await results.get()
+                if answer is finished:
+                    running -= 1
+                else:
+                    yield answer
+        finally:
+            for task in workers:
+                task.cancel()
+            self.elapsed += time.perf_counter() - start
+
+    def summary(self) -> str:
+        rate = f", {self.answered / self.elapsed:,.0f}/s" if self.elapsed else ""
+        return (f"dns: {self.sent} quer(ies) to {', '.join(self.nameservers)}, {self.answered} answered, "
+                f"{self.timeouts} timeout(s), {self.tcp} over TCP{rate}")
+
+    def close(self):
+        for channel in self._channels.values():
+            if channel.transport is not None:
+                channel.transport.close()
+        self._channels.clear()
+
+
+if __name__ == "__main__":
+    # python kArmas_dns.py example.com MX
+    import sys
+
+    async def _main():
+        async with Resolver() as resolver:
+            answer = await resolver.query(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "A")
+            print(RCODES.get(answer.rcode, answer.rcode))
+            for record in answer.records:
+                print(f"{record.type:6} {record.ttl:>6}  {record.value}")
+
+    asyncio.run(_main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+kArmas_httpcache
+Persistent HTTP response cache shared by the kArmas tools.
+SQLite on disk, TTL + size-based LRU eviction, ETag/Last-Modified
+revalidation (unchanged pages come back as 304 with no body).
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+DEFAULT_CACHE     = os.path.join(os.path.expanduser("~"), ".cache", "kArmas", "http_cache.sqlite")
+DEFAULT_TTL       = 6 * 3600             # seconds an entry is served without asking the server
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024    # total body bytes before LRU eviction kicks in
+MAX_ENTRY_BYTES   = 4 * 1024 * 1024      # larger bodies aren't cached by requests_get (kept out of memory)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url           TEXT PRIMARY KEY,
+    final_url     TEXT,
+    status        INTEGER,
+    etag          TEXT,
+    last_modified TEXT,
+    encoding      TEXT,
+    body          BLOB,
+    size          INTEGER,
+    complete      INTEGER,
+    stored_at     REAL,
+    last_access   REAL,
+    content_type  TEXT
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_access);
+"""
+
+
+class CacheEntry(NamedTuple):
+    url: str
+    final_url: str
+    status: int
+    etag: str | None
+    last_modified: str | None
+    encoding: str | None
+    body: bytes
+    complete: bool
+    stored_at: float
+    content_type: str | None = None
+
+    def text(self) -> str:
+        return self.body.decode(self.encoding or "utf-8", errors="replace")
+
+
+class ResponseCache:
+    """
+    Thread-safe (one connection + lock) so the threaded scraper and
+    username checker can share one instance.
+    `complete=False` marks bodies that were only partly read (capped
+    streaming reads); callers that need the whole page skip those.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0            # fresh entry served, no request sent
+        self.revalidated = 0     # 304 Not Modified
+        self.misses = 0          # full body downloaded and stored
+        self.no_store = 0        # full body downloaded, Cache-Control: no-store
+        self.bytes_saved = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # timeout: sharded job-queue workers share one cache file, wait for each other's writes
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        if "content_type" not in self._columns():     # cache file from before content_type was kept
+            try:
+                self._db.execute("ALTER TABLE responses ADD COLUMN content_type TEXT")
+            except sqlite3.OperationalError:
+                if "content_type" not in self._columns():   # not just another worker adding it first
+                    raise
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _columns(self) -> set:
+        return {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+
+    # ── lookups ──────────────────────────────────────────────
+    def get(self, url: str, complete: bool = True) -> CacheEntry | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, final_url, status, etag, last_modified, encoding, body, complete, stored_at, content_type "
+                "FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            entry = CacheEntry(*row[:7], bool(row[7]), *row[8:])
+            if complete and not entry.complete:
+                return None
+            if not self.fresh(entry) and not (entry.etag or entry.last_modified):
+                self._delete(url)            # stale and can't be revalidated
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            return entry
+
+    def fresh(self, entry: CacheEntry | None) -> bool:
+        return entry is not None and time.time() - entry.stored_at < self.ttl
+
+    @staticmethod
+    def validators(entry: CacheEntry | None) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    # ── bookkeeping ──────────────────────────────────────────
+    def hit(self, entry: CacheEntry):
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += len(entry.body)
+
+    def not_modified(self, entry: CacheEntry):
+        """Server answered 304 – restart the entry's TTL."""
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(entry.body)
+            self._db.execute("UPDATE responses SET stored_at = ? WHERE url = ?", (time.time(), entry.url))
+            self._db.commit()
+
+    def put(self, url: str, status: int, headers, body: bytes, encoding: str | None = None,
+            final_url: str | None = None, complete: bool = True):
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        cache_control = (headers.get("Cache-Control") or "").lower()
+        if "no-store" in cache_control:
+            with self._lock:
+                self.no_store += 1
+            return
+        now = time.time()
+        with self._lock:
+            self.misses += 1
+            old = self._db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._size -= old[0] if old else 0
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (url, final_url, status, etag, last_modified, encoding, "
+                "body, size, complete, stored_at, last_access, content_type) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, final_url or url, status, etag, last_modified, encoding,
+                 body, len(body), int(complete), now, now, headers.get("Content-Type")))
+            self._size += len(body)
+            if self._size > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _delete(self, url: str):
+        row = self._db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+        if row:
+            self._size -= row[0]
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until 90% of the size budget."""
+        target = self.max_bytes * 0.9
+        rows = self._db.execute("SELECT url, size FROM responses ORDER BY last_access")
+        victims = []
+        for url, size in rows:
+            if self._size <= target:
+                break
+            victims.append((url,))
+            self._size -= size
+        self._db.executemany("DELETE FROM responses WHERE url = ?", victims)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "no_store": self.no_store,
+            "bytes_saved": self.bytes_saved,
+            "cache_bytes": self._size,
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return (f"cache: {s['hits']} hit(s), {s['revalidated']} 304(s), {s['misses']} miss(es), "
+                f"{s['bytes_saved']:,} bytes saved")
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+
+# ─── requests helper ─────────────────────────────────────────
+def requests_get(session, url: str, cache: ResponseCache | None = None, max_entry: int = MAX_ENTRY_BYTES,
+                 **kwargs):
+    """
+    Drop-in for session.get(url, **kwargs). Fresh entries are served
+    without a request, stale ones revalidated; a 304 is turned back into
+    a 200 response carrying the cached body.
+    With stream=True the body is copied into the cache as the caller reads
+    it (stored once fully read); bodies over `max_entry` bytes are not cached.
+    """
+    if cache is None:
+        return session.get(url, **kwargs)
+
+    entry = cache.get(url)
+    if cache.fresh(entry):
+        cache.hit(entry)
+        return _cached_response(entry)
+
+    headers = {**kwargs.pop("headers", {}), **cache.validators(entry)}
+    r = session.get(url, headers=headers, **kwargs)
+    if r.status_code == 304 and entry is not None:
+        r.close()                                 # hand the connection back to the pool
+        cache.not_modified(entry)
+        return _cached_response(entry)
+    if r.status_code == 200:
+        if kwargs.get("stream"):
+            _tee_into_cache(r, cache, url, max_entry)
+        elif len(r.content) <= max_entry:
+            cache.put(url, r.status_code, r.headers, r.content, r.encoding, final_url=r.url)
+    return r
+
+
+def _tee_into_cache(r, cache: ResponseCache, url: str, max_entry: int):
+    """Wrap r.iter_content (r.content goes through it too) to cache the body once it has been read to the end."""
+    iter_content = r.iter_content
+
+    def tee(chunk_size=1, decode_unicode=False):
+        chunks, size = ([] if not decode_unicode else None), 0
+        for chunk in iter_content(chunk_size, decode_unicode):
+            if chunks is not None:
+                size += len(chunk)
+                if size > max_entry:
+                    chunks = None                 # too big to keep: just pass it through
+                else:
+                    chunks.append(chunk)
+            yield chunk
+        if chunks is not None:
+            cache.put(url, r.status_code, r.headers, b"".join(chunks), r.encoding, final_url=r.url)
+
+    r.iter_content = tee
+
+
+def _cached_response(entry: CacheEntry):
+    from requests.models import Response
+    from requests.structures import CaseInsensitiveDict
+
+    r = Response()
+    r.status_code = entry.status
+    r.url = entry.final_url
+    r.encoding = entry.encoding
+    r._content = entry.body
+    r._content_consumed = True                # no raw stream behind it: iter_content/close use _content
+    headers = {"Content-Type": entry.content_type, "ETag": entry.etag,
+               "Last-Modified": entry.last_modified, "X-Cache": "HIT"}
+    r.headers = CaseInsensitiveDict({k: v for k, v in headers.items() if v})
+    return r
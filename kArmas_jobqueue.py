@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+kArmas_jobqueue
+Sharded execution of kArmas_ultimate_osint over a local job queue.
+A target list becomes one SQLite job per target × site (plus the email
+reputation lookup). Worker processes – each with its own event loop,
+session and host controller – claim jobs in batches under a lease, renew
+the leases while the checks run and hand results back in batches. A
+worker that dies simply lets its leases expire and the jobs are claimed
+again (at-least-once; a job that keeps killing workers is failed after
+MAX_ATTEMPTS). merge writes one report per target, same JSONL as --batch.
+
+Any process that can open the queue file can work it: more machines can
+join over a shared filesystem with working POSIX locks, the claim /
+extend / complete calls being the only contract a networked backend has
+to provide. Note that per-host limits are per worker process.
+
+  python kArmas_jobqueue.py enqueue targets.txt --tags all
+  python kArmas_jobqueue.py work -w 4
+  python kArmas_jobqueue.py merge -o results.jsonl
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from kArmas_sites import DEFAULT_SITES, load_sites, parse_tags
+
+DEFAULT_QUEUE  = "kArmas_jobs.sqlite"
+DEFAULT_LEASE  = 120          # seconds a claimed job stays with its worker without renewal
+MAX_ATTEMPTS   = 5            # claims before a job is given up (worker crashes, not site errors)
+CONCURRENCY    = 64           # jobs in flight per worker process
+FLUSH_INTERVAL = 0.5          # seconds between result writes
+FLUSH_BATCH    = 200          # … or this many results, whichever first
+IDLE_POLL      = 0.25         # seconds between looks for finished or expired leases once nothing is queued
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT
+);
+CREATE TABLE IF NOT EXISTS targets (
+    seq     INTEGER PRIMARY KEY,
+    target  TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id           INTEGER PRIMARY KEY,
+    target       TEXT NOT NULL,
+    site         TEXT NOT NULL,
+    kind         TEXT NOT NULL,
+    state        TEXT NOT NULL DEFAULT 'queued',    -- queued | leased | done | failed
+    worker       TEXT,
+    lease_until  REAL NOT NULL DEFAULT 0,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    result       TEXT,
+    UNIQUE (target, site)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs(state, lease_until);
+"""
+
+
+class Job(NamedTuple):
+    id: int
+    target: str
+    site: str
+    kind: str           # username | email | reputation
+
+
+class JobQueue:
+    """One connection per process; every write is a short IMMEDIATE transaction."""
+
+    def __init__(self, path: str = DEFAULT_QUEUE, lease: float = DEFAULT_LEASE):
+        self.path = path
+        self.lease = lease
+        self._db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")          # workers read while one writes
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def _write(self):
+        return _Transaction(self._db)
+
+    def meta(self, key: str, default=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    # ── producer ─────────────────────────────────────────────
+    def enqueue(self, targets, sites_path: str = DEFAULT_SITES, tags=None) -> tuple[int, int]:
+        """Jobs for every target × site of its kind; already queued pairs are kept. → (targets, new jobs)"""
+        from kArmas_ultimate_osint import REPUTATION_SITE, is_email
+
+        names = {kind: list(load_sites(kind, tags, sites_path)) for kind in ("username", "email")}
+        count = added = 0
+        with self._write() as db:
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('sites', ?)", (json.dumps(os.path.abspath(sites_path)),))
+            for target in targets:
+                kind = "email" if is_email(target) else "username"
+                jobs = [(target, site, kind) for site in names[kind]]
+                if kind == "email":
+                    jobs.append((target, REPUTATION_SITE, "reputation"))
+                db.execute("INSERT OR IGNORE INTO targets (target) VALUES (?)", (target,))
+                before = db.total_changes
+                db.executemany("INSERT OR IGNORE INTO jobs (target, site, kind) VALUES (?, ?, ?)", jobs)
+                added += db.total_changes - before
+                count += 1
+        return count, added
+
+    # ── workers ──────────────────────────────────────────────
+    def claim(self, worker: str, limit: int) -> list[Job]:
+        """Lease up to `limit` jobs: expired leases first, then queued ones in order."""
+        now = time.time()
+        with self._write() as db:
+            expired = db.execute(
+                "SELECT id, target, site, kind, attempts FROM jobs WHERE state = 'leased' AND lease_until < ? "
+                "ORDER BY lease_until LIMIT ?", (now, limit)).fetchall()
+            given_up = [row for row in expired if row[4] >= MAX_ATTEMPTS]
+            db.executemany("UPDATE jobs SET state = 'failed', result = ? WHERE id = ?",
+                           [(json.dumps({"site": site, "exists": False, "error": f"gave up after {attempts} attempt(s)"}),
+                             job_id) for job_id, _, site, _, attempts in given_up])
+            jobs = [Job(*row[:4]) for row in expired if row[4] < MAX_ATTEMPTS]
+            if len(jobs) < limit:
+                jobs += [Job(*row) for row in db.execute(
+                    "SELECT id, target, site, kind FROM jobs WHERE state = 'queued' "
+                    "ORDER BY lease_until, id LIMIT ?", (limit - len(jobs),))]
+            db.executemany("UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                           "WHERE id = ?", [(worker, now + self.lease, job.id) for job in jobs])
+        return jobs
+
+    def extend(self, worker: str, ids):
+        """Renew the leases `worker` still holds on `ids`."""
+        with self._write() as db:
+            db.executemany("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                           [(time.time() + self.lease, job_id, worker) for job_id in ids])
+
+    def complete(self, results) -> int:
+        """Store (job id, result dict) pairs → jobs newly done. The first result for a job wins (a re-run after a lost lease is a no-op)."""
+        with self._write() as db:
+            return db.executemany("UPDATE jobs SET state = 'done', result = ?, lease_until = 0 "
+                           "WHERE id = ? AND state IN ('queued', 'leased')",
+                           [(json.dumps(result, separators=(",", ":")), job_id) for job_id, result in results]).rowcount
+
+    def remaining(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'leased')").fetchone()[0]
+
+    # ── reporting ────────────────────────────────────────────
+    def status(self) -> dict:
+        counts = dict(self._db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+        return {state: counts.get(state, 0) for state in ("queued", "leased", "done", "failed")}
+
+    def summary(self) -> str:
+        s = self.status()
+        return (f"queue: {s['done']} done, {s['failed']} failed, {s['leased']} leased, {s['queued']} queued "
+                f"({self.path})")
+
+    def merge(self, out, partial: bool = False) -> tuple[int, int]:
+        """One build_report() line per target, in enqueue order; unfinished targets only with partial. → (written, skipped)"""
+        from kArmas_ultimate_osint import build_report
+
+        written = skipped = 0
+        for (target,) in self._db.execute("SELECT target FROM targets ORDER BY seq").fetchall():
+            rows = self._db.execute("SELECT kind, state, result FROM jobs WHERE target = ?", (target,)).fetchall()
+            if not partial and any(state not in ("done", "failed") for _, state, _ in rows):
+                skipped += 1
+                continue
+            checks = [(kind, json.loads(result)) for kind, state, result in rows if result is not None]
+            out.write(json.dumps(build_report(target, checks)) + "\n")
+            written += 1
+        out.flush()
+        return written, skipped
+
+    def close(self):
+        self._db.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE … COMMIT (ROLLBACK on error): takes the write lock up front, so claims never interleave."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, *exc):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+# ─── Worker process ──────────────────────────────────────────
+async def check_job(session, job: Job, registry: dict, cache=None, controller=None):
+    import kArmas_ultimate_osint as ultimate
+
+    if job.kind == "reputation":
+        return await ultimate.email_reputation(session, job.target, controller)
+    site_info = registry[job.kind].get(job.site)
+    if site_info is None:
+        return {"site": job.site, "exists": False, "error": "site no longer in the registry"}
+    if job.kind == "email":
+        return await ultimate.check_email_registration(session, job.target, job.site, site_info, controller)
+    return await ultimate.check_username_site(session, job.target, job.site, site_info, cache, controller)
+
+
+async def work(path: str, worker: str, concurrency: int = CONCURRENCY, max_concurrent: int = 30,
+               lease: float = DEFAULT_LEASE, cache_path: str | None = None) -> int:
+    """Claim and run jobs until the queue is drained; returns jobs completed by this worker."""
+    from kArmas_httpcache import ResponseCache
+    from kArmas_netcache import NET
+    from kArmas_ultimate_osint import HostController, make_session
+
+    queue = JobQueue(path, lease)
+    sites_path = queue.meta("sites", DEFAULT_SITES)
+    registry = {kind: load_sites(kind, None, sites_path) for kind in ("username", "email")}
+    cache = ResponseCache(cache_path) if cache_path else None
+    controller = HostController()
+    loop = asyncio.get_running_loop()
+    db = ThreadPoolExecutor(max_workers=1)       # queue I/O waits on other workers' locks, never on the loop
+    running: dict[asyncio.Task, Job] = {}
+    finished = []
+    flushed = renewed = time.monotonic()
+    completed = 0
+
+    async def flush():
+        nonlocal flushed, completed
+        if finished:
+            batch = finished[:]
+            finished.clear()
+            completed += await loop.run_in_executor(db, queue.complete, batch)
+        flushed = time.monotonic()
+
+    try:
+        async with make_session(max_concurrent, net=NET) as session:
+            while True:
+                if len(running) <= concurrency // 2:          # refill in batches, not one claim per job
+                    for job in await loop.run_in_executor(db, queue.claim, worker, concurrency - len(running)):
+                        running[asyncio.create_task(check_job(session, job, registry, cache, controller))] = job
+                if not running:
+                    await flush()
+                    if not await loop.run_in_executor(db, queue.remaining):
+                        break
+                    await asyncio.sleep(IDLE_POLL)            # others hold the rest; take over any that expire
+                    continue
+                done, _ = await asyncio.wait(running, timeout=FLUSH_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    finished.append((running.pop(task).id, task.result()))
+                if len(finished) >= FLUSH_BATCH or time.monotonic() - flushed >= FLUSH_INTERVAL:
+                    await flush()
+                if running and time.monotonic() - renewed >= lease / 3:
+                    await loop.run_in_executor(db, queue.extend, worker, [job.id for job in running.values()])
+                    renewed = time.monotonic()
+            await flush()
+    finally:
+        for task in running:
+            task.cancel()
+        db.shutdown()
+        queue.close()
+        if cache:
+            cache.close()
+    return completed
+
+
+def _worker_main(path, index, concurrency, max_concurrent, lease, cache_path):
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        count = asyncio.run(work(path, worker, concurrency, max_concurrent, lease, cache_path))
+    except KeyboardInterrupt:
+        return
+    print(f"worker {index} ({worker}): {count} job(s)", file=sys.stderr)
+
+
+def run_workers(path: str, workers: int, concurrency: int = CONCURRENCY, max_concurrent: int = 30,
+                lease: float = DEFAULT_LEASE, cache_path: str | None = None):
+    """Drain the queue with `workers` processes (one event loop each)."""
+    procs = [multiprocessing.Process(target=_worker_main, args=(path, i, concurrency, max_concurrent, lease, cache_path))
+             for i in range(workers)]
+    for proc in procs:
+        proc.start()
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        for proc in procs:
+            proc.terminate()
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sharded kArmas_ultimate_osint runs over a local job queue")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE, help=f"Queue database (default {DEFAULT_QUEUE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Add target × site jobs from FILE (one target per line, '-' = stdin)")
+    enqueue.add_argument("file")
+    enqueue.add_argument("--tags", help="Comma-separated site tags (default core; 'all' = every site)")
+    enqueue.add_argument("--sites", default=DEFAULT_SITES, help="Site registry file (default kArmas_sites.json)")
+
+    worker = commands.add_parser("work", help="Run worker processes until every job is done")
+    worker.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 2, help="Worker processes (default: one per core)")
+    worker.add_argument("-c", "--concurrency", type=int, default=CONCURRENCY, help=f"Jobs in flight per worker (default {CONCURRENCY})")
+    worker.add_argument("--max-concurrent", type=int, default=30, help="In-flight requests per worker (default 30)")
+    worker.add_argument("--lease", type=float, default=DEFAULT_LEASE, help=f"Lease seconds before a silent worker's jobs are retaken (default {DEFAULT_LEASE})")
+    worker.add_argument("--cache-path", help="Share this response cache database between workers")
+
+    merge = commands.add_parser("merge", help="Write one JSONL report per finished target")
+    merge.add_argument("-o", "--output", help="Output file (default stdout)")
+    merge.add_argument("--partial", action="store_true", help="Include targets whose jobs are not all finished yet")
+
+    commands.add_parser("status", help="Job counts per state")
+    args = parser.parse_args()
+
+    queue = JobQueue(args.queue)
+    if args.command == "enqueue":
+        from kArmas_ultimate_osint import DEFAULT_TAGS
+
+        tags = parse_tags(args.tags) or DEFAULT_TAGS
+        source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+        targets = (line for line in map(str.strip, source) if line and not line.startswith("#"))
+        count, added = queue.enqueue(targets, args.sites, None if tags == ["all"] else tags)
+        print(f"{count} target(s), {added} new job(s)", file=sys.stderr)
+    elif args.command == "work":
+        start = time.perf_counter()
+        before = queue.status()["done"]
+        run_workers(args.queue, args.workers, args.concurrency, args.max_concurrent, args.lease, args.cache_path)
+        done = queue.status()["done"] - before
+        elapsed = time.perf_counter() - start
+        print(f"{done} job(s) in {elapsed:.1f}s ({done / elapsed:.0f}/s) with {args.workers} worker(s)", file=sys.stderr)
+    elif args.command == "merge":
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        written, skipped = queue.merge(out, args.partial)
+        if out is not sys.stdout:
+            out.close()
+        print(f"{written} target(s) written" + (f", {skipped} unfinished skipped" if skipped else ""), file=sys.stderr)
+    print(queue.summary(), file=sys.stderr)
+    queue.close()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+kArmas_links
+Streaming link extraction for the kArmas scraper.
+An event-driven tokenizer (lxml's HTMLPullParser when lxml is installed,
+else html.parser) only looks at <a>/<area>/<base>/<link>/<meta> start
+tags, so no DOM is built. Honours <base href>, rel=nofollow, rel=canonical
+and <meta name=robots content=nofollow>. Text can be fed chunk by chunk
+while the page is still downloading.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+from html.parser import HTMLParser
+from typing import NamedTuple
+from urllib.parse import urljoin, urlsplit
+
+try:
+    from lxml import etree
+except ImportError:          # optional: pip install lxml
+    etree = None
+
+BACKENDS = ("lxml", "html.parser") if etree is not None else ("html.parser",)
+DEFAULT_BACKEND = BACKENDS[0]
+LINK_TAGS = frozenset(("a", "area", "base", "link", "meta"))
+SKIP_SCHEMES = ("mailto:", "tel:", "javascript:", "data:", "#")
+
+
+class PageLinks(NamedTuple):
+    links: set            # absolute, fragment-free, same-host (unless asked otherwise)
+    canonical: str | None
+    nofollow: bool        # page-level <meta name=robots content=nofollow>
+    skipped: int          # rel=nofollow links left out
+
+
+class _Tokenizer(HTMLParser):
+    def __init__(self, on_start):
+        super().__init__(convert_charrefs=True)
+        self._on_start = on_start
+
+    def handle_starttag(self, tag, attrs):
+        if tag in LINK_TAGS:
+            self._on_start(tag, dict(attrs))
+
+
+class LinkExtractor:
+    """
+    feed() page text as it arrives, then result(). Relative hrefs are kept
+    raw and resolved at the end, so a <base href> anywhere in the page
+    applies to every link (as in a browser).
+    """
+
+    def __init__(self, page_url: str, backend: str = DEFAULT_BACKEND):
+        if backend not in BACKENDS:
+            raise ValueError(f"link backend {backend!r} not available (have {', '.join(BACKENDS)})")
+        self.page_url = page_url
+        self.base = page_url
+        self.canonical = None
+        self.nofollow = False
+        self.skipped = 0
+        self._hrefs = []
+        self._base_seen = False
+        if backend == "lxml":
+            self._pull = etree.HTMLPullParser(events=("start", "end"))
+            self._parser = None
+        else:
+            self._pull = None
+            self._parser = _Tokenizer(self._start)
+
+    def feed(self, text: str):
+        if self._parser is not None:
+            self._parser.feed(text)
+            return
+        self._pull.feed(text)
+        self._drain()
+
+    def close(self):
+        if self._parser is not None:
+            self._parser.close()
+        else:
+            self._pull.close()
+            self._drain()
+
+    def _drain(self):
+        for event, el in self._pull.read_events():
+            if event == "start":
+                if isinstance(el.tag, str) and el.tag in LINK_TAGS:
+                    self._start(el.tag, el.attrib)
+            else:
+                el.clear(keep_tail=False)       # nothing below is needed again: keep the tree flat
+
+    def _start(self, tag, attrs):
+        if tag in ("a", "area"):
+            href = (attrs.get("href") or "").strip()
+            if not href or href.startswith(SKIP_SCHEMES):
+                return
+            if "nofollow" in (attrs.get("rel") or "").lower().split():
+                self.skipped += 1
+                return
+            self._hrefs.append(href)
+        elif tag == "base":
+            href = (attrs.get("href") or "").strip()
+            if href and not self._base_seen:    # only the first <base> counts
+                self._base_seen = True
+                self.base = urljoin(self.page_url, href)
+        elif tag == "link":
+            if "canonical" in (attrs.get("rel") or "").lower().split() and attrs.get("href"):
+                self.canonical = attrs["href"].strip()
+        elif tag == "meta":
+            if (attrs.get("name") or "").lower() == "robots" and "nofollow" in (attrs.get("content") or "").lower():
+                self.nofollow = True
+
+    def result(self, same_host: bool = True) -> PageLinks:
+        canonical = urljoin(self.base, self.canonical).split("#")[0] if self.canonical else None
+        if self.nofollow:
+            return PageLinks(set(), canonical, True, self.skipped + len(self._hrefs))
+        base = self.base
+        host = urlsplit(self.page_url).netloc
+        base_host = urlsplit(base).netloc
+        links = set()
+        for href in self._hrefs:
+            full = urljoin(base, href).split("#")[0]
+            if "//" in href[:8] or ":" in href.split("/", 1)[0]:
+                parts = urlsplit(full)               # absolute / protocol-relative: check it
+                if parts.scheme not in ("http", "https") or (same_host and parts.netloc != host):
+                    continue
+            elif same_host and base_host != host:    # relative, but <base> points elsewhere
+                continue
+            links.add(full)
+        return PageLinks(links, canonical, False, self.skipped)
+
+
+def extract_links(page_url: str, html: str, same_host: bool = True, backend: str = DEFAULT_BACKEND) -> PageLinks:
+    """Links of a whole page in one call."""
+    extractor = LinkExtractor(page_url, backend)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.result(same_host)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+kArmas_matcher
+Streaming indicator matcher for the kArmas OSINT tools.
+All indicators of a site are compiled once into a single case-insensitive
+regex; response bodies are decoded, tag-stripped and scanned chunk by chunk,
+so a check can stop reading as soon as its verdict is known instead of
+building a full BeautifulSoup tree for every response.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import codecs
+import html
+import re
+from functools import lru_cache
+
+CHUNK_SIZE = 16 * 1024
+RAW_TEXT_TAGS = ("script", "style")      # their contents are not page text (as with get_text)
+
+
+class IndicatorMatcher:
+    """
+    Lower-cased indicators compiled into one alternation, longest first.
+    The regex is compiled on first use and not pickled, so large site
+    registries load fast and only pay for the sites actually checked.
+    """
+
+    def __init__(self, indicators):
+        self.indicators = tuple(dict.fromkeys(i.lower() for i in indicators if i))
+        ordered = sorted(self.indicators, key=len, reverse=True)
+        self.pattern = "|".join(map(re.escape, ordered))
+        self.overlap = max(map(len, ordered), default=1) - 1
+        self._re = None
+
+    def __bool__(self) -> bool:
+        return bool(self.pattern)
+
+    def __getstate__(self):
+        return {**self.__dict__, "_re": None}
+
+    def search(self, text: str) -> str | None:
+        """First indicator found in already lower-cased `text`."""
+        if not self.pattern:
+            return None
+        if self._re is None:
+            self._re = re.compile(self.pattern)
+        m = self._re.search(text)
+        return m.group(0) if m else None
+
+
+@lru_cache(maxsize=None)
+def get_matcher(indicators: tuple) -> IndicatorMatcher:
+    return IndicatorMatcher(indicators)
+
+
+class TextStripper:
+    """
+    Incremental markup stripper for lower-cased input: drops tags and
+    <script>/<style> bodies, unescapes entities, and carries incomplete
+    tags/entities over to the next chunk.
+    """
+
+    MAX_PENDING = 8192    # give up on absurdly long "tags" instead of buffering them
+
+    def __init__(self):
+        self._pending = ""
+        self._raw = None   # inside <script>/<style>: name of the closing tag we wait for
+
+    def feed(self, data: str) -> str:
+        data = self._pending + data
+        self._pending = ""
+        out = []
+        i, n = 0, len(data)
+        while i < n:
+            if self._raw:
+                j = data.find("</" + self._raw, i)
+                if j < 0:
+                    self._pending = data[max(i, n - len(self._raw) - 1):]
+                    break
+                self._raw = None
+                i = j
+                continue
+            j = data.find("<", i)
+            if j < 0:
+                out.append(data[i:])
+                break
+            out.append(data[i:j])
+            k = data.find(">", j)
+            if k < 0:
+                if n - j < self.MAX_PENDING:
+                    self._pending = data[j:]
+                break
+            name = data[j + 1:k].split(None, 1)[0] if k > j + 1 else ""
+            if name in RAW_TEXT_TAGS:
+                self._raw = name
+            i = k + 1
+
+        text = "".join(out)
+        amp = text.rfind("&")
+        if amp >= 0 and ";" not in text[amp:] and len(text) - amp < 12:
+            self._pending = text[amp:] + self._pending
+            text = text[:amp]
+        return html.unescape(text).lower() if "&" in text else text
+
+    def flush(self) -> str:
+        rest, self._pending = ("" if self._raw else self._pending), ""
+        return html.unescape(rest).lower() if not rest.startswith("<") else ""
+
+
+class BodyScanner:
+    """
+    Feeds one response body through a set of named matchers.
+      hits[name]  → first indicator of that matcher found (or None)
+      head        → first `keep` characters of the decoded body (for snippets)
+    feed() returns True once a matcher listed in `stop_on` has hit, i.e. the
+    caller can stop reading the body.
+    """
+
+    def __init__(self, matchers: dict, encoding: str | None = "utf-8", strip_tags: bool = True,
+                 stop_on=(), keep: int = 200):
+        self.matchers = {name: m for name, m in matchers.items() if m}
+        self.hits = dict.fromkeys(matchers)
+        self.stop_on = set(stop_on)
+        self.keep = keep
+        self.head = ""
+        self.nbytes = 0
+        self.nchars = 0
+        self.stopped = False
+        self._decoder = codecs.getincrementaldecoder(_codec(encoding))(errors="replace")
+        self._stripper = TextStripper() if strip_tags else None
+        self._tails = dict.fromkeys(self.matchers, "")
+
+    @property
+    def needs_body(self) -> bool:
+        """False when there is nothing to look for (verdict doesn't depend on the body)."""
+        return bool(self.matchers)
+
+    def feed(self, data: bytes) -> bool:
+        self.nbytes += len(data)
+        return self._feed_text(self._decoder.decode(data))
+
+    def finish(self):
+        self._feed_text(self._decoder.decode(b"", final=True))
+        if self._stripper:
+            self._scan(self._stripper.flush())
+
+    def _feed_text(self, text: str) -> bool:
+        if len(self.head) < self.keep:
+            self.head += text[:self.keep - len(self.head)]
+        self.nchars += len(text)
+        text = text.lower()
+        if self._stripper:
+            text = self._stripper.feed(text)
+        return self._scan(text)
+
+    def _scan(self, text: str) -> bool:
+        if not text:
+            return self.stopped
+        for name, matcher in self.matchers.items():
+            if self.hits[name] is not None:
+                continue
+            window = self._tails[name] + text
+            hit = matcher.search(window)
+            if hit is not None:
+                self.hits[name] = hit
+                if name in self.stop_on:
+                    self.stopped = True
+            else:
+                self._tails[name] = window[-matcher.overlap:] if matcher.overlap else ""
+        return self.stopped
+
+
+def _codec(encoding: str | None) -> str:
+    try:
+        return codecs.lookup(encoding or "utf-8").name
+    except LookupError:
+        return "utf-8"
+
+
+async def scan_response(response, scanner: BodyScanner, limit: int | None = None,
+                        sink: list | None = None) -> BodyScanner:
+    """
+    Stream an aiohttp response body into `scanner` until it can stop or
+    `limit` bytes were read. Raw chunks are appended to `sink` if given.
+    """
+    if scanner.needs_body:
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            if sink is not None:
+                sink.append(chunk)
+            if scanner.feed(chunk) or (limit and scanner.nbytes >= limit):
+                break
+    scanner.finish()
+    return scanner
+
+
+def scan_iter(chunks, scanner: BodyScanner, limit: int | None = None,
+              sink: list | None = None) -> BodyScanner:
+    """Same as scan_response for a blocking iterator of byte chunks (requests' iter_content)."""
+    if scanner.needs_body:
+        for chunk in chunks:
+            if sink is not None:
+                sink.append(chunk)
+            if scanner.feed(chunk) or (limit and scanner.nbytes >= limit):
+                break
+    scanner.finish()
+    return scanner
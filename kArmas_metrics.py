@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+kArmas_metrics
+Per-site / per-stage latency histograms for the kArmas tools.
+Stages: slot (waiting on the per-host limiter), queue (waiting for a
+pooled connection), dns, connect (TCP),
+tls, ttfb (request sent → response headers), body (download + matching),
+parse, save, total. Nothing is measured unless a Metrics instance is passed
+in (--metrics FILE), so a normal run pays only a `None` check.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import math
+import threading
+import time
+from urllib.parse import urlparse
+
+# Log-spaced bucket upper bounds: 0.5ms · 2^i, i.e. 0.5ms … ~65s
+BUCKETS = tuple(0.0005 * 2 ** i for i in range(18))
+STAGES  = ("slot", "queue", "dns", "connect", "tls", "ttfb", "body", "parse", "save", "total")
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)      # last slot = above the largest bound
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        i = 0 if seconds <= BUCKETS[0] else min(len(BUCKETS), math.ceil(math.log2(seconds / BUCKETS[0])))
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (clamped to the observed max)."""
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": round(self.min, 6) if self.count else None,
+            "max": round(self.max, 6),
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "buckets": {f"{b:g}": n for b, n in zip(BUCKETS, self.counts) if n},
+            "overflow": self.counts[-1],
+        }
+
+
+class Metrics:
+    """
+    Thread-safe collection of histograms keyed by (site, stage).
+    Threads doing requests on behalf of a site can set it with
+    `labelled(site)` so low-level hooks (connection setup) that only see
+    a host attribute their timings to the right site.
+    """
+
+    def __init__(self):
+        self.hists = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def observe(self, site: str, stage: str, seconds: float):
+        with self._lock:
+            hist = self.hists.get((site, stage))
+            if hist is None:
+                hist = self.hists[(site, stage)] = Histogram()
+            hist.observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, site: str, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(site, stage, time.perf_counter() - start)
+
+    @contextlib.contextmanager
+    def labelled(self, site: str):
+        previous = getattr(self._local, "site", None)
+        self._local.site = site
+        try:
+            yield
+        finally:
+            self._local.site = previous
+
+    @property
+    def current_site(self) -> str | None:
+        return getattr(self._local, "site", None)
+
+    # ── export ───────────────────────────────────────────────
+    def _sorted(self):
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        return sorted(self.hists.items(), key=lambda kv: (kv[0][0], order.get(kv[0][1], len(order)), kv[0][1]))
+
+    def table(self) -> str:
+        rows = [f"{'site':<22} {'stage':<8} {'n':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9}"]
+        for (site, stage), h in self._sorted():
+            mean = h.sum / h.count if h.count else 0
+            rows.append(f"{site[:22]:<22} {stage:<8} {h.count:>6} " + " ".join(
+                f"{v * 1000:>7.1f}ms" for v in (mean, h.quantile(0.5), h.quantile(0.95), h.max)))
+        return "\n".join(rows)
+
+    def to_json(self) -> dict:
+        out = {}
+        for (site, stage), h in self._sorted():
+            out.setdefault(site, {})[stage] = h.to_dict()
+        return out
+
+    def to_prometheus(self, name: str = "karmas_stage_seconds") -> str:
+        lines = [f"# HELP {name} Time spent per request stage.", f"# TYPE {name} histogram"]
+        for (site, stage), h in self._sorted():
+            labels = f'site="{_escape(site)}",stage="{stage}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS, h.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+            lines.append(f"{name}_sum{{{labels}}} {h.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """Write Prometheus text for *.prom / *.txt, JSON otherwise."""
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith((".prom", ".txt")):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_json(), f, indent=2)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ─── aiohttp ─────────────────────────────────────────────────
+def trace_config(metrics: Metrics):
+    """
+    aiohttp TraceConfig feeding `metrics`. Requests are attributed to the
+    site passed as trace_request_ctx (falls back to the host).
+    `connect` covers TCP + TLS (aiohttp has no separate TLS event), minus DNS.
+    """
+    import aiohttp
+
+    def site_of(ctx, url):
+        return ctx.trace_request_ctx or urlparse(str(url)).netloc
+
+    async def on_request_start(session, ctx, params):
+        ctx.site = site_of(ctx, params.url)
+        ctx.start = ctx.sent = time.perf_counter()
+        ctx.dns = 0.0
+
+    async def on_request_headers_sent(session, ctx, params):
+        ctx.sent = time.perf_counter()
+
+    async def on_response_headers(session, ctx, params):
+        # request_end / request_redirect fire once the response headers are in
+        metrics.observe(ctx.site, "ttfb", time.perf_counter() - ctx.sent)
+
+    async def on_queued_start(session, ctx, params):
+        ctx.queued = time.perf_counter()
+
+    async def on_queued_end(session, ctx, params):
+        metrics.observe(ctx.site, "queue", time.perf_counter() - ctx.queued)
+
+    async def on_dns_start(session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+
+    async def on_dns_end(session, ctx, params):
+        ctx.dns = time.perf_counter() - ctx.dns_start
+        metrics.observe(ctx.site, "dns", ctx.dns)
+
+    async def on_create_start(session, ctx, params):
+        ctx.create = time.perf_counter()
+
+    async def on_create_end(session, ctx, params):
+        metrics.observe(ctx.site, "connect", time.perf_counter() - ctx.create - ctx.dns)
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_request_headers_sent.append(on_request_headers_sent)
+    config.on_request_redirect.append(on_response_headers)
+    config.on_request_end.append(on_response_headers)
+    config.on_connection_queued_start.append(on_queued_start)
+    config.on_connection_queued_end.append(on_queued_end)
+    config.on_dns_resolvehost_start.append(on_dns_start)
+    config.on_dns_resolvehost_end.append(on_dns_end)
+    config.on_connection_create_start.append(on_create_start)
+    config.on_connection_create_end.append(on_create_end)
+    return config
+
+
+# ─── requests ────────────────────────────────────────────────
+def instrument_session(session, metrics: Metrics):
+    """
+    Time connection setup on a requests.Session: `connect` = DNS + TCP,
+    `tls` = the handshake on top. Timings go to the site set with
+    metrics.labelled() in the calling thread, else to the host.
+    Re-run after mounting new adapters. (SOCKS/Tor pools are not covered.)
+    Wraps whatever pool classes the adapters already use, so it stacks
+    with kArmas_netcache.NetCache.install().
+    """
+    from urllib3.connection import HTTPSConnection
+
+    def timed(conn_cls):
+        class TimedConnection(conn_cls):
+            def _label(self):
+                host = self.host if self.port in (None, self.default_port) else f"{self.host}:{self.port}"
+                return metrics.current_site or host
+
+            def _new_conn(self):
+                label = self._label()           # before: a DNS cache may point the connection at an IP meanwhile
+                start = time.perf_counter()
+                try:
+                    return super()._new_conn()
+                finally:
+                    self._tcp_seconds = time.perf_counter() - start
+                    metrics.observe(label, "connect", self._tcp_seconds)
+
+            def connect(self):
+                start = time.perf_counter()
+                self._tcp_seconds = 0.0
+                try:
+                    super().connect()
+                finally:
+                    if isinstance(self, HTTPSConnection):
+                        metrics.observe(self._label(), "tls", time.perf_counter() - start - self._tcp_seconds)
+        TimedConnection._timed = True
+        return TimedConnection
+
+    for adapter in set(session.adapters.values()):
+        manager = adapter.poolmanager
+        manager.pool_classes_by_scheme = {
+            scheme: cls if getattr(cls.ConnectionCls, "_timed", False)
+            else type(cls.__name__, (cls,), {"ConnectionCls": timed(cls.ConnectionCls)})
+            for scheme, cls in manager.pool_classes_by_scheme.items()
+        }
+        manager.clear()
+    return session
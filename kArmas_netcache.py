@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+kArmas_netcache
+Process-wide DNS cache and connection warm-up for the kArmas tools.
+Every site used to pay DNS + TCP + TLS on its first check (and again
+after a redirect to another host). NetCache keeps getaddrinfo answers
+for `ttl` seconds for both requests and aiohttp sessions, warm-up opens
+one keep-alive connection per registry host in parallel before the
+checks start, and the stats count connection reuses against the
+measured per-host handshake cost to show the time saved.
+Made in l0v3 by kArmasec
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+DNS_TTL = 300              # seconds a resolved address is reused
+WARMUP_TIMEOUT = 10        # seconds per warm-up connection
+WARMUP_THREADS = 32        # parallel warm-up connects (requests)
+WARMUP = "warmup"          # trace_request_ctx of aiohttp warm-up requests
+
+
+def origins(urls) -> list[str]:
+    """Distinct scheme://host[:port] of `urls` (registry templates like https://x.com/{} are fine)."""
+    seen = {}
+    for url in urls:
+        parts = urlsplit(url)
+        if parts.scheme in ("http", "https") and parts.netloc:
+            seen.setdefault(f"{parts.scheme}://{parts.netloc}", None)
+    return list(seen)
+
+
+class NetCache:
+    """Thread-safe; one instance (NET) is shared by every session in the process."""
+
+    def __init__(self, ttl: float = DNS_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.resolve_seconds = 0.0     # time spent on real lookups
+        self.created = 0               # connections opened
+        self.warmed = 0                # … of which by warm-up
+        self.reused = 0                # requests sent on an already open connection
+        self.saved_seconds = 0.0       # reuses × that host's measured handshake time
+        self._entries = {}             # (kind, host, port, family) → (result, expires)
+        self._inflight = {}            # same key → task of a running async lookup
+        self._handshakes = {}          # host → (total seconds, count)
+        self._lock = threading.Lock()
+
+    # ── DNS ──────────────────────────────────────────────────
+    def _cached(self, key):
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            with self._lock:
+                self.hits += 1
+            return entry[0]
+        return None
+
+    def _store(self, key, result, seconds):
+        with self._lock:
+            self.misses += 1
+            self.resolve_seconds += seconds
+            self._entries[key] = (result, time.monotonic() + self.ttl)
+
+    def getaddrinfo(self, host: str, port: int, family: int = 0) -> list:
+        """socket.getaddrinfo(host, port, family, SOCK_STREAM), cached."""
+        key = ("sock", host, port, family)
+        result = self._cached(key)
+        if result is None:
+            start = time.perf_counter()
+            result = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)
+            self._store(key, result, time.perf_counter() - start)
+        return result
+
+    async def resolve_async(self, resolve, host: str, port: int, family: int) -> list:
+        """
+        Cached `await resolve(host, port, family)`; concurrent lookups of one
+        name share a single query. The query runs as its own task, so a
+        caller that is cancelled (timeout, deadline) doesn't cancel it for
+        the others waiting on it.
+        """
+        key = ("aio", host, port, family)
+        result = self._cached(key)
+        if result is not None:
+            return result
+        task = self._inflight.get(key)
+        if task is not None:
+            with self._lock:
+                self.hits += 1
+        else:
+            task = asyncio.ensure_future(self._lookup(key, resolve, host, port, family))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        await asyncio.wait((task,))               # a cancelled caller stops waiting, the lookup goes on
+        if task.cancelled():                      # the lookup itself was cancelled: fail like a DNS error
+            raise OSError(f"lookup of {host} was cancelled")
+        return task.result()
+
+    async def _lookup(self, key, resolve, host: str, port: int, family: int) -> list:
+        start = time.perf_counter()
+        result = await resolve(host, port, family)
+        self._store(key, result, time.perf_counter() - start)
+        return result
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()                      # retrieved: no warning when every waiter gave up
+
+    # ── connection bookkeeping ───────────────────────────────
+    def connection_created(self, host: str, seconds: float, warm: bool = False):
+        with self._lock:
+            self.created += 1
+            self.warmed += warm
+            total, count = self._handshakes.get(host, (0.0, 0))
+            self._handshakes[host] = (total + seconds, count + 1)
+
+    def connection_reused(self, host: str):
+        with self._lock:
+            self.reused += 1
+            total, count = self._handshakes.get(host, (0.0, 0))
+            if count:
+                self.saved_seconds += total / count
+
+    def stats(self) -> dict:
+        return {"dns_hits": self.hits, "dns_misses": self.misses, "dns_seconds": round(self.resolve_seconds, 3),
+                "connections": self.created, "warmed": self.warmed, "reused": self.reused,
+                "handshake_seconds_saved": round(self.saved_seconds, 3)}
+
+    def summary(self) -> str:
+        avg = self.resolve_seconds / self.misses if self.misses else 0.0
+        return (f"net: dns {self.hits} hit(s) / {self.misses} lookup(s) (~{self.hits * avg:.2f}s saved), "
+                f"{self.created} connection(s) opened ({self.warmed} pre-warmed), {self.reused} reused "
+                f"→ ~{self.saved_seconds:.2f}s of DNS/TCP/TLS handshakes saved")
+
+    # ── aiohttp ──────────────────────────────────────────────
+    def aiohttp_resolver(self):
+        """aiohttp resolver backed by this cache (pass with use_dns_cache=False)."""
+        import aiohttp
+
+        net = self
+
+        class CachedResolver(aiohttp.abc.AbstractResolver):
+            def __init__(self):
+                self._resolver = None
+
+            async def resolve(self, host, port=0, family=socket.AF_INET):
+                if self._resolver is None:
+                    self._resolver = aiohttp.DefaultResolver()
+                return await net.resolve_async(self._resolver.resolve, host, port, family)
+
+            async def close(self):
+                if self._resolver is not None:
+                    await self._resolver.close()
+
+        return CachedResolver()
+
+    def trace_config(self):
+        """TraceConfig timing new connections (DNS + TCP + TLS) and counting reuses."""
+        import aiohttp
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = params.url.host
+
+        async def on_create_start(session, ctx, params):
+            ctx.create = time.perf_counter()
+
+        async def on_create_end(session, ctx, params):
+            self.connection_created(ctx.host, time.perf_counter() - ctx.create,
+                                    warm=ctx.trace_request_ctx == WARMUP)
+
+        async def on_reuse(session, ctx, params):
+            if ctx.trace_request_ctx != WARMUP:
+                self.connection_reused(ctx.host)
+
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(on_request_start)
+        config.on_connection_create_start.append(on_create_start)
+        config.on_connection_create_end.append(on_create_end)
+        config.on_connection_reuseconn.append(on_reuse)
+        return config
+
+    async def warm_aiohttp(self, session, urls, wait: float = WARMUP_TIMEOUT) -> int:
+        """
+        HEAD / on every origin of `urls` at once so each leaves a keep-alive
+        connection in the session's pool. Waits at most `wait` seconds;
+        slower hosts finish in the background. Returns origins warmed so far.
+        """
+        import aiohttp
+
+        async def one(origin):
+            try:
+                async with session.head(origin + "/", allow_redirects=False, trace_request_ctx=WARMUP,
+                                        timeout=aiohttp.ClientTimeout(total=WARMUP_TIMEOUT)) as r:
+                    await r.read()
+                return True
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                return False
+
+        tasks = [asyncio.create_task(one(origin)) for origin in origins(urls)]
+        if not tasks:
+            return 0
+        done, _ = await asyncio.wait(tasks, timeout=wait)
+        return sum(1 for task in done if task.result())
+
+    # ── requests ─────────────────────────────────────────────
+    def install(self, session):
+        """
+        Resolve through this cache and count reuses on a requests.Session.
+        Stacks with kArmas_metrics.instrument_session (either order). Not for
+        proxied sessions: Tor/SOCKS must keep resolving on the proxy side.
+        """
+        net = self
+
+        def cached(conn_cls):
+            class CachedConnection(conn_cls):
+                _fresh = True
+
+                def _new_conn(self):
+                    host = self._dns_host
+                    try:
+                        infos = net.getaddrinfo(host, self.port)
+                    except OSError:
+                        return super()._new_conn()        # let urllib3 raise its usual error
+                    error = None
+                    for *_, sockaddr in infos:
+                        self._dns_host = sockaddr[0]
+                        try:
+                            return super()._new_conn()
+                        except Exception as e:
+                            error = e
+                        finally:
+                            self._dns_host = host
+                    raise error
+
+                def connect(self):
+                    start = time.perf_counter()
+                    super().connect()
+                    self._fresh = True
+                    net.connection_created(self.host, time.perf_counter() - start,
+                                           warm=getattr(self, "_warming", False))
+
+                def request(self, *args, **kwargs):
+                    if not self._fresh and getattr(self, "sock", None) is not None:
+                        net.connection_reused(self.host)
+                    self._fresh = False
+                    return super().request(*args, **kwargs)
+
+            CachedConnection._netcache = True
+            return CachedConnection
+
+        for adapter in set(session.adapters.values()):
+            manager = adapter.poolmanager
+            manager.pool_classes_by_scheme = {
+                scheme: cls if getattr(cls.ConnectionCls, "_netcache", False)
+                else type(cls.__name__, (cls,), {"ConnectionCls": cached(cls.ConnectionCls)})
+                for scheme, cls in manager.pool_classes_by_scheme.items()
+            }
+            manager.clear()
+        return session
+
+    def warm_requests(self, session, urls, threads: int = WARMUP_THREADS) -> int:
+        """
+        Open one connection per origin of `urls` into the session's pools
+        (same TLS settings as real requests), in parallel. Needs install().
+        Returns origins warmed.
+        """
+        import requests
+
+        def one(origin):
+            adapter = session.get_adapter(origin)
+            request = requests.Request("GET", origin + "/").prepare()
+            try:
+                pool = adapter.get_connection_with_tls_context(request, session.verify, cert=session.cert)
+            except AttributeError:                # requests < 2.32
+                pool = adapter.get_connection(origin + "/")
+            conn = pool._get_conn(timeout=WARMUP_TIMEOUT)
+            try:
+                conn.timeout = WARMUP_TIMEOUT
+                conn._warming = True
+                conn.connect()
+                conn._fresh = False               # its first real request is a reuse
+                return True
+            except Exception:
+                conn.close()
+                return False
+            finally:
+                conn._warming = False
+                pool._put_conn(conn)
+
+        targets = origins(urls)
+        if not targets:
+            return 0
+        with ThreadPoolExecutor(max_workers=min(threads, len(targets))) as pool:
+            return sum(pool.map(one, targets))
+
+
+# Shared by all sessions of the process
+NET = NetCache()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+kArmas_pipeline
+Process-pool parse stage for the kArmas tools.
+Fetchers hand raw bodies to ParsePipeline.run(); jobs wait in a bounded
+asyncio queue and a fixed number of dispatchers keep every worker process
+busy with exactly one job. When parsing falls behind, the queue fills up
+and run() blocks the fetchers – they stop reading sockets instead of
+piling bodies up in memory. Job functions must be module-level (picklable).
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+from kArmas_dedup import simhash
+from kArmas_links import LinkExtractor, PageLinks
+from kArmas_matcher import BodyScanner
+
+DEFAULT_WORKERS = os.cpu_count() or 2
+
+
+class ParsePipeline:
+    """
+    async with ParsePipeline(workers=4) as pipeline:
+        result = await pipeline.run(scan_bytes, scanner, body)
+    `queue_size` bodies may wait for a worker (default 2 per worker).
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, queue_size: int | None = None):
+        from concurrent.futures import ProcessPoolExecutor     # pulls in multiprocessing: only when a pool is used
+
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_size or 2 * workers)
+        self.jobs = 0
+        self.max_depth = 0        # deepest the queue got
+        self.wait = 0.0           # total seconds fetchers spent blocked on a full queue
+        self.busy = 0.0           # total seconds of worker time (incl. pickling)
+        self._pool = ProcessPoolExecutor(max_workers=workers)
+        self._dispatchers = []
+
+    async def __aenter__(self):
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def run(self, fn, *args):
+        """Run fn(*args) in a worker process; waits for queue space first (backpressure)."""
+        future = asyncio.get_running_loop().create_future()
+        start = time.perf_counter()
+        await self.queue.put((fn, args, future))
+        self.wait += time.perf_counter() - start
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return await future
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            fn, args, future = await self.queue.get()
+            start = time.perf_counter()
+            try:
+                result = await loop.run_in_executor(self._pool, fn, *args)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.jobs += 1
+                self.busy += time.perf_counter() - start
+                self.queue.task_done()
+
+    async def close(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def summary(self) -> str:
+        return (f"parse pool: {self.jobs} job(s) on {self.workers} process(es), "
+                f"{self.busy:.2f}s busy, fetchers blocked {self.wait:.2f}s, max queue {self.max_depth}")
+
+
+# ─── jobs (run in the worker processes) ──────────────────────
+def scan_bytes(scanner: BodyScanner, body: bytes) -> BodyScanner:
+    """Feed a whole body through a (fresh, pickled) BodyScanner and send it back."""
+    scanner.feed(body)
+    scanner.finish()
+    return scanner
+
+
+def _decode(body: bytes, encoding: str | None) -> str:
+    try:
+        return body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def parse_page(page_url: str, body: bytes, encoding: str | None,
+               fingerprint: bool = True) -> tuple[PageLinks, int | None]:
+    """The page's links (LinkExtractor) + its SimHash (kArmas_dedup), from one decode."""
+    text = _decode(body, encoding)
+    extractor = LinkExtractor(page_url)
+    extractor.feed(text)
+    extractor.close()
+    return extractor.result(), simhash(text) if fingerprint else None
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+kArmas_recon
+Python port of kArmas_OSINT.sh: same modules, same FINAL_REPORT.txt,
+but every module runs as a concurrent asyncio task instead of one
+process after another. DNS goes through kArmas_dns (all record types at
+once, subdomain wordlists resolved in bulk), WHOIS speaks port 43
+directly, and the homepage is downloaded once and shared by the web,
+email-harvest and tech-fingerprint modules.
+Usage: python kArmas_recon.py example.com -f -o results
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import pprint
+import re
+import secrets
+import shutil
+import ssl
+import sys
+import time
+from datetime import datetime
+
+import aiohttp
+
+from kArmas_dns import DEFAULT_CONCURRENCY, Resolver
+from kArmas_robots import Robots
+
+
+class Colors:
+    RED    = '\033[0;31m'
+    GREEN  = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE   = '\033[0;34m'
+    END    = '\033[0m'
+
+
+BANNER = """
+╔═══════════════════════════════════════════════════╗
+║         kArmas_OSINT v1.0 (python engine)         ║
+║    Advanced Reconnaissance & OSINT Suite          ║
+║         Passive + Active Intelligence
+║         Made in l0v3 bY kArmasec
+╚═══════════════════════════════════════════════════╝
+"""
+
+# Common subdomain wordlist (same as kArmas_OSINT.sh); -w adds a file of your own
+SUBDOMAINS = ["www", "mail", "ftp", "admin", "webmail", "smtp", "pop", "ns1", "ns2", "cpanel", "whm",
+              "dns", "dns1", "dns2", "test", "dev", "staging", "api", "blog", "shop", "store", "forum",
+              "support", "help", "portal", "vpn", "remote", "cloud", "mx", "mx1", "mx2"]
+DNS_TYPES = ("A", "AAAA", "MX", "NS", "TXT", "CNAME", "SOA")
+WHOIS_SERVER = "whois.iana.org"
+WHOIS_FIELDS = re.compile(r"(Registrar|Creation Date|Expiry|Name Server|Organization)", re.I)
+WHOIS_MAX = 256 * 1024
+EMAIL_RE = re.compile(rb"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,6}")
+TECH_SIGNATURES = {            # name → lower-case markers looked for in the homepage
+    "WordPress": (b"wp-content", b"wp-includes", b"wordpress"),
+    "Joomla":    (b"joomla",),
+    "Drupal":    (b"drupal",),
+    "jQuery":    (b"jquery",),
+    "Angular":   (b"ng-version", b"angular"),
+    "React":     (b"data-reactroot", b"react"),
+    "Vue":       (b"data-v-", b"vue"),
+}
+HEADER_FIELDS = ("Server", "X-Powered-By", "Content-Type")
+HOMEPAGE_MAX = 5 * 1024 * 1024
+HTTP_TIMEOUT = 20
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
+}
+
+# Modules per mode, in report order: (number, title, report heading)
+MODULES = [
+    (1, "DNS Enumeration",          "DNS Enumeration"),
+    (2, "WHOIS Lookup",             "WHOIS Information"),
+    (3, "Subdomain Enumeration",    "Discovered Subdomains"),
+    (4, "Port Scanning",            "Open Ports"),
+    (5, "Web Reconnaissance",       "Web Information"),
+    (6, "SSL/TLS Analysis",         "SSL/TLS Information"),
+    (7, "Email Harvesting",         "Discovered Emails"),
+    (8, "Technology Fingerprinting", "Detected Technologies"),
+]
+MODE_MODULES = {
+    "passive": {1, 2, 5, 8},
+    "basic":   {1, 2, 3, 5, 8},
+    "active":  {1, 2, 3, 4, 5, 8},
+    "full":    {1, 2, 3, 4, 5, 6, 7, 8},
+}
+
+
+def save(out_dir: str, name: str, data):
+    mode = "wb" if isinstance(data, bytes) else "w"
+    with open(os.path.join(out_dir, name), mode, **({} if mode == "wb" else {"encoding": "utf-8"})) as f:
+        f.write(data)
+
+
+# ─── Module 1: DNS ───────────────────────────────────────────
+async def dns_module(resolver: Resolver, target: str, out_dir: str) -> list[str]:
+    answers = await asyncio.gather(*(resolver.query(target, t) for t in DNS_TYPES), return_exceptions=True)
+    raw, lines = [], []
+    for rdtype, answer in zip(DNS_TYPES, answers):
+        if isinstance(answer, Exception):
+            raw.append(f";; {rdtype}: {answer}")
+            lines.append(f"{rdtype:5} [!] {answer}")
+            continue
+        for record in answer.records:
+            raw.append(f"{target}.\t{record.ttl}\tIN\t{record.type}\t{record.value}")
+        lines += [f"{rdtype:5} {value}" for value in answer.values(rdtype)]
+    save(out_dir, "dns_records.txt", "\n".join(raw) + "\n")
+    return lines
+
+
+# ─── Module 2: WHOIS ─────────────────────────────────────────
+async def whois_query(server: str, query: str, timeout: float = 15) -> str:
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(server, 43), timeout)
+    try:
+        writer.write(query.encode("idna") + b"\r\n")
+        await writer.drain()
+        chunks, size = [], 0
+        while size < WHOIS_MAX:
+            chunk = await asyncio.wait_for(reader.read(65536), timeout)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks).decode("utf-8", "replace")
+    finally:
+        writer.close()
+
+
+def _referral(text: str) -> str | None:
+    m = re.search(r"^\s*(?:refer|whois|Registrar WHOIS Server):\s*(\S+)", text, re.I | re.M)
+    return m.group(1).lower() if m else None
+
+
+async def whois_module(target: str, out_dir: str) -> list[str]:
+    """IANA → registry → registrar, following referrals like whois(1) does."""
+    text, server, asked = "", WHOIS_SERVER, set()
+    while server and server not in asked and len(asked) < 3:
+        asked.add(server)
+        answer = await whois_query(server, target)
+        text += f"% {server}\n{answer}\n"
+        server = _referral(answer)
+    save(out_dir, "whois.txt", text)
+    return list(dict.fromkeys(line.strip() for line in text.splitlines() if WHOIS_FIELDS.search(line)))
+
+
+# ─── Module 3: subdomains ────────────────────────────────────
+async def subdomain_module(resolver: Resolver, target: str, out_dir: str, words: list[str]) -> list[str]:
+    # A wildcard zone answers for anything: learn its addresses and ignore them
+    wildcard = set(await resolver.resolve(f"{secrets.token_hex(8)}.{target}"))
+    found = {}
+    async for answer in resolver.resolve_many(f"{word}.{target}" for word in words):
+        addresses = answer.values("A") or answer.values("CNAME")
+        if answer.ok and addresses and not (wildcard and set(addresses) <= wildcard):
+            found[answer.name] = addresses
+    names = sorted(found)
+    save(out_dir, "subdomains.txt", "".join(f"{name}\n" for name in names))
+    lines = [f"{name}  → {', '.join(found[name])}" for name in names]
+    if wildcard:
+        lines.insert(0, f"(wildcard DNS → {', '.join(sorted(wildcard))}, matching answers ignored)")
+    return lines
+
+
+# ─── Module 4: ports (optional nmap) ─────────────────────────
+async def nmap(out_dir: str, name: str, *args: str) -> str:
+    path = os.path.join(out_dir, name)
+    proc = await asyncio.create_subprocess_exec("nmap", *args, "-oN", path,
+                                                stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+    await proc.wait()
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+async def ports_module(target: str, out_dir: str) -> list[str]:
+    if not shutil.which("nmap"):
+        return ["nmap not installed – skipped (pkg install nmap)"]
+    scan, _ = await asyncio.gather(nmap(out_dir, "nmap_scan.txt", "-sS", "-T4", "--top-ports", "100", target),
+                                   nmap(out_dir, "nmap_services.txt", "-sV", "--top-ports", "20", target))
+    return [line for line in scan.splitlines() if "open" in line]
+
+
+# ─── Module 5: web (fetches the shared homepage) ─────────────
+async def fetch_homepage(session: aiohttp.ClientSession, target: str, out_dir: str) -> tuple[str, bytes]:
+    """GET http://target once (redirects followed); the raw headers text and body are reused by modules 5, 7, 8."""
+    async with session.get(f"http://{target}") as r:
+        body = await r.content.read(HOMEPAGE_MAX)
+        head = f"HTTP/{r.version.major}.{r.version.minor} {r.status} {r.reason}\n"
+        head += "".join(f"{k}: {v}\n" for k, v in r.headers.items())
+        head = f"# {r.url}\n{head}"
+    save(out_dir, "webpage.html", body)
+    return head, body
+
+
+async def head_https(session: aiohttp.ClientSession, target: str) -> str:
+    try:
+        async with session.head(f"https://{target}", allow_redirects=False) as r:
+            return (f"# https://{target}\nHTTP/{r.version.major}.{r.version.minor} {r.status} {r.reason}\n"
+                    + "".join(f"{k}: {v}\n" for k, v in r.headers.items()))
+    except (aiohttp.ClientError, asyncio.TimeoutError, ssl.SSLError) as e:
+        return f"# https://{target}\n{type(e).__name__}: {e}\n"
+
+
+async def fetch_robots(session: aiohttp.ClientSession, target: str) -> str:
+    try:
+        async with session.get(f"http://{target}/robots.txt") as r:
+            return await r.text(errors="replace") if r.status == 200 else ""
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return ""
+
+
+async def web_module(session: aiohttp.ClientSession, target: str, out_dir: str, homepage: asyncio.Task) -> list[str]:
+    https_head, robots_text = await asyncio.gather(head_https(session, target), fetch_robots(session, target))
+    try:
+        http_head = (await homepage)[0]
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        http_head = f"# http://{target}\n{type(e).__name__}: {e}\n"
+    headers = http_head + "\n" + https_head
+    save(out_dir, "http_headers.txt", headers)
+    lines = [line for line in headers.splitlines() if line.split(":", 1)[0] in HEADER_FIELDS]
+    if robots_text.strip():
+        save(out_dir, "robots.txt", robots_text)
+        lines.append("robots.txt found")
+        lines += [f"Sitemap: {url}" for url in Robots(robots_text).sitemaps]
+    return lines
+
+
+# ─── Module 6: TLS certificate ───────────────────────────────
+async def ssl_module(target: str, out_dir: str, timeout: float = 15) -> list[str]:
+    context = ssl.create_default_context()
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(target, 443, ssl=context, server_hostname=target), timeout)
+    except ssl.SSLCertVerificationError as e:
+        save(out_dir, "ssl_cert.txt", f"verification failed: {e}\n")
+        return [f"certificate NOT trusted: {e.verify_message}"]
+    try:
+        cert = writer.get_extra_info("peercert") or {}
+        tls = writer.get_extra_info("ssl_object")
+        version = tls.version() if tls else "?"
+    finally:
+        writer.close()
+    save(out_dir, "ssl_cert.txt", pprint.pformat(cert) + "\n")
+
+    def name(field):
+        return ", ".join(f"{k}={v}" for rdn in cert.get(field, ()) for k, v in rdn)
+
+    sans = [value for kind, value in cert.get("subjectAltName", ()) if kind == "DNS"]
+    return [f"Issuer: {name('issuer')}", f"Subject: {name('subject')}",
+            f"Not Before: {cert.get('notBefore')}", f"Not After : {cert.get('notAfter')}",
+            f"Protocol: {version}", f"SANs: {', '.join(sans[:10])}{' …' if len(sans) > 10 else ''}"]
+
+
+# ─── Modules 7 + 8: parse the shared homepage ────────────────
+async def email_module(homepage: asyncio.Task, out_dir: str) -> list[str]:
+    body = (await homepage)[1]
+    emails = sorted({m.decode("ascii", "replace").lower() for m in EMAIL_RE.findall(body)})
+    save(out_dir, "emails.txt", "".join(f"{e}\n" for e in emails))
+    return emails
+
+
+async def tech_module(homepage: asyncio.Task) -> list[str]:
+    head, body = await homepage
+    page = body.lower()
+    found = [name for name, markers in TECH_SIGNATURES.items() if any(m in page for m in markers)]
+    lines = [line for line in head.splitlines() if line.split(":", 1)[0] in ("Server", "X-Powered-By")]
+    m = re.search(rb'<meta[^>]+name=["\']generator["\'][^>]+content=["\']([^"\']+)', body, re.I)
+    if m:
+        lines.append(f"Generator: {m.group(1).decode('utf-8', 'replace')}")
+    return found + lines
+
+
+# ─── Driver ──────────────────────────────────────────────────
+async def run(target: str, out_dir: str, mode: str = "basic", words: list[str] | None = None,
+              nameservers: list[str] | None = None, dns_concurrency: int = DEFAULT_CONCURRENCY) -> dict[int, list[str]]:
+    """Run the modules of `mode` concurrently; returns module number → report lines."""
+    wanted = MODE_MODULES[mode]
+    results: dict[int, list[str]] = {}
+    timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+    async with Resolver(nameservers, concurrency=dns_concurrency) as resolver, \
+            aiohttp.ClientSession(headers=HEADERS, timeout=timeout) as session:
+        homepage = asyncio.create_task(fetch_homepage(session, target, out_dir))
+        jobs = {
+            1: lambda: dns_module(resolver, target, out_dir),
+            2: lambda: whois_module(target, out_dir),
+            3: lambda: subdomain_module(resolver, target, out_dir, words or SUBDOMAINS),
+            4: lambda: ports_module(target, out_dir),
+            5: lambda: web_module(session, target, out_dir, homepage),
+            6: lambda: ssl_module(target, out_dir),
+            7: lambda: email_module(homepage, out_dir),
+            8: lambda: tech_module(homepage),
+        }
+        titles = {number: title for number, title, _ in MODULES}
+
+        async def one(number):
+            print(f"{Colors.YELLOW}[Module {number}] {titles[number]}{Colors.END}")
+            start = time.perf_counter()
+            try:
+                results[number] = await jobs[number]()
+                print(f"{Colors.GREEN}  [✓] {titles[number]} done ({time.perf_counter() - start:.1f}s){Colors.END}")
+            except Exception as e:
+                results[number] = [f"[!] failed: {type(e).__name__}: {e}"]
+                print(f"{Colors.RED}  [!] {titles[number]} failed: {e}{Colors.END}")
+
+        try:
+            await asyncio.gather(*(one(number) for number in sorted(wanted)))
+        finally:
+            if not homepage.done():
+                homepage.cancel()
+            elif not homepage.cancelled():
+                homepage.exception()        # retrieved: no "never retrieved" warning when it failed
+        if 1 in wanted or 3 in wanted:
+            print(f"{Colors.BLUE}{resolver.summary()}{Colors.END}")
+    return results
+
+
+def write_report(path: str, target: str, mode: str, results: dict[int, list[str]], out_dir: str):
+    rule = "=" * 40
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{rule}\nkArmas_OSINT - Reconnaissance Report\nTarget: {target}\n"
+                f"Date: {datetime.now():%c}\nMode: {mode}\n{rule}\n\n")
+        for number, _, heading in MODULES:
+            if number in results:
+                f.write(f"[Module {number}] {heading}\n{'-' * 35}\n")
+                f.write("".join(f"{line}\n" for line in results[number]))
+                f.write("\n")
+        f.write(f"\n{rule}\nScan completed: {datetime.now():%c}\nAll files saved to: {out_dir}\n{rule}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="kArmas_OSINT reconnaissance (concurrent python engine)")
+    parser.add_argument("target", help="Domain, e.g. example.com")
+    parser.add_argument("-o", dest="output_dir", help="Output directory (default osint_results_<target>_<date>)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("-p", dest="mode", action="store_const", const="passive", help="Passive mode only (no subdomain/port scanning)")
+    group.add_argument("-a", dest="mode", action="store_const", const="active", help="Active mode (includes port scanning)")
+    group.add_argument("-f", dest="mode", action="store_const", const="full", help="Full mode (all modules)")
+    parser.add_argument("-w", "--wordlist", help="Subdomain wordlist, one label per line (added to the built-in list)")
+    parser.add_argument("--resolver", action="append", metavar="IP", help="DNS server to query (repeatable; default from resolv.conf)")
+    parser.add_argument("--dns-concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"DNS queries in flight (default {DEFAULT_CONCURRENCY})")
+    args = parser.parse_args()
+    mode = args.mode or "basic"
+    target = args.target.strip().lower().removeprefix("http://").removeprefix("https://").split("/")[0]
+
+    words = list(SUBDOMAINS)
+    if args.wordlist:
+        with open(args.wordlist, encoding="utf-8", errors="replace") as f:
+            words += [line.strip().lower() for line in f if line.strip() and not line.startswith("#")]
+        words = list(dict.fromkeys(words))
+
+    out_dir = args.output_dir or f"osint_results_{target}_{datetime.now():%Y%m%d_%H%M%S}"
+    os.makedirs(out_dir, exist_ok=True)
+    report = os.path.join(out_dir, "FINAL_REPORT.txt")
+
+    print(f"{Colors.GREEN}{BANNER}{Colors.END}")
+    print(f"{Colors.GREEN}[+] Target: {target}{Colors.END}")
+    print(f"{Colors.GREEN}[+] Mode: {mode}{Colors.END}")
+    print(f"{Colors.GREEN}[+] Output Directory: {out_dir}{Colors.END}")
+    print(f"{Colors.BLUE}[*] Starting reconnaissance (modules run in parallel)...{Colors.END}\n")
+
+    start = time.perf_counter()
+    try:
+        results = asyncio.run(run(target, out_dir, mode, words, args.resolver, args.dns_concurrency))
+    except KeyboardInterrupt:
+        print(f"\n{Colors.RED}⏹ Stopped by user{Colors.END}")
+        sys.exit(1)
+    write_report(report, target, mode, results, out_dir)
+
+    print(f"\n{Colors.GREEN}╔═══════════════════════════════════════════════════╗{Colors.END}")
+    print(f"{Colors.GREEN}║           RECONNAISSANCE COMPLETE                 ║{Colors.END}")
+    print(f"{Colors.GREEN}╚═══════════════════════════════════════════════════╝{Colors.END}")
+    print(f"{Colors.YELLOW}[+] Took {time.perf_counter() - start:.1f}s{Colors.END}")
+    print(f"{Colors.YELLOW}[+] Report saved to: {report}{Colors.END}")
+    print(f"{Colors.YELLOW}[+] All files in: {out_dir}{Colors.END}")
+    print(f"{Colors.BLUE}[*] Files generated:{Colors.END}")
+    for name in sorted(os.listdir(out_dir)):
+        print(f"    {name} ({os.path.getsize(os.path.join(out_dir, name)):,})")
+    print(f"\n{Colors.GREEN}[✓] Scan complete! Review the FINAL_REPORT.txt for summary.{Colors.END}")
+
+
+if __name__ == "__main__":
+    main()
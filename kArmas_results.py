@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+kArmas_results
+Persistent result index for the kArmas OSINT tools.
+One SQLite row per (target, site) with the verdict, status code, error
+and check time, written by kArmas_ultimate_osint and kArmas_usernameOSAINT
+as checks finish. Re-runs reuse rows younger than the site's freshness TTL
+("result_ttl" in the registry, else the default) and only go to the network
+for stale, missing or errored pairs. Indexed, so "every target found on
+GitHub" is one query instead of parsing thousands of JSON reports.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_RESULTS = os.path.join(os.path.expanduser("~"), ".cache", "kArmas", "results.sqlite")
+DEFAULT_TTL     = 24 * 3600          # seconds a verdict is reused without re-checking
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    target      TEXT NOT NULL,
+    site        TEXT NOT NULL,
+    kind        TEXT,
+    found       INTEGER,
+    status      INTEGER,
+    error       TEXT,
+    url         TEXT,
+    data        TEXT,
+    checked_at  REAL,
+    PRIMARY KEY (target, site)
+);
+CREATE INDEX IF NOT EXISTS results_site ON results(site, found);
+CREATE INDEX IF NOT EXISTS results_checked ON results(checked_at);
+"""
+
+
+class ResultStore:
+    """
+    Thread-safe (one connection + lock), like ResponseCache, so the threaded
+    username checker can record from its workers.
+    """
+
+    def __init__(self, path: str = DEFAULT_RESULTS, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.reused = 0          # checks answered from the index
+        self.stored = 0          # checks recorded
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # One small commit per finished check: WAL keeps that off fsync's critical path
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    # ── re-checks ────────────────────────────────────────────
+    def fresh(self, target: str, ttls: dict) -> dict:
+        """
+        {site: stored result} for the sites in `ttls` ({site: ttl or None for
+        the default}) whose last check of `target` succeeded within its TTL.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT site, data, checked_at FROM results WHERE target = ? AND error IS NULL",
+                (target,)).fetchall()
+        fresh = {}
+        for site, data, checked_at in rows:
+            if site in ttls and now - checked_at < (ttls[site] if ttls[site] is not None else self.ttl):
+                fresh[site] = {**json.loads(data), "checked_at": round(checked_at, 3)}
+        self.reused += len(fresh)
+        return fresh
+
+    def put(self, target: str, kind: str, result: dict, site: str | None = None):
+        """Record one check result (a tool's result dict: site, exists, status_code, error, url…)."""
+        site = site or result["site"]
+        error = result.get("error")
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (target, site, kind, None if error else int(bool(result.get("exists"))),
+                 result.get("status_code"), error, result.get("url"),
+                 json.dumps(result, separators=(",", ":")), time.time()))
+            self._db.commit()
+            self.stored += 1
+
+    # ── queries ──────────────────────────────────────────────
+    def query(self, site: str | None = None, target: str | None = None, found: bool | None = None,
+              max_age: float | None = None) -> list[dict]:
+        """Rows matching every given filter, newest first."""
+        where, args = [], []
+        if site is not None:
+            where.append("site = ?")
+            args.append(site)
+        if target is not None:
+            where.append("target = ?")
+            args.append(target)
+        if found is not None:
+            where.append("found = ?")
+            args.append(int(found))
+        if max_age is not None:
+            where.append("checked_at >= ?")
+            args.append(time.time() - max_age)
+        sql = ("SELECT target, site, kind, found, status, error, url, checked_at FROM results"
+               + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY checked_at DESC")
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        keys = ("target", "site", "kind", "found", "status", "error", "url", "checked_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def counts(self) -> list[tuple[str, int, int]]:
+        """(site, targets found, targets checked) per site."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT site, COALESCE(SUM(found), 0), COUNT(*) FROM results GROUP BY site ORDER BY site").fetchall()
+
+    def stats(self) -> dict:
+        return {"reused": self.reused, "stored": self.stored}
+
+    def summary(self) -> str:
+        return f"results: {self.reused} check(s) reused from {self.path}, {self.stored} recorded"
+
+    def close(self):
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+
+if __name__ == "__main__":
+    # python kArmas_results.py --site GitHub --found      every target found on GitHub
+    # python kArmas_results.py --target alice             everything known about alice
+    # python kArmas_results.py                            per-site totals
+    parser = argparse.ArgumentParser(description="Query the kArmas result index")
+    parser.add_argument("--db", default=DEFAULT_RESULTS, help=f"Result index (default {DEFAULT_RESULTS})")
+    parser.add_argument("--site", help="Only this site (registry name, e.g. GitHub)")
+    parser.add_argument("--target", help="Only this username/email")
+    parser.add_argument("--found", action="store_true", help="Only targets found on the site")
+    parser.add_argument("--missing", action="store_true", help="Only targets not found on the site")
+    parser.add_argument("--max-age", type=float, metavar="SECONDS", help="Only checks newer than SECONDS")
+    parser.add_argument("--json", action="store_true", help="One JSON object per line")
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    if not (args.site or args.target or args.found or args.missing or args.max_age):
+        for site, found, checked in store.counts():
+            print(f"{site:<16} {found:>7} found / {checked:>7} checked")
+    else:
+        found = True if args.found else False if args.missing else None
+        for row in store.query(args.site, args.target, found, args.max_age):
+            if args.json:
+                print(json.dumps(row))
+            else:
+                verdict = "ERROR" if row["error"] else "FOUND" if row["found"] else "MISS"
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["checked_at"]))
+                print(f"{when}  {verdict:<5}  {row['site']:<14} {row['target']:<24} {row['url'] or row['error'] or ''}")
+    store.close()
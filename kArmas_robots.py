@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+kArmas_robots
+robots.txt engine for the kArmas scraper (RFC 9309 semantics).
+Each file is parsed once into per-agent rule sets. Plain path rules go
+into a character trie, so checking a URL is one walk down its path
+(longest match wins, Allow beats Disallow on a tie); the few rules with
+'*' or '$' are compiled to regexes. Parsed files are cached per origin
+with a TTL, and expose Crawl-delay and Sitemap lines.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from urllib.parse import quote, unquote, urlsplit
+
+DEFAULT_TTL = 24 * 3600          # seconds a parsed robots.txt is trusted
+ERROR_TTL   = 5 * 60             # retry sooner when it could not be fetched
+MAX_BYTES   = 512 * 1024         # RFC 9309: parse at least 500 KiB, ignore the rest
+SAFE_CHARS  = "/?=&;:@!$'()*+,~"  # left alone when normalising paths and patterns
+
+
+def normalize_path(path: str) -> str:
+    """Percent-encode the same way on both sides: decode, then re-quote (upper-case hex)."""
+    return quote(unquote(path), safe=SAFE_CHARS)
+
+
+class _Node:
+    __slots__ = ("children", "rule")
+
+    def __init__(self):
+        self.children = {}
+        self.rule = None          # (length, allow) of a rule ending here
+
+
+class RuleSet:
+    """Allow/Disallow rules of one user-agent group."""
+
+    def __init__(self):
+        self._root = _Node()
+        self._wild = []           # (length, allow, compiled regex)
+        self.crawl_delay = None
+
+    def add(self, pattern: str, allow: bool):
+        if not pattern:
+            if not allow:
+                return            # "Disallow:" (empty) = allow everything
+            pattern = "/"
+        pattern = normalize_path(pattern)
+        rule = (len(pattern), allow)
+        if "*" in pattern or pattern.endswith("$"):
+            anchored = pattern.endswith("$")
+            body = pattern[:-1] if anchored else pattern
+            regex = ".*".join(map(re.escape, body.split("*"))) + ("$" if anchored else "")
+            self._wild.append((len(pattern), allow, re.compile(regex)))
+            return
+        node = self._root
+        for ch in pattern:
+            node = node.children.setdefault(ch, _Node())
+        if node.rule is None or (allow and not node.rule[1]):
+            node.rule = rule
+
+    def allowed(self, path: str) -> bool:
+        path = normalize_path(path or "/")
+        best = None               # (length, allow) – longer wins, Allow wins a tie
+        node = self._root
+        for ch in path:
+            node = node.children.get(ch)
+            if node is None:
+                break
+            if node.rule is not None:
+                best = node.rule
+        for length, allow, regex in self._wild:
+            if (best is None or length > best[0] or (length == best[0] and allow)) and regex.match(path):
+                best = (length, allow)
+        return best is None or best[1]
+
+
+ALLOW_ALL = RuleSet()
+
+
+class Robots:
+    """One parsed robots.txt: rule set per agent, crawl delays, sitemaps."""
+
+    def __init__(self, text: str = ""):
+        self.groups = {}          # lower-cased agent token → RuleSet
+        self.sitemaps = []
+        self._parse(text)
+
+    def _parse(self, text: str):
+        agents, current, in_rules = [], [], False
+        for raw in text.splitlines():
+            line = raw.split("#", 1)[0].strip()
+            if ":" not in line:
+                continue
+            key, value = line.split(":", 1)
+            key, value = key.strip().lower(), value.strip()
+            if key == "user-agent":
+                if in_rules:              # a new group starts
+                    agents, in_rules = [], False
+                agent = value.split("/", 1)[0].strip().lower()     # "Googlebot/2.1" → "googlebot"
+                if agent not in self.groups:
+                    self.groups[agent] = RuleSet()
+                agents.append(agent)
+                current = [self.groups[a] for a in agents]
+            elif key in ("allow", "disallow"):
+                in_rules = True
+                for rules in current:
+                    rules.add(value, key == "allow")
+            elif key == "crawl-delay":
+                in_rules = True
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                for rules in current:
+                    rules.crawl_delay = delay
+            elif key == "sitemap":
+                self.sitemaps.append(value)
+
+    def rules_for(self, agent: str) -> RuleSet:
+        """Group whose token is the longest one contained in our agent name, else '*'."""
+        agent = agent.lower()
+        best = None
+        for token in self.groups:
+            if token != "*" and token in agent and (best is None or len(token) > len(best)):
+                best = token
+        if best is None:
+            best = "*" if "*" in self.groups else None
+        return self.groups[best] if best is not None else ALLOW_ALL
+
+
+class RobotsCache:
+    """
+    Per-origin robots.txt cache shared by all crawler threads.
+    `fetch(url)` returns (status, text); 4xx means no rules, errors and
+    5xx are treated as "no rules" too but retried after ERROR_TTL.
+    """
+
+    def __init__(self, fetch, agent: str, ttl: float = DEFAULT_TTL):
+        self.fetch = fetch
+        self.agent = agent
+        self.ttl = ttl
+        self.fetched = 0
+        self.blocked = 0          # URLs refused
+        self._entries = {}        # origin → (Robots, RuleSet, expires)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _origin(self, url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def cached(self, url: str) -> bool:
+        """True if get(url) will not hit the network."""
+        entry = self._entries.get(self._origin(url))
+        return entry is not None and entry[2] > time.monotonic()
+
+    def get(self, url: str) -> tuple[Robots, RuleSet]:
+        origin = self._origin(url)
+        entry = self._entries.get(origin)
+        if entry and entry[2] > time.monotonic():
+            return entry[0], entry[1]
+        with self._lock:
+            lock = self._locks.setdefault(origin, threading.Lock())
+        with lock:                        # one fetch per origin, others wait for it
+            entry = self._entries.get(origin)
+            if entry and entry[2] > time.monotonic():
+                return entry[0], entry[1]
+            ttl = self.ttl
+            try:
+                status, text = self.fetch(origin + "/robots.txt")
+            except Exception:
+                status, text = None, ""
+            if status is None or status >= 500:
+                ttl = ERROR_TTL
+            robots = Robots(text[:MAX_BYTES] if status == 200 else "")
+            rules = robots.rules_for(self.agent)
+            self._entries[origin] = (robots, rules, time.monotonic() + ttl)
+            self.fetched += 1
+            return robots, rules
+
+    def allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        ok = self.get(url)[1].allowed(parts.path + ("?" + parts.query if parts.query else ""))
+        if not ok:
+            self.blocked += 1
+        return ok
+
+    def crawl_delay(self, url: str) -> float | None:
+        return self.get(url)[1].crawl_delay
+
+    def sitemaps(self, url: str) -> list:
+        return self.get(url)[0].sitemaps
+
+    def summary(self) -> str:
+        return f"robots: {self.fetched} robots.txt fetched, {self.blocked} URL(s) disallowed"
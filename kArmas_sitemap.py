@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+kArmas_sitemap
+Streaming sitemap reader for the kArmas scraper.
+sitemap.xml files, sitemap indexes and their .xml.gz variants are fed to
+an incremental XML parser chunk by chunk as they download (gzip is
+inflated on the fly); every finished <url>/<sitemap> element is handed
+out and dropped, so a 50 MB sitemap never sits in memory.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from datetime import datetime, timezone
+from typing import NamedTuple
+from xml.etree import ElementTree as ET
+
+MAX_BYTES    = 50 * 1024 * 1024   # sitemaps.org limit (uncompressed) – stop reading past it
+MAX_SITEMAPS = 1000               # sitemap files followed per run, indexes included
+GZIP_MAGIC   = b"\x1f\x8b"
+
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+class SitemapEntry(NamedTuple):
+    loc: str
+    lastmod: float | None   # unix time, None if missing/unparsable
+    index: bool             # True: loc is another sitemap (from a <sitemapindex>)
+
+
+def parse_lastmod(text: str | None) -> float | None:
+    """W3C datetime (YYYY, YYYY-MM, YYYY-MM-DD, or full with time zone) → unix time."""
+    if not text:
+        return None
+    text = text.strip()
+    if len(text) in (4, 7):                 # "2024" / "2024-05"
+        text += "-01-01"[len(text) - 4:]
+    text = _FRACTION.sub(lambda m: "." + m.group(1)[:6].ljust(6, "0"), text)   # "10:00:00.5" before 3.11
+    try:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]           # drop the sitemaps.org namespace
+
+
+class SitemapParser:
+    """feed() raw bytes of one sitemap (gzip or plain) as they arrive; each call returns the entries it completed."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0             # uncompressed bytes parsed
+        self.truncated = False
+        self._xml = ET.XMLPullParser(events=("start", "end"))
+        self._root = None
+        self._gunzip = None
+        self._started = False
+
+    def feed(self, data: bytes) -> list[SitemapEntry]:
+        if not self._started:
+            self._started = True
+            if data[:2] == GZIP_MAGIC:          # .xml.gz served without Content-Encoding
+                self._gunzip = zlib.decompressobj(wbits=31)
+        if self._gunzip is not None:
+            data = self._gunzip.decompress(data, self.max_bytes - self.size + 1)
+        if self.truncated:
+            return []
+        if self.size + len(data) > self.max_bytes:
+            data = data[:self.max_bytes - self.size]
+            self.truncated = True
+        self.size += len(data)
+        self._xml.feed(data)
+        return self._drain()
+
+    def close(self) -> list[SitemapEntry]:
+        if self.truncated:
+            return []
+        try:
+            self._xml.close()
+        except ET.ParseError:
+            pass                                # truncated download: keep what was complete
+        return self._drain()
+
+    def _drain(self) -> list[SitemapEntry]:
+        entries = []
+        try:
+            events = list(self._xml.read_events())
+        except ET.ParseError:
+            self.truncated = True
+            return entries
+        for event, el in events:
+            if event == "start":
+                if self._root is None:
+                    self._root = el
+                continue
+            tag = _local(el.tag)
+            if tag not in ("url", "sitemap"):
+                continue
+            loc = lastmod = None
+            for child in el:
+                name = _local(child.tag)
+                if name == "loc":
+                    loc = (child.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = parse_lastmod(child.text)
+            if loc:
+                entries.append(SitemapEntry(loc, lastmod, tag == "sitemap"))
+            el.clear()
+            if self._root is not None and self._root is not el:
+                self._root.remove(el)           # keep the tree empty as we go
+        return entries
+
+
+class SitemapReader:
+    """
+    Walks sitemaps breadth-first, following sitemap indexes.
+    `fetch(url)` returns an iterable of body chunks (or None on failure);
+    it is only consumed as far as the caller iterates urls().
+    """
+
+    def __init__(self, fetch, max_sitemaps: int = MAX_SITEMAPS):
+        self.fetch = fetch
+        self.max_sitemaps = max_sitemaps
+        self.sitemaps = 0         # sitemap files read
+        self.listed = 0           # page URLs handed out
+
+    def urls(self, roots: list[str]):
+        """Yield SitemapEntry for every page listed under `roots`."""
+        queue, seen = list(roots), set(roots)
+        while queue and self.sitemaps < self.max_sitemaps:
+            chunks = self.fetch(queue.pop(0))
+            if chunks is None:
+                continue
+            self.sitemaps += 1
+            try:
+                for entry in self._entries(chunks):
+                    if not entry.index:
+                        self.listed += 1
+                        yield entry
+                    elif entry.loc not in seen:
+                        seen.add(entry.loc)
+                        queue.append(entry.loc)
+            finally:
+                close = getattr(chunks, "close", None)
+                if close:
+                    close()
+
+    @staticmethod
+    def _entries(chunks):
+        parser = SitemapParser()
+        for chunk in chunks:
+            yield from parser.feed(chunk)
+            if parser.truncated:
+                return
+        yield from parser.close()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+kArmas_sites
+Shared site registry for the kArmas OSINT tools.
+Sites live in kArmas_sites.json (or $KARMAS_SITES); the file is parsed,
+validated and compiled (indicator matchers) once, then cached as a pickle
+keyed on the data file's path/size/mtime so later starts skip all of it.
+Made in l0v3 by kArmasec
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+from kArmas_matcher import IndicatorMatcher
+
+DEFAULT_SITES = os.environ.get(
+    "KARMAS_SITES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "kArmas_sites.json"))
+CACHE_DIR     = os.path.join(os.path.expanduser("~"), ".cache", "kArmas")
+KINDS         = ("username", "email")
+FORMAT        = 1      # bump when the compiled layout changes
+
+_loaded = {}           # path → compiled registry, per process
+_selected = {}         # (path, kind, tags) → filtered site dict
+
+
+def compile_registry(raw: dict) -> dict:
+    """
+    JSON → {kind: {name: site_info}}. site_info keeps the JSON fields and
+    gains precompiled matchers:
+      not_found_matcher   site's own not-found indicators
+      profile_matcher     generic + site not-found indicators (username checker)
+      exists_matcher / not_exists_matcher   email checks
+    """
+    generic = raw.get("generic_not_found_indicators", [])
+    registry = {"generic_matcher": IndicatorMatcher(generic)}
+    for kind in KINDS:
+        sites = {}
+        for name, info in raw.get(kind, {}).items():
+            if "url" not in info:
+                raise ValueError(f"site {name!r} ({kind}) has no url")
+            info = dict(info)
+            info["tags"] = frozenset(info.get("tags", ()))
+            if kind == "username":
+                own = info.get("not_found_indicators", [])
+                info["not_found_matcher"] = IndicatorMatcher(own)
+                info["profile_matcher"] = IndicatorMatcher(generic + own)
+            else:
+                info["exists_matcher"] = IndicatorMatcher(info.get("exists_indicators", []))
+                info["not_exists_matcher"] = IndicatorMatcher(info.get("not_exists_indicators", []))
+            sites[name] = info
+        registry[kind] = sites
+    return registry
+
+
+def _cache_path(path: str) -> str:
+    st = os.stat(path)
+    key = f"{FORMAT}:{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns}"
+    return os.path.join(CACHE_DIR, f"sites-{hashlib.sha1(key.encode()).hexdigest()[:16]}.pickle")
+
+
+def load_registry(path: str = DEFAULT_SITES) -> dict:
+    if path in _loaded:
+        return _loaded[path]
+
+    cached = _cache_path(path)
+    try:
+        with open(cached, "rb") as f:
+            registry = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        with open(path, encoding="utf-8") as f:
+            registry = compile_registry(json.load(f))
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = f"{cached}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(registry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cached)
+        except OSError:
+            pass                        # read-only home: just recompile next time
+    _loaded[path] = registry
+    return registry
+
+
+def load_sites(kind: str = "username", tags=None, path: str = DEFAULT_SITES) -> dict:
+    """{name: site_info} for `kind`, limited to sites carrying any of `tags` (None = all)."""
+    sites = load_registry(path)[kind]
+    if not tags:
+        return sites
+    key = (path, kind, frozenset(tags))
+    if key not in _selected:
+        _selected[key] = {name: info for name, info in sites.items() if info["tags"] & key[2]}
+    return _selected[key]
+
+
+def generic_matcher(path: str = DEFAULT_SITES) -> IndicatorMatcher:
+    return load_registry(path)["generic_matcher"]
+
+
+def parse_tags(value: str | None) -> list | None:
+    """'social,dev' → ['social', 'dev'] (argparse helper)."""
+    return [t.strip() for t in value.split(",") if t.strip()] if value else None
+
+
+if __name__ == "__main__":
+    # List the registry: python kArmas_sites.py [kind] [tag,tag]
+    kind = sys.argv[1] if len(sys.argv) > 1 else "username"
+    for name, info in load_sites(kind, parse_tags(sys.argv[2] if len(sys.argv) > 2 else None)).items():
+        print(f"{name:<14} {info['url']:<60} {','.join(sorted(info['tags']))}")
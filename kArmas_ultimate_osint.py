@@ -1,106 +1,271 @@
 import asyncio
-import aiohttp
 import json
 import argparse
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
+import contextlib
+from email.utils import parsedate_to_datetime
 import random
 import time
 import re
+import sys
 
-# Username sites (from previous version)
-USERNAME_SITES = {
-    "GitHub": {
-        "url": "https://github.com/{}",
-        "not_found_indicators": ["Not Found", "404"],
-    },
-    "Twitter/X": {
-        "url": "https://x.com/{}",
-        "not_found_indicators": ["This account doesn’t exist", "Something went wrong"],
-    },
-    "Reddit": {
-        "url": "https://www.reddit.com/user/{}",
-        "not_found_indicators": ["page not found", "sorry, nobody on Reddit goes by that name"],
-    },
-    "Instagram": {
-        "url": "https://www.instagram.com/{}/",
-        "not_found_indicators": ["Sorry, this page isn't available", "The link you followed may be broken"],
-    },
-    "LinkedIn": {
-        "url": "https://www.linkedin.com/in/{}",
-        "not_found_indicators": ["Page not found", "profile not found"],
-    },
-    "YouTube": {
-        "url": "https://www.youtube.com/@{}",
-        "not_found_indicators": ["404 Not Found", "This channel does not exist"],
-    },
-}
+from kArmas_httpcache import ResponseCache, DEFAULT_CACHE, DEFAULT_TTL
+from kArmas_matcher import BodyScanner, get_matcher, scan_response
+from kArmas_metrics import Metrics, trace_config
+from kArmas_netcache import NET
+from kArmas_pipeline import ParsePipeline, scan_bytes
+from kArmas_results import ResultStore, DEFAULT_RESULTS, DEFAULT_TTL as RESULTS_TTL
+from kArmas_sites import DEFAULT_SITES, load_sites, parse_tags
 
-# Email registration check sites (inspired by Holehe - small sample; expand for 100+)
-EMAIL_SITES = {
-    "Twitter/X": {
-        "url": "https://x.com/account/begin_password_reset",
-        "method": "POST",
-        "data": {"account_identifier": "{email}"},
-        "headers": {"Content-Type": "application/x-www-form-urlencoded"},
-        "exists_indicators": ["We'll send you an email"],  # If exists, offers reset
-        "not_exists_indicators": ["We couldn't find your account"],
-    },
-    "Instagram": {
-        "url": "https://www.instagram.com/accounts/password/reset/",
-        "method": "POST",
-        "data": {"enc_password": "", "email_or_username": "{email}"},  # Simplified
-        "exists_indicators": ["we'll send you an email"],
-        "not_exists_indicators": ["Can't find this account"],
-    },
-    "Spotify": {
-        "url": "https://www.spotify.com/api/account/v1/password-reset/initiate",
-        "method": "POST",
-        "json": {"email": "{email}"},
-        "exists_indicators": ["true"],  # Response often boolean
-        "not_exists_indicators": ["false"],
-    },
-    # Add more from Holehe modules for full power (GitHub, Reddit, etc.)
-}
+# Sites come from the shared registry (kArmas_sites.json); this tool checks the "core" set by default
+DEFAULT_TAGS = ["core"]
+
+REPUTATION_URL = "https://emailrep.io/{}"
+REPUTATION_SITE = "emailrep"             # its name in metrics and the result index
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/129.0.0.0 Safari/537.36"
 }
 
-async def check_username_site(session, target, site_name, site_info):
-    # (Same as previous version)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 2                  # extra attempts for idempotent (GET) checks
+MAX_RETRY_AFTER = 120            # never park a host longer than this
+MAX_PARSE_BYTES = 1024 * 1024    # body cap when parsing is handed to the process pool
+KEEPALIVE = 60                   # seconds an idle connection stays pooled (aiohttp default 15)
+
+class RetryableStatus(Exception):
+    def __init__(self, status, retry_after=None):
+        super().__init__(f"HTTP {status}" + (" (rate limited)" if status == 429 else ""))
+        self.status = status
+        self.retry_after = retry_after
+
+class HostState:
+    def __init__(self, limit, timeout):
+        self.limit = limit            # allowed concurrent requests (float, AIMD)
+        self.active = 0
+        self.timeout = timeout        # per-request timeout in seconds
+        self.latency = None           # EWMA of successful request latency
+        self.blocked_until = 0.0      # monotonic time set from Retry-After
+        self.ok = 0
+        self.failed = 0
+        self.cond = asyncio.Condition()
+
+class HostController:
+    """
+    Per-host AIMD controller. Each success adds ~1 to the host's concurrency
+    limit per window (limit += 1/limit); a 429/5xx/timeout halves it. The
+    request timeout follows the host's latency (4 × EWMA + 1s, clamped),
+    and Retry-After parks the host until it expires.
+    """
+
+    def __init__(self, initial_limit=4, max_limit=16, min_timeout=5.0, max_timeout=30.0, default_timeout=15.0):
+        self.initial_limit = initial_limit
+        self.max_limit = max_limit
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.default_timeout = default_timeout
+        self.hosts = {}
+
+    def state(self, url):
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = HostState(float(self.initial_limit), self.default_timeout)
+        return self.hosts[host]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url):
+        host = self.state(url)
+        async with host.cond:
+            while True:
+                wait = host.blocked_until - time.monotonic()
+                if wait <= 0 and host.active < int(host.limit):
+                    break
+                try:
+                    await asyncio.wait_for(host.cond.wait(), wait if wait > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+            host.active += 1
+        try:
+            yield host
+        finally:
+            async with host.cond:
+                host.active -= 1
+                host.cond.notify_all()
+
+    def success(self, host, latency):
+        host.ok += 1
+        host.latency = latency if host.latency is None else 0.8 * host.latency + 0.2 * latency
+        host.timeout = min(self.max_timeout, max(self.min_timeout, 4 * host.latency + 1))
+        host.limit = min(self.max_limit, host.limit + 1 / host.limit)
+
+    def failure(self, host, retry_after=None, timed_out=False):
+        host.failed += 1
+        host.limit = max(1.0, host.limit / 2)
+        if timed_out:
+            host.timeout = min(self.max_timeout, host.timeout * 1.5)
+        if retry_after:
+            host.blocked_until = max(host.blocked_until, time.monotonic() + retry_after)
+
+    def stats(self):
+        return {name: {"limit": round(h.limit, 2), "timeout": round(h.timeout, 2),
+                       "latency": round(h.latency, 3) if h.latency is not None else None,
+                       "ok": h.ok, "failed": h.failed}
+                for name, h in self.hosts.items()}
+
+def parse_retry_after(value):
+    """Retry-After as seconds (delta or HTTP date), capped; None if absent/invalid."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0), MAX_RETRY_AFTER)
+
+async def with_retries(controller, url, attempt, idempotent=True, retries=MAX_RETRIES, metrics=None, site=None):
+    """
+    Run `attempt(timeout)` inside the host's slot and feed the outcome to
+    the controller. Only idempotent attempts are retried (429/5xx/timeouts/
+    connection errors), with jittered exponential backoff.
+    With `metrics`, the wait for a slot and the whole check (all attempts)
+    are recorded as the site's "slot" and "total" stages.
+    """
+    import aiohttp
+
+    began = time.perf_counter()
+    try:
+        for n in range(retries + 1):
+            queued = time.perf_counter()
+            async with controller.slot(url) as host:
+                if metrics:
+                    metrics.observe(site, "slot", time.perf_counter() - queued)
+                start = time.monotonic()
+                try:
+                    result = await attempt(aiohttp.ClientTimeout(total=host.timeout))
+                except RetryableStatus as e:
+                    controller.failure(host, retry_after=parse_retry_after(e.retry_after))
+                    error = e
+                except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                    controller.failure(host, timed_out=isinstance(e, asyncio.TimeoutError))
+                    error = e
+                else:
+                    controller.success(host, time.monotonic() - start)
+                    return result
+            if not idempotent or n == retries:
+                raise error
+            await asyncio.sleep(0.5 * 2 ** n * random.uniform(0.5, 1.5))
+    finally:
+        if metrics:
+            metrics.observe(site, "total", time.perf_counter() - began)
+
+async def read_body(response, limit=MAX_PARSE_BYTES):
+    """Whole body (up to `limit` bytes) of an aiohttp response."""
+    chunks, size = [], 0
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return b"".join(chunks)
+
+async def scan_body(response, scanner, pipeline=None, sink=None):
+    """
+    Match the body: streamed on the event loop (stops at the verdict), or
+    read whole and matched in a worker process when a pipeline is given.
+    Returns the scanner that holds the result.
+    """
+    if pipeline is None or not scanner.needs_body:
+        return await scan_response(response, scanner, sink=sink)
+    body = await read_body(response)
+    if sink is not None:
+        sink.append(body)
+    return await pipeline.run(scan_bytes, scanner, body)
+
+async def fetch_scan(session, url, scanner, cache=None, metrics=None, site=None, pipeline=None, **kwargs):
+    """
+    GET url and stream the body into `scanner`, stopping as soon as it has
+    a verdict. With a cache, fresh pages skip the network and stale ones
+    are revalidated; bodies cut short by an early stop are stored as partial
+    (replaying them gives the same verdict). Returns (HTTP status, scanner).
+    `site` labels the request for the metrics trace hooks.
+    """
+    entry = cache.get(url, complete=False) if cache else None
+    if cache and cache.fresh(entry):
+        cache.hit(entry)
+        scanner.feed(entry.body)
+        scanner.finish()
+        return entry.status, scanner
+
+    headers = {**HEADERS, **ResponseCache.validators(entry)}
+    async with session.get(url, headers=headers, trace_request_ctx=site, **kwargs) as response:
+        if response.status == 304 and entry is not None:
+            cache.not_modified(entry)
+            scanner.feed(entry.body)
+            scanner.finish()
+            return entry.status, scanner
+        if response.status in RETRY_STATUSES:
+            raise RetryableStatus(response.status, response.headers.get("Retry-After"))
+        if response.status != 200:
+            return response.status, scanner
+        chunks = [] if cache else None
+        start = time.perf_counter()
+        scanner = await scan_body(response, scanner, pipeline, sink=chunks)
+        if metrics:
+            metrics.observe(site, "body", time.perf_counter() - start)
+        if cache:
+            body = b"".join(chunks)
+            complete = not scanner.stopped if pipeline is None else len(body) < MAX_PARSE_BYTES
+            cache.put(url, response.status, response.headers, body, response.charset,
+                      final_url=str(response.url), complete=complete)
+        return response.status, scanner
+
+def error_result(site_name, error, **extra):
+    message = "timeout" if isinstance(error, asyncio.TimeoutError) else str(error) or type(error).__name__
+    result = {"site": site_name, **extra, "exists": False, "error": message}
+    if isinstance(error, RetryableStatus):
+        result["status_code"] = error.status
+    return result
+
+async def check_username_site(session, target, site_name, site_info, cache=None, controller=None, metrics=None,
+                              pipeline=None):
     url = site_info["url"].format(target)
-    indicators = site_info.get("not_found_indicators", [])
+    matcher = site_info.get("not_found_matcher") or get_matcher(tuple(site_info.get("not_found_indicators", ())))
+    controller = controller or HostController()
+
+    async def attempt(timeout):
+        scanner = BodyScanner({"not_found": matcher}, stop_on=("not_found",))
+        return await fetch_scan(session, url, scanner, cache, metrics, site_name, pipeline, timeout=timeout)
 
     try:
-        async with session.get(url, timeout=15, headers=HEADERS) as response:
-            status = response.status
-            if status == 404:
-                exists = False
-            elif status != 200:
-                exists = False
-            else:
-                text = await response.text()
-                soup = BeautifulSoup(text, 'html.parser')
-                page_text = soup.get_text(lower=True)
-                exists = not any(ind.lower() in page_text for ind in indicators if ind)
-                if not indicators:
-                    exists = True
+        status, scanner = await with_retries(controller, url, attempt, metrics=metrics, site=site_name)
+        if status == 404:
+            exists = False
+        elif status != 200:
+            exists = False
+        else:
+            # No indicators → a 200 is enough
+            exists = scanner.hits["not_found"] is None
 
-            return {
-                "site": site_name,
-                "url": url,
-                "exists": exists,
-                "status_code": status,
-            }
+        return {
+            "site": site_name,
+            "url": url,
+            "exists": exists,
+            "status_code": status,
+        }
     except Exception as e:
-        return {"site": site_name, "url": url, "exists": False, "error": str(e)}
+        return error_result(site_name, e, url=url)
 
-async def check_email_registration(session, email, site_name, site_info):
+async def check_email_registration(session, email, site_name, site_info, controller=None, metrics=None,
+                                   pipeline=None):
     url = site_info["url"]
     method = site_info.get("method", "GET")
-    exists_inds = site_info.get("exists_indicators", [])
-    not_exists_inds = site_info.get("not_exists_indicators", [])
+    matchers = {
+        "exists": site_info.get("exists_matcher") or get_matcher(tuple(site_info.get("exists_indicators", ()))),
+        "not_exists": site_info.get("not_exists_matcher") or get_matcher(tuple(site_info.get("not_exists_indicators", ()))),
+    }
 
     payload = None
     if "{email}" in str(site_info.get("data", "")) or "{email}" in str(site_info.get("json", "")):
@@ -109,109 +274,236 @@ async def check_email_registration(session, email, site_name, site_info):
         elif "json" in site_info:
             payload = {k: v.format(email=email) for k, v in site_info["json"].items()}
 
-    try:
+    controller = controller or HostController()
+
+    async def attempt(timeout):
         if method == "POST":
-            if "json" in site_info:
-                async with session.post(url, json=payload, timeout=15, headers={**HEADERS, **site_info.get("headers", {})}) as resp:
-                    text = await resp.text()
-                    status = resp.status
-            else:
-                async with session.post(url, data=payload, timeout=15, headers={**HEADERS, **site_info.get("headers", {})}) as resp:
-                    text = await resp.text()
-                    status = resp.status
+            body_arg = "json" if "json" in site_info else "data"
+            request = session.post(url, **{body_arg: payload}, timeout=timeout, trace_request_ctx=site_name,
+                                   headers={**HEADERS, **site_info.get("headers", {})})
         else:
-            async with session.get(url, timeout=15, headers=HEADERS) as resp:
-                text = await resp.text()
-                status = resp.status
+            request = session.get(url, timeout=timeout, headers=HEADERS, trace_request_ctx=site_name)
 
-        soup = BeautifulSoup(text, 'html.parser')
-        page_text = soup.get_text(lower=True)
         json_resp = None
-        try:
-            json_resp = await resp.json()
-        except:
-            pass
-
-        exists = False
-        if json_resp:
-            exists = any(ind.lower() in str(json_resp).lower() for ind in exists_inds)
-            exists = exists or not any(ind.lower() in str(json_resp).lower() for ind in not_exists_inds)
-        else:
-            exists = any(ind.lower() in page_text for ind in exists_inds)
-            exists = exists or not any(ind.lower() in page_text for ind in not_exists_inds)
+        async with request as resp:
+            if resp.status in RETRY_STATUSES:
+                raise RetryableStatus(resp.status, resp.headers.get("Retry-After"))
+            start = time.perf_counter()
+            if resp.content_type == "application/json":
+                # Small API answers: read whole, match against the raw JSON text
+                scanner = BodyScanner(matchers, encoding=resp.charset, strip_tags=False)
+                body = await resp.read()
+                scanner.feed(body)
+                scanner.finish()
+                try:
+                    json_resp = json.loads(body)
+                except ValueError:
+                    pass
+            else:
+                # An "exists" indicator settles it – stop reading there
+                scanner = BodyScanner(matchers, encoding=resp.charset, stop_on=("exists",))
+                scanner = await scan_body(resp, scanner, pipeline)
+            if metrics:
+                metrics.observe(site_name, "body", time.perf_counter() - start)
+        return resp.status, scanner, json_resp
+
+    try:
+        # Password-reset POSTs are not idempotent → never retried
+        status, scanner, json_resp = await with_retries(controller, url, attempt, idempotent=(method == "GET"),
+                                                        metrics=metrics, site=site_name)
+        exists = scanner.hits["exists"] is not None or scanner.hits["not_exists"] is None
 
         return {
             "site": site_name,
             "exists": exists,
             "status_code": status,
-            "response_snippet": text[:200] if not json_resp else json_resp,
+            "response_snippet": scanner.head[:200] if not json_resp else json_resp,
         }
     except Exception as e:
-        return {"site": site_name, "exists": False, "error": str(e)}
+        return error_result(site_name, e)
+
+async def email_reputation(session, email, controller=None, metrics=None):
+    url = REPUTATION_URL.format(email)
+    controller = controller or HostController()
+
+    async def attempt(timeout):
+        async with session.get(url, timeout=timeout, headers=HEADERS, trace_request_ctx=REPUTATION_SITE) as resp:
+            if resp.status in RETRY_STATUSES:
+                raise RetryableStatus(resp.status, resp.headers.get("Retry-After"))
+            start = time.perf_counter()
+            data = await resp.json() if resp.status == 200 else None
+            if metrics:
+                metrics.observe(REPUTATION_SITE, "body", time.perf_counter() - start)
+            return resp.status, data
 
-async def email_reputation(session, email):
-    url = f"https://emailrep.io/{email}"
     try:
-        async with session.get(url, timeout=15, headers=HEADERS) as resp:
-            if resp.status == 200:
-                data = await resp.json()
-                return {
-                    "reputation": data.get("reputation"),
-                    "suspicious": data.get("suspicious"),
-                    "references": data.get("references"),
-                    "known_profiles": data.get("details", {}).get("profiles", []),
-                    "blacklisted": data.get("details", {}).get("blacklisted"),
-                    "data_breach": data.get("details", {}).get("data_breach"),
-                    "credentials_leaked": data.get("details", {}).get("credentials_leaked"),
-                    "summary": data.get("summary", ""),
-                }
-            else:
-                return {"error": f"Status {resp.status}"}
+        status, data = await with_retries(controller, url, attempt, metrics=metrics, site=REPUTATION_SITE)
+        if status == 200:
+            return {
+                "reputation": data.get("reputation"),
+                "suspicious": data.get("suspicious"),
+                "references": data.get("references"),
+                "known_profiles": data.get("details", {}).get("profiles", []),
+                "blacklisted": data.get("details", {}).get("blacklisted"),
+                "data_breach": data.get("details", {}).get("data_breach"),
+                "credentials_leaked": data.get("details", {}).get("credentials_leaked"),
+                "summary": data.get("summary", ""),
+            }
+        else:
+            return {"error": f"Status {status}"}
     except Exception as e:
         return {"error": str(e)}
 
-async def main(target, proxies=None, max_concurrent=30):
-    is_email = re.match(r"^[^@]+@[^@]+\.[^@]+$", target)
+def make_session(max_concurrent=30, proxies=None, metrics=None, net=None):
+    import aiohttp      # imported on first use: --help and argument errors never pay for it
+    # The connector limit is the global cap on in-flight requests
+    # net: shared NetCache – its DNS answers outlive the session, and new/reused connections are counted
+    if net:
+        connector = aiohttp.TCPConnector(limit=max_concurrent, resolver=net.aiohttp_resolver(),
+                                         use_dns_cache=False, keepalive_timeout=KEEPALIVE)
+    else:
+        connector = aiohttp.TCPConnector(limit=max_concurrent)
+    timeout = aiohttp.ClientTimeout(total=40)
+    # Trace hooks only when measuring: without them aiohttp skips tracing entirely
+    traces = ([trace_config(metrics)] if metrics else []) + ([net.trace_config()] if net else [])
+    session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS, trace_configs=traces or None)
+    if proxies:
+        session.proxy = random.choice(proxies)
+    return session
+
+def select_sites(tags=DEFAULT_TAGS, path=DEFAULT_SITES):
+    return {kind: load_sites(kind, tags, path) for kind in ("username", "email")}
 
-    results = {"target": target, "type": "email" if is_email else "username"}
+def site_urls(sites):
+    """Every URL (template) the checks will hit, for connection warm-up."""
+    return [info["url"] for kind in sites.values() for info in kind.values()] + [REPUTATION_URL]
 
-    connector = aiohttp.TCPConnector(limit=max_concurrent)
-    timeout = aiohttp.ClientTimeout(total=40)
+def is_email(target):
+    return re.match(r"^[^@]+@[^@]+\.[^@]+$", target) is not None
 
-    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS) as session:
-        if proxies:
-            session.proxy = random.choice(proxies)
+async def iter_checks(session, target, cache=None, sites=None, controller=None, metrics=None, pipeline=None,
+                      deadline=None, store=None):
+    """
+    Start every check for `target` at once – for an email the reputation
+    lookup runs alongside the registration checks – and yield (kind, result)
+    as each one finishes; kind is "username", "email" or "reputation".
+    With `deadline` (seconds), checks still running then are cancelled and
+    yielded with error "timeout", so a slow site can't hold the target up.
+    With `store` (ResultStore), sites checked recently enough are answered
+    from it (result gains "checked_at") and every new result is recorded.
+    """
+    sites = sites or select_sites()
+    controller = controller or HostController()
+    kind = "email" if is_email(target) else "username"
+    fresh = {}
+    if store:
+        ttls = {name: info.get("result_ttl") for name, info in sites[kind].items()}
+        if kind == "email":
+            ttls[REPUTATION_SITE] = None
+        fresh = store.fresh(target, ttls)
 
-        tasks = []
+    checks = {}       # task → (kind, site, what to report if it times out)
+    for site_name, site_info in sites[kind].items():
+        if site_name in fresh:
+            continue
+        if kind == "email":
+            check = check_email_registration(session, target, site_name, site_info, controller, metrics, pipeline)
+            timeout = error_result(site_name, asyncio.TimeoutError())
+        else:
+            check = check_username_site(session, target, site_name, site_info, cache, controller, metrics, pipeline)
+            timeout = error_result(site_name, asyncio.TimeoutError(), url=site_info["url"].format(target))
+        checks[asyncio.create_task(check)] = (kind, site_name, timeout)
+    if kind == "email" and REPUTATION_SITE not in fresh:
+        task = asyncio.create_task(email_reputation(session, target, controller, metrics))
+        checks[task] = ("reputation", REPUTATION_SITE, {"error": "timeout"})
+
+    for site_name, result in fresh.items():
+        yield "reputation" if site_name == REPUTATION_SITE else kind, result
+
+    loop = asyncio.get_running_loop()
+    finished = asyncio.Queue()
+    for task in checks:
+        task.add_done_callback(finished.put_nowait)
+    end = loop.time() + deadline if deadline is not None else None
+    pending = set(checks)
+    try:
+        while pending:
+            try:
+                task = await asyncio.wait_for(finished.get(), None if end is None else max(0, end - loop.time()))
+            except asyncio.TimeoutError:
+                break
+            pending.discard(task)
+            check_kind, site_name, _ = checks[task]
+            if store:
+                store.put(target, check_kind, task.result(), site_name)
+            yield check_kind, task.result()
+        for task in pending:
+            task.cancel()
+        if pending:
+            # Let the cancelled checks release their host slots and connections
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task in pending:
+            check_kind, site_name, timeout = checks[task]
+            if store:
+                store.put(target, check_kind, timeout, site_name)
+            yield check_kind, timeout
+    finally:
+        for task in pending:
+            task.cancel()
 
-        if not is_email:
-            # Username checks
-            for site_name, site_info in USERNAME_SITES.items():
-                tasks.append(check_username_site(session, target, site_name, site_info))
+def build_report(target, checks):
+    """Report dict for `target` from its (kind, result) pairs, in any order."""
+    results = {"target": target, "type": "email" if is_email(target) else "username"}
+    found, missed, reputation = [], [], None
+    for kind, result in checks:
+        if kind == "reputation":
+            reputation = result
         else:
-            # Email registration checks
-            email_tasks = []
-            for site_name, site_info in EMAIL_SITES.items():
-                email_tasks.append(check_email_registration(session, target, site_name, site_info))
-            email_results = await asyncio.gather(*email_tasks)
+            (found if result.get("exists", False) else missed).append(result)
 
-            # Email reputation
-            rep_task = email_reputation(session, target)
+    if results["type"] == "email":
+        results["email_registration"] = sorted(found, key=lambda x: x["site"])
+        results["email_not_registered"] = sorted(missed, key=lambda x: x["site"])
+        results["email_reputation"] = reputation
+    else:
+        results["username_profiles_found"] = sorted(found, key=lambda x: x["site"])
+        results["username_profiles_not_found"] = sorted(missed, key=lambda x: x["site"])
 
-            rep_result = await rep_task
+    return results
 
-            results["email_registration"] = [r for r in email_results if r["exists"]]
-            results["email_not_registered"] = [r for r in email_results if not r["exists"]]
-            results["email_reputation"] = rep_result
+async def investigate(session, target, cache=None, sites=None, controller=None, metrics=None, pipeline=None,
+                      deadline=None, on_result=None, store=None):
+    """Full report for `target`; on_result(kind, result) is called as each check finishes (see iter_checks)."""
+    checks = []
+    async for kind, result in iter_checks(session, target, cache, sites, controller, metrics, pipeline, deadline,
+                                          store):
+        if on_result:
+            on_result(kind, result)
+        checks.append((kind, result))
+    return build_report(target, checks)
 
-        if not is_email:
-            username_results = await asyncio.gather(*tasks)
-            found = [r for r in username_results if r.get("exists", False)]
-            not_found = [r for r in username_results if not r.get("exists", False)]
-            results["username_profiles_found"] = sorted(found, key=lambda x: x["site"])
-            results["username_profiles_not_found"] = sorted(not_found, key=lambda x: x["site"])
+@contextlib.asynccontextmanager
+async def _no_pool():
+    yield None
 
-    print(json.dumps(results, indent=4))
+def parse_pool(workers):
+    """ParsePipeline with `workers` processes, or a no-op context (match inline while streaming) for 0."""
+    return ParsePipeline(workers) if workers else _no_pool()
+
+def print_result(kind, result):
+    """--stream: one JSON line per finished check."""
+    print(json.dumps({"check": kind, **result}), flush=True)
+
+async def main(target, proxies=None, max_concurrent=30, cache=None, sites=None, metrics=None, parse_workers=0,
+               deadline=None, stream=False, store=None):
+    async with make_session(max_concurrent, proxies, metrics, NET) as session, parse_pool(parse_workers) as pipeline:
+        results = await investigate(session, target, cache, sites, HostController(), metrics, pipeline, deadline,
+                                    print_result if stream else None, store)
+        if pipeline:
+            print(pipeline.summary(), file=sys.stderr)
+
+    if not stream:
+        print(json.dumps(results, indent=4))
 
     filename = f"{target.replace('@', '_at_')}_osint_report.json"
     with open(filename, "w") as f:
@@ -219,10 +511,112 @@ async def main(target, proxies=None, max_concurrent=30):
 
     print(f"\nFull report saved to {filename}")
 
+async def batch(source, out, proxies=None, max_concurrent=30, targets_in_flight=8, cache=None, sites=None,
+                metrics=None, parse_workers=0, warmup=True, deadline=None, store=None):
+    """
+    Investigate every target in `source` (one per line, '#' comments) over a
+    single session/connection pool and write one JSONL record per target to
+    `out` as soon as it completes. Input is read lazily through a bounded
+    queue, so memory stays flat however long the list is.
+    With parse_workers > 0 indicator matching runs in that many processes.
+    With warmup, one keep-alive connection per site host is opened first
+    (all at once), so the first targets don't pay DNS/TCP/TLS per site.
+    With deadline, no target takes longer than that many seconds.
+    With store (ResultStore), only stale or unknown target/site pairs are checked.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=targets_in_flight * 2)
+    controller = HostController()      # shared: per-host limits keep learning across targets
+    done = 0
+
+    async def producer():
+        while True:
+            line = await loop.run_in_executor(None, source.readline)
+            if not line:
+                break
+            target = line.strip()
+            if target and not target.startswith("#"):
+                await queue.put(target)
+        for _ in range(targets_in_flight):
+            await queue.put(None)
+
+    async def worker(session):
+        nonlocal done
+        while (target := await queue.get()) is not None:
+            results = await investigate(session, target, cache, sites, controller, metrics, pipeline, deadline,
+                                        store=store)
+            out.write(json.dumps(results) + "\n")
+            out.flush()
+            done += 1
+
+    async with make_session(max_concurrent, proxies, metrics, NET) as session, parse_pool(parse_workers) as pipeline:
+        if warmup and not proxies:
+            start = time.perf_counter()
+            warmed = await NET.warm_aiohttp(session, site_urls(sites or select_sites()))
+            print(f"pre-warmed {warmed} host(s) in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        await asyncio.gather(producer(), *(worker(session) for _ in range(targets_in_flight)))
+        if pipeline:
+            print(pipeline.summary(), file=sys.stderr)
+    return done
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Ultimate Async Username & Email OSINT Tool")
-    parser.add_argument("target", help="Username or Email to investigate")
+    parser.add_argument("target", nargs="?", help="Username or Email to investigate")
+    parser.add_argument("--batch", metavar="FILE", help="Investigate every target in FILE (one per line, '-' = stdin)")
+    parser.add_argument("-o", "--output", metavar="FILE", help="JSONL output for --batch (default stdout)")
+    parser.add_argument("--max-concurrent", type=int, default=30, help="Global cap on in-flight requests (default 30)")
+    parser.add_argument("--targets-in-flight", type=int, default=8, help="Targets investigated at once in --batch mode (default 8)")
+    parser.add_argument("--tags", help=f"Comma-separated site tags from the registry (default {','.join(DEFAULT_TAGS)}; 'all' = every site)")
+    parser.add_argument("--sites", default=DEFAULT_SITES, help="Site registry file (default kArmas_sites.json)")
     parser.add_argument("--proxies", nargs="*", help="List of proxies (e.g. http://127.0.0.1:8080)")
+    parser.add_argument("--cache", action="store_true", help="Reuse cached profile pages (ETag/Last-Modified revalidation)")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE, help=f"Cache database (default {DEFAULT_CACHE})")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL, help=f"Seconds before a cached page is revalidated (default {DEFAULT_TTL})")
+    parser.add_argument("--results", action="store_true",
+                        help="Record verdicts in the result index and skip sites checked within their freshness TTL")
+    parser.add_argument("--results-path", default=DEFAULT_RESULTS, help=f"Result index (default {DEFAULT_RESULTS})")
+    parser.add_argument("--results-ttl", type=float, default=RESULTS_TTL,
+                        help=f"Seconds a verdict stays fresh unless the site sets result_ttl (default {RESULTS_TTL})")
+    parser.add_argument("--metrics", metavar="FILE", help="Time every request stage per site; print a summary and write FILE (.prom = Prometheus text, else JSON)")
+    parser.add_argument("--parse-workers", type=int, default=0, metavar="N",
+                        help="Match page bodies in N worker processes (big batches on multi-core; default 0 = inline while streaming)")
+    parser.add_argument("--no-warmup", action="store_true", help="--batch: don't pre-open connections to every site host first")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="Give each target at most SECONDS; checks still running are cancelled and reported as 'timeout'")
+    parser.add_argument("--stream", action="store_true",
+                        help="Print each check as a JSON line the moment it finishes instead of one report at the end")
     args = parser.parse_args()
+    if not args.target and not args.batch:
+        parser.error("give a target or --batch FILE")
 
-    asyncio.run(main(args.target, proxies=args.proxies))
+    tags = parse_tags(args.tags) or DEFAULT_TAGS
+    sites = select_sites(None if tags == ["all"] else tags, args.sites)
+    cache = ResponseCache(args.cache_path, ttl=args.cache_ttl) if args.cache else None
+    metrics = Metrics() if args.metrics else None
+    store = ResultStore(args.results_path, ttl=args.results_ttl) if args.results else None
+    if args.batch:
+        source = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        try:
+            count = asyncio.run(batch(source, out, proxies=args.proxies, max_concurrent=args.max_concurrent,
+                                      targets_in_flight=args.targets_in_flight, cache=cache, sites=sites,
+                                      metrics=metrics, parse_workers=args.parse_workers, warmup=not args.no_warmup,
+                                      deadline=args.deadline, store=store))
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        print(f"{count} target(s) investigated", file=sys.stderr)
+    else:
+        asyncio.run(main(args.target, proxies=args.proxies, max_concurrent=args.max_concurrent, cache=cache, sites=sites,
+                         metrics=metrics, parse_workers=args.parse_workers, deadline=args.deadline, stream=args.stream,
+                         store=store))
+    if cache:
+        print(cache.summary(), file=sys.stderr if args.batch else sys.stdout)
+        cache.close()
+    if store:
+        print(store.summary(), file=sys.stderr if args.batch else sys.stdout)
+        store.close()
+    if metrics:
+        print(metrics.table(), file=sys.stderr if args.batch else sys.stdout)
+        metrics.dump(args.metrics)
+    print(NET.summary(), file=sys.stderr if args.batch else sys.stdout)
@@ -8,14 +8,25 @@ Made in l0v3 by kArmasec
 
 import sys
 import time
+import threading
 import requests
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from kArmas_httpcache import ResponseCache, DEFAULT_CACHE, DEFAULT_TTL
+from kArmas_matcher import BodyScanner, CHUNK_SIZE, get_matcher, scan_iter
+from kArmas_metrics import Metrics, instrument_session
+from kArmas_netcache import NET
+from kArmas_results import ResultStore, DEFAULT_RESULTS, DEFAULT_TTL as RESULTS_TTL
+from kArmas_sites import DEFAULT_SITES, generic_matcher, load_sites, parse_tags
+
 # Matrix theme ANSI
 GREEN   = "\u001B[32m"
 BLUE    = "\u001B[34m"
+RED     = "\u001B[31m"
 CYAN    = "\u001B[36m"
 BOLD    = "\u001B[1m"
 DIM     = "\u001B[2m"
@@ -25,10 +36,12 @@ def vprint(verbose, *args, **kwargs):
     if verbose:
         print(*args, **kwargs)
 
-def get_session(use_tor=False, tor_port=9050, verbose=False):
+def get_session(use_tor=False, tor_port=9050, verbose=False, pool_size=10, pool_hosts=32):
     session = requests.Session()
     retry_strategy = Retry(total=2, backoff_factor=1.5, status_forcelist=[429, 500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    # pool_maxsize = connections kept per host, must cover the worker threads
+    # pool_connections = hosts kept, must cover the registry or warm connections get evicted
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=pool_hosts, pool_maxsize=pool_size)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
 
@@ -47,44 +60,74 @@ def get_session(use_tor=False, tor_port=9050, verbose=False):
 
     return session
 
-def check_profile_exists(url, session, verbose=False):
-    not_found_indicators = [
-        "not found", "doesn't exist", "page isn't available", "sorry, this page",
-        "this content isn't available", "user not found", "profile not found",
-        "account doesn't exist", "oops", "error", "unavailable", "404", "gone",
-        "no results", "invalid username", "this channel does not exist",
-        "unless you’ve got a time machine", "sorry. unless", "page not found"
-    ]
+REDIRECT_TRAPS = ['login', 'search', 'error', 'notfound', 'signup']
+MAX_BODY_BYTES = 256 * 1024     # stop reading a profile page after this many bytes
+STUB_CHARS = 500                # shorter pages without "profile" are treated as stubs
+
+def check_profile_exists(url, session, verbose=False, cache=None, max_bytes=MAX_BODY_BYTES, matcher=None,
+                         metrics=None, site=None):
+    # One streamed GET: status and redirect trap come from the response
+    # (and its redirect history) before any body is read, then only as much
+    # of the body as the indicators need, capped at max_bytes.
+    # matcher: the site's precompiled not-found indicators (registry), generic ones by default
+    # metrics: records "ttfb" (requests' elapsed, incl. connection setup) and "body" under `site`
+    # Returns True (profile), False (no profile) or None when the check itself failed
+    # (network/Tor error, timeout): that says nothing about the profile.
+    scanner = BodyScanner(
+        {"not_found": matcher or generic_matcher(), "profile": get_matcher(("profile",))},
+        strip_tags=False, stop_on=("not_found",),
+    )
 
     try:
-        head_resp = session.head(url, allow_redirects=True, timeout=12)
-        final_url = head_resp.url.rstrip('/')
+        entry = cache.get(url, complete=False) if cache else None
+        if cache and cache.fresh(entry):
+            cache.hit(entry)
+            status, final_url, hops = entry.status, entry.final_url.rstrip('/'), "cached"
+            body = entry.body
+        else:
+            headers = ResponseCache.validators(entry)
+            with session.get(url, headers=headers, stream=True, allow_redirects=True, timeout=15) as resp:
+                status, final_url, hops = resp.status_code, resp.url.rstrip('/'), len(resp.history)
+                if metrics:
+                    metrics.observe(site, "ttfb", resp.elapsed.total_seconds())
+                body = None
+                if status == 304 and entry is not None:
+                    cache.not_modified(entry)
+                    status, final_url, body = entry.status, entry.final_url.rstrip('/'), entry.body
+                elif status == 200 and not is_redirect_trap(url, final_url):
+                    chunks = [] if cache else None
+                    start = time.perf_counter()
+                    scan_iter(resp.iter_content(CHUNK_SIZE), scanner, limit=max_bytes, sink=chunks)
+                    if metrics:
+                        metrics.observe(site, "body", time.perf_counter() - start)
+                    if cache:
+                        complete = not scanner.stopped and scanner.nbytes < max_bytes
+                        cache.put(url, status, resp.headers, b"".join(chunks), resp.encoding,
+                                  final_url=resp.url, complete=complete)
 
-        vprint(verbose, f"{DIM}HEAD → {head_resp.status_code} | Final: {final_url}{RESET}")
+        vprint(verbose, f"{DIM}GET → {status} | Final: {final_url} | Redirects: {hops}{RESET}")
 
-        if head_resp.status_code != 200:
+        if status != 200:
             vprint(verbose, f"{DIM}Rejected: Non-200{RESET}")
             return False
 
-        get_resp = session.get(final_url, timeout=15, allow_redirects=True)
-        final_url_get = get_resp.url.rstrip('/')
-        text_lower = get_resp.text.lower()
-        text_snippet = get_resp.text[:200].replace('\n', ' ').strip()
+        if is_redirect_trap(url, final_url):
+            vprint(verbose, f"{DIM}Rejected: Redirect trap → {final_url}{RESET}")
+            return False
 
-        vprint(verbose, f"{DIM}GET → {get_resp.status_code} | Len: {len(get_resp.text)} | Snippet: {text_snippet}...{RESET}")
+        if body is not None:
+            scan_iter([body], scanner, limit=max_bytes)
 
-        orig_clean = url.rstrip('/')
-        if final_url_get != orig_clean and any(x in final_url_get.lower() for x in ['login', 'search', 'error', 'notfound', 'signup']):
-            vprint(verbose, f"{DIM}Rejected: Redirect trap → {final_url_get}{RESET}")
-            return False
+        text_snippet = scanner.head.replace('\n', ' ').strip()
+        vprint(verbose, f"{DIM}Read: {scanner.nbytes} bytes{' (stopped early)' if scanner.stopped else ''} | Snippet: {text_snippet}...{RESET}")
 
-        found_fp = next((ind for ind in not_found_indicators if ind in text_lower), None)
+        found_fp = scanner.hits["not_found"]
         if found_fp:
             vprint(verbose, f"{DIM}Rejected: FP '{found_fp}' detected{RESET}")
             return False
 
-        if len(get_resp.text) < 500 and "profile" not in text_lower:
-            vprint(verbose, f"{DIM}Rejected: Stub page (<500 chars, no profile){RESET}")
+        if scanner.nchars < STUB_CHARS and not scanner.hits["profile"]:
+            vprint(verbose, f"{DIM}Rejected: Stub page (<{STUB_CHARS} chars, no profile){RESET}")
             return False
 
         vprint(verbose, f"{DIM}PASSED → Valid profile{RESET}")
@@ -92,7 +135,53 @@ def check_profile_exists(url, session, verbose=False):
 
     except Exception as e:
         vprint(verbose, f"{DIM}Error: {str(e)}{RESET}")
-        return False
+        return None
+
+def is_redirect_trap(url, final_url):
+    return final_url != url.rstrip('/') and any(x in final_url.lower() for x in REDIRECT_TRAPS)
+
+class HostThrottle:
+    """Minimum spacing between requests to the same host, shared by all worker threads."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next = {}
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+def check_sites(sites, session, workers=8, delay=0.3, verbose=False, cache=None, max_bytes=MAX_BODY_BYTES,
+                matchers=None, metrics=None):
+    """
+    Check all sites ({name: url}) on a thread pool over one pooled session.
+    `matchers` maps site names to their compiled not-found indicators.
+    Different sites overlap; the same host is still spaced by `delay`.
+    Yields (site, url, exists) as checks finish; exists is None if the check failed.
+    """
+    throttle = HostThrottle(delay)
+
+    def run(site, url):
+        throttle.wait(url)
+        vprint(verbose, f"{DIM}--- {site} ---{RESET}")
+        matcher = matchers.get(site) if matchers else None
+        if not metrics:
+            return site, url, check_profile_exists(url, session, verbose=verbose, cache=cache,
+                                                   max_bytes=max_bytes, matcher=matcher)
+        with metrics.labelled(site), metrics.timer(site, "total"):
+            return site, url, check_profile_exists(url, session, verbose=verbose, cache=cache, max_bytes=max_bytes,
+                                                   matcher=matcher, metrics=metrics, site=site)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run, site, url) for site, url in sites.items()]
+        for future in as_completed(futures):
+            yield future.result()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -103,12 +192,27 @@ if __name__ == "__main__":
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose logging")
     parser.add_argument("-t", "--tor", action="store_true", help="Route all requests through Tor SOCKS5 (127.0.0.1:9050)")
     parser.add_argument("--tor-port", type=int, default=9050, help="Tor SOCKS port (default 9050, Orbot often 9150)")
+    parser.add_argument("--tags", help="Only sites with these comma-separated registry tags (e.g. social,dev)")
+    parser.add_argument("--sites", default=DEFAULT_SITES, help="Site registry file (default kArmas_sites.json)")
+    parser.add_argument("-w", "--workers", type=int, help="Sites checked in parallel (default 8, 4 over Tor; 1 = serial)")
+    parser.add_argument("--max-bytes", type=int, default=MAX_BODY_BYTES, help=f"Stop reading a profile page after N bytes (default {MAX_BODY_BYTES})")
+    parser.add_argument("--cache", action="store_true", help="Reuse cached profile pages (ETag/Last-Modified revalidation)")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE, help=f"Cache database (default {DEFAULT_CACHE})")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL, help=f"Seconds before a cached page is revalidated (default {DEFAULT_TTL})")
+    parser.add_argument("--results", action="store_true",
+                        help="Record verdicts in the result index and skip sites checked within their freshness TTL")
+    parser.add_argument("--results-path", default=DEFAULT_RESULTS, help=f"Result index (default {DEFAULT_RESULTS})")
+    parser.add_argument("--results-ttl", type=float, default=RESULTS_TTL,
+                        help=f"Seconds a verdict stays fresh unless the site sets result_ttl (default {RESULTS_TTL})")
+    parser.add_argument("--metrics", metavar="FILE", help="Time connect/TLS/TTFB/body per site; print a summary and write FILE (.prom = Prometheus text, else JSON)")
+    parser.add_argument("--no-warmup", action="store_true", help="Don't pre-open connections to every site before checking")
 
     args = parser.parse_args()
     username = args.username.strip()
     verbose = args.verbose
     use_tor = args.tor
     tor_port = args.tor_port
+    workers = args.workers or (4 if use_tor else 8)
 
     # Banner
     print(f"{GREEN}{BOLD}")
@@ -131,33 +235,60 @@ if __name__ == "__main__":
 
     print(f"{BLUE}{DIM}Target:{RESET} {BOLD}{GREEN}{username}{RESET}\n")
 
-    session = get_session(use_tor=use_tor, tor_port=tor_port, verbose=verbose)
-
-    sites = {
-        'Twitter/X':    f"https://x.com/{username}",
-        'Instagram':    f"https://www.instagram.com/{username}/",
-        'GitHub':       f"https://github.com/{username}",
-        'TikTok':       f"https://www.tiktok.com/@{username}",
-        'Reddit':       f"https://www.reddit.com/user/{username}/",
-        'YouTube':      f"https://www.youtube.com/@{username}",
-        'Facebook':     f"https://www.facebook.com/{username}",
-        'LinkedIn':     f"https://www.linkedin.com/in/{username}",
-        'Pinterest':    f"https://www.pinterest.com/{username}/",
-        'Snapchat':     f"https://www.snapchat.com/add/{username}",
-        'Twitch':       f"https://www.twitch.tv/{username}",
-        'Threads':      f"https://www.threads.net/@{username}",
-        'Bluesky':      f"https://bsky.app/profile/{username}.bsky.social",
-    }
+    registry = load_sites("username", parse_tags(args.tags), args.sites)
+    sites = {name: info["url"].format(username) for name, info in registry.items()}
+    matchers = {name: info["profile_matcher"] for name, info in registry.items()}
 
-    for site, url in sites.items():
-        vprint(verbose, f"{DIM}--- {site} ---{RESET}")
-        exists = check_profile_exists(url, session, verbose=verbose)
+    store = ResultStore(args.results_path, ttl=args.results_ttl) if args.results else None
+    if store:
+        stored = store.fresh(username, {name: info.get("result_ttl") for name, info in registry.items()})
+        for site, result in sorted(stored.items()):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(result["checked_at"]))
+            if result["exists"]:
+                print(f"{GREEN}{BOLD}[FOUND]{RESET} {GREEN}{site:<12}{RESET}: {CYAN}{result['url']}{RESET} {DIM}(checked {when}){RESET}")
+            else:
+                print(f"{BLUE}{BOLD}[MISS]{RESET}  {BLUE}{site:<12}{RESET}: {DIM}{result['url']} (checked {when}){RESET}")
+        sites = {name: url for name, url in sites.items() if name not in stored}
+
+    session = get_session(use_tor=use_tor, tor_port=tor_port, verbose=verbose, pool_size=workers,
+                          pool_hosts=max(32, len(sites)))
+    cache = ResponseCache(args.cache_path, ttl=args.cache_ttl) if args.cache else None
+    metrics = Metrics() if args.metrics else None
+    if metrics:
+        instrument_session(session, metrics)
+    if not use_tor:                 # over Tor, names must keep resolving on the exit side
+        NET.install(session)
+        if not args.no_warmup:
+            start = time.perf_counter()
+            warmed = NET.warm_requests(session, sites.values())
+            vprint(verbose, f"{GREEN}{DIM}Pre-warmed {warmed} host(s) in {time.perf_counter() - start:.2f}s{RESET}")
 
+    delay = 0.8 if use_tor or verbose else 0.3  # Slower on Tor to avoid circuit overload
+    for site, url, exists in check_sites(sites, session, workers=workers, delay=delay, verbose=verbose,
+                                         cache=cache, max_bytes=args.max_bytes, matchers=matchers, metrics=metrics):
+        if store:                   # failed checks are stored as errors, so the next run retries them
+            store.put(username, "username", {"site": site, "url": url, "exists": bool(exists),
+                                             "error": "check failed" if exists is None else None})
         if exists:
             print(f"{GREEN}{BOLD}[FOUND]{RESET} {GREEN}{site:<12}{RESET}: {CYAN}{url}{RESET}")
+        elif exists is None:
+            print(f"{RED}{BOLD}[ERROR]{RESET} {RED}{site:<12}{RESET}: {DIM}{url} (check failed){RESET}")
         else:
             print(f"{BLUE}{BOLD}[MISS]{RESET}  {BLUE}{site:<12}{RESET}: {DIM}{url}{RESET}")
 
-        time.sleep(0.8 if use_tor or verbose else 0.3)  # Slower on Tor to avoid circuit overload
+    if cache:
+        print(f"\n{CYAN}{DIM}{cache.summary()}{RESET}")
+        cache.close()
+
+    if store:
+        print(f"\n{CYAN}{DIM}{store.summary()}{RESET}")
+        store.close()
+
+    if metrics:
+        print(f"\n{CYAN}{DIM}{metrics.table()}{RESET}")
+        metrics.dump(args.metrics)
+
+    if not use_tor:
+        print(f"\n{CYAN}{DIM}{NET.summary()}{RESET}")
 
     print(f"\n{GREEN}{DIM}Operation complete. White rabbit followed.{RESET}")
@@ -2,19 +2,39 @@
 """
 -------------------------------------------------------------
 kArmasec Ultimate Web Scraper - Termux Edition v1.3-fixed
-Professional scraper (requests + BeautifulSoup)
+Professional scraper (requests + streaming link extraction)
 Made by kArmasec → fixed & hardened for Termux ~2026
 -------------------------------------------------------------
 """
 
+from __future__ import annotations
+
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import argparse
+import asyncio
+import codecs
+import hashlib
+import json
+import heapq
+import tempfile
 import time
 import logging
 import sys
 import os
 
+from kArmas_blobstore import BlobStore, DEFAULT_COMPRESS, SUFFIXES
+from kArmas_dedup import SimHasher, TrapDetector, DEFER, DROP
+from kArmas_httpcache import ResponseCache, requests_get, DEFAULT_CACHE, DEFAULT_TTL
+from kArmas_links import LinkExtractor, PageLinks
+from kArmas_pipeline import ParsePipeline, parse_page
+from kArmas_robots import RobotsCache
+from kArmas_sitemap import SitemapReader
+from kArmas_metrics import Metrics, instrument_session
+
 # ─── Colors for Termux ───────────────────────────────────────
 class Colors:
     BLUE   = '\033[94m'
@@ -43,6 +63,11 @@ RATE_DELAY     = 8     # seconds – be polite
 MAX_PAGES      = 15
 MAX_RETRIES    = 3
 RETRY_BACKOFF  = 2.5
+CONCURRENCY    = 4     # parallel fetches in --async mode (delay stays per host)
+FRONTIER_MEMORY = 100_000   # queued URLs kept in RAM before the frontier spills to disk
+CHECKPOINT_FILE = os.path.join(OUTPUT_DIR, "crawl.journal")
+STREAM_CHUNK   = 64 * 1024   # bytes read at a time while streaming a page to disk
+NO_LINKS       = PageLinks(set(), None, False, 0)
 
 
 def termux_setup():
@@ -66,35 +91,58 @@ class ColoredFormatter(logging.Formatter):
         return super().format(record)
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=f"{Colors.BOLD}%(asctime)s{Colors.END} %(levelname)s: %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+def setup_logging():
+    """Colored INFO logging to stdout – called by the CLI, importing the module configures nothing."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"{Colors.BOLD}%(asctime)s{Colors.END} %(levelname)s: %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
 
-for h in logging.getLogger().handlers:
-    h.setFormatter(ColoredFormatter("%(asctime)s %(levelname)s: %(message)s"))
+    for h in logging.getLogger().handlers:
+        h.setFormatter(ColoredFormatter("%(asctime)s %(levelname)s: %(message)s"))
 
-logging.info(f"Started. Developed by {MADE_BY}")
+    logging.info(f"Started. Developed by {MADE_BY}")
 
 
 # ─── Session ──────────────────────────────────────────────────
-session = requests.Session()
-session.headers.update({
-    "User-Agent": USER_AGENT,
-    "Accept": "text/html,application/xhtml+xml; q=0.9,image/avif,image/webp,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Connection": "keep-alive",
-    "Upgrade-Insecure-Requests": "1",
-})
+# Created on first use (get_session), not at import
+session: requests.Session | None = None
+
+
+def get_session() -> requests.Session:
+    global session
+    if session is None:
+        session = requests.Session()
+        session.headers.update({
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml; q=0.9,image/avif,image/webp,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Connection": "keep-alive",
+            "Upgrade-Insecure-Requests": "1",
+        })
+    return session
+
+
+# Optional conditional-request cache (enable with --cache)
+cache: ResponseCache | None = None
+
+# Optional per-host stage timings (enable with --metrics FILE)
+metrics: Metrics | None = None
+
+# Content-addressed page store under OUTPUT_DIR (blobs/ + index.jsonl), opened on first save
+store: BlobStore | None = None
+
+# Near-duplicate / crawl-trap detection, created in main() (disable with --no-dedup)
+traps: TrapDetector | None = None
 
 
 # Optional auth (most sites → don't use)
 # SCRAPE_USER  = os.getenv("SCRAPE_USER")
 # SCRAPE_PASS  = os.getenv("SCRAPE_PASS")
 # if SCRAPE_USER and SCRAPE_PASS:
-#     session.auth = requests.auth.HTTPBasicAuth(SCRAPE_USER, SCRAPE_PASS)
+#     get_session().auth = requests.auth.HTTPBasicAuth(SCRAPE_USER, SCRAPE_PASS)
 #     logging.info("Basic auth configured")
 
 
@@ -107,37 +155,44 @@ def print_banner():
           f"{Colors.END}\n")
 
 
-def allowed_by_robots(base_url: str) -> bool:
-    print(f"{Colors.BLUE}🤖 Checking robots.txt...{Colors.END}")
-    try:
-        r = session.get(urljoin(base_url, "/robots.txt"), timeout=10)
-        if r.status_code != 200:
-            logging.warning(f"robots.txt not found ({r.status_code}) → continuing anyway")
-            return True
-        # Very naive check – real parser is better but overkill here
-        if "Disallow: /" in r.text:
-            logging.error("robots.txt says Disallow: / → aborting")
-            return False
-        return True
-    except Exception as e:
-        logging.warning(f"robots.txt check failed: {e} → continuing")
+def fetch_robots(url: str) -> tuple[int, str]:
+    r = get_session().get(url, timeout=10)
+    return r.status_code, r.text
+
+
+# Parsed robots.txt per origin (rules for SCRIPT_NAME, else '*'), shared by all workers
+robots = RobotsCache(fetch_robots, SCRIPT_NAME)
+
+
+def allowed_by_robots(url: str) -> bool:
+    if robots.allowed(url):
         return True
+    logging.warning(f"🤖 robots.txt disallows {url} → skipped")
+    return False
 
 
-def fetch(url: str) -> str | None:
+def fetch(url: str) -> requests.Response | None:
+    """GET url (streamed): returns the response once its headers are in, body unread."""
     print(f"{Colors.GREEN}📥 Fetching: {Colors.BOLD}{url}{Colors.END}")
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            r = session.get(url, timeout=20, allow_redirects=True)
+            if metrics:
+                host = urlparse(url).netloc
+                with metrics.labelled(host):
+                    r = requests_get(get_session(), url, cache, timeout=20, allow_redirects=True, stream=True)
+                metrics.observe(host, "ttfb", r.elapsed.total_seconds())
+            else:
+                r = requests_get(get_session(), url, cache, timeout=20, allow_redirects=True, stream=True)
             if r.status_code in (401, 403, 429):
                 logging.error(f"❌ {r.status_code} – access denied / rate limit")
+                r.close()
                 return None
             if r.status_code >= 400:
                 logging.error(f"❌ Client error {r.status_code}")
+                r.close()
                 return None
             r.raise_for_status()
-            print(f"{Colors.GREEN}✅ OK ({len(r.text):,} bytes){Colors.END}")
-            return r.text
+            return r
         except requests.RequestException as e:
             msg = str(e)[:60] + "…" if len(str(e)) > 60 else str(e)
             if attempt < MAX_RETRIES:
@@ -148,97 +203,693 @@ def fetch(url: str) -> str | None:
                 return None
 
 
-def save_html(url: str, html: str) -> bool:
-    parsed = urlparse(url)
-    path = (parsed.path.strip("/") or "index").replace("/", "_").replace("?", "_").replace("=", "_")
-    path = path[:80]                           # prevent too long names
-    if not path.endswith(".html"):
-        path += ".html"
-
-    outpath = os.path.join(OUTPUT_DIR, path)
-    header = f"<!-- Scraped by {MADE_BY} v{SCRIPT_VERSION} from {url} -->\n"
+def get_store() -> BlobStore:
+    global store
+    if store is None:
+        store = BlobStore(OUTPUT_DIR)
+    return store
+
+
+def save_page(url: str, r: requests.Response, sink: list | None = None) -> tuple[dict | None, PageLinks, int | None]:
+    """
+    Stream the response body into the blob store (hashed, compressed,
+    deduplicated) and, for HTML, through the link extractor and the
+    SimHash fingerprinter at the same time – the page is never held in
+    memory as a whole.
+    With a `sink`, HTML chunks are appended to it instead of being parsed
+    here (the caller parses elsewhere, e.g. in a process pool).
+    Returns (index record or None on failure, links of the page, SimHash or None).
+    """
+    host = urlparse(url).netloc
+    extractor = hasher = None
+    is_html = "html" in r.headers.get("Content-Type", "text/html")
+    if is_html and sink is None:
+        extractor = LinkExtractor(r.url or url)
+        hasher = SimHasher() if traps else None
+        try:
+            decoder = codecs.getincrementaldecoder(r.encoding or "utf-8")(errors="replace")
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    page_store = get_store()
+    writer = page_store.writer()
+    start = time.perf_counter()
+    parse_time = 0.0
+    try:
+        for chunk in r.iter_content(STREAM_CHUNK):
+            writer.write(chunk)
+            if is_html and sink is not None:
+                sink.append(chunk)
+            elif extractor:
+                t = time.perf_counter() if metrics else 0.0
+                text = decoder.decode(chunk)
+                extractor.feed(text)
+                if hasher:
+                    hasher.feed(text)
+                if metrics:
+                    parse_time += time.perf_counter() - t
+        if extractor:
+            text = decoder.decode(b"", final=True)
+            extractor.feed(text)
+            extractor.close()
+            if hasher:
+                hasher.feed(text)
+    except (requests.RequestException, OSError) as e:
+        writer.abort()
+        logging.error(f"Download failed: {e}")
+        return None, NO_LINKS, None
+    finally:
+        r.close()
+        if metrics:
+            metrics.observe(host, "body", time.perf_counter() - start - parse_time)
+            if extractor:
+                metrics.observe(host, "parse", parse_time)
 
     try:
-        with open(outpath, "w", encoding="utf-8") as f:
-            f.write(header)
-            f.write(html)
-        print(f"{Colors.GREEN}💾 Saved → {Colors.BOLD}{outpath}{Colors.END}")
-        return True
-    except Exception as e:
+        if metrics:
+            with metrics.timer(host, "save"):
+                rec = page_store.commit(writer, url, type=r.headers.get("Content-Type"))
+        else:
+            rec = page_store.commit(writer, url, type=r.headers.get("Content-Type"))
+    except OSError as e:
+        writer.abort()
         logging.error(f"Save failed: {e}")
-        return False
+        return None, NO_LINKS, None
 
+    print(f"{Colors.GREEN}💾 Saved {rec['size']:,} bytes → {Colors.BOLD}{rec['sha256'][:12]}{Colors.END}")
+    if not extractor:
+        return rec, NO_LINKS, None
+    page = extractor.result()
+    print(f"{Colors.BLUE}🔗 Found {len(page.links)} internal link(s)"
+          f"{f' ({page.skipped} nofollow)' if page.skipped else ''}{Colors.END}")
+    return rec, page, hasher and hasher.digest()
 
-def extract_links(base_url: str, html: str) -> set[str]:
-    try:
-        soup = BeautifulSoup(html, "html.parser")           # safe & works without lxml
-        links = set()
-        for a in soup.find_all("a", href=True):
-            href = a["href"].strip()
-            if href.startswith(("mailto:", "tel:", "javascript:", "#")):
-                continue
-            full = urljoin(base_url, href)
-            if urlparse(full).netloc == urlparse(base_url).netloc:
-                links.add(full.split("#")[0])
-        print(f"{Colors.BLUE}🔗 Found {len(links)} internal link(s){Colors.END}")
-        return links
-    except Exception as e:
-        logging.error(f"Link extraction crashed: {e}")
-        return set()
 
+def note_page(url: str, fingerprint: int | None) -> bool:
+    """Feed a saved page to the trap detector; True if it is a near-duplicate."""
+    if not traps:
+        return False
+    known = len(traps.traps())
+    duplicate = traps.observe(url, fingerprint)
+    if duplicate:
+        print(f"{Colors.YELLOW}♻ Near-duplicate of an earlier page – its links go to the back{Colors.END}")
+    for cluster in traps.traps()[known:]:
+        print(f"{Colors.RED}🕳 Crawl trap → {cluster} (keeps repeating content) – dropping its URLs{Colors.END}")
+    return duplicate
+
+
+# ─── Frontier ────────────────────────────────────────────────
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Dedup key for a URL: lower-case scheme/host, default port dropped,
+    no trailing slash (except root), sorted query params, no fragment.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class Frontier:
+    """
+    FIFO crawl frontier with O(1) enqueue/dequeue and O(1) dedup.
+    The seen-set holds 12-byte digests of canonical URLs, so equivalent
+    URLs are only queued once. Past `memory_budget` queued URLs, new
+    entries go to a temp file and are paged back in FIFO order.
+    URLs added with low=True (suspected crawl traps) wait in a second
+    FIFO that is only served once the main queue is empty.
+    """
+
+    def __init__(self, memory_budget: int = FRONTIER_MEMORY):
+        self.memory_budget = memory_budget
+        self._queue: deque[str] = deque()
+        self._low: deque[str] = deque()
+        self._seen: set[bytes] = set()
+        self._spill = None          # temp file, only created when needed
+        self._spilled = 0           # URLs in the spill file not yet read back
+
+    @staticmethod
+    def _key(url: str) -> bytes:
+        return hashlib.blake2b(canonicalize_url(url).encode(), digest_size=12).digest()
+
+    def __len__(self) -> int:
+        return len(self._queue) + self._spilled + len(self._low)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    @property
+    def deferred(self) -> int:
+        """Queued URLs in the low-priority lane (included in len())."""
+        return len(self._low)
+
+    def __contains__(self, url: str) -> bool:
+        return self._key(url) in self._seen
+
+    def mark(self, url: str) -> bool:
+        """Record `url` as seen without queueing it; False if already seen."""
+        key = self._key(url)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        return True
 
-def main():
-    termux_setup()
-    print_banner()
+    def add(self, url: str, low: bool = False) -> bool:
+        if not self.mark(url):
+            return False
+        self.push(url, low)
+        return True
 
-    if not allowed_by_robots(BASE_URL):
-        print(f"{Colors.RED}Aborting – robots.txt blocks us.{Colors.END}")
-        return
+    def push(self, url: str, low: bool = False):
+        """Queue `url` (already marked seen)."""
+        if low:
+            self._low.append(url)
+        elif self._spilled or len(self._queue) >= self.memory_budget:
+            if self._spill is None:
+                self._spill = tempfile.TemporaryFile("w+", encoding="utf-8")
+                self._read_pos = 0
+            self._spill.seek(0, os.SEEK_END)
+            self._spill.write(url + "\n")
+            self._spilled += 1
+        else:
+            self._queue.append(url)
+
+    def pop(self) -> str:
+        if not self._queue and self._spilled:
+            self._refill()
+        return self._queue.popleft() if self._queue else self._low.popleft()
+
+    def _refill(self):
+        self._spill.seek(self._read_pos)
+        while self._spilled and len(self._queue) < self.memory_budget:
+            self._queue.append(self._spill.readline().rstrip("\n"))
+            self._spilled -= 1
+        self._read_pos = self._spill.tell()
+        if not self._spilled:                  # drained → start the file over
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._read_pos = 0
+
+
+# ─── Checkpoint journal ──────────────────────────────────────
+class CrawlJournal:
+    """
+    Append-only crawl log, one JSON line per event:
+      {"op": "queue", "url": ...}                       URL entered the frontier
+      {"op": "done",  "url": ..., "ok": ..., "ts": ...}  URL fetched (+ metadata)
+    With resume=True the existing log is replayed first: every URL ever
+    queued counts as seen, and queued-but-not-done URLs are crawled again.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_FILE, resume: bool = False):
+        self.path = path
+        self.meta: dict[str, dict] = {}     # canonical URL → last "done" record
+        self.pending: list[str] = []
+        if resume and os.path.exists(path):
+            self._replay()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._fh = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def _replay(self):
+        queued: dict[str, str] = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue                    # torn last line after a crash
+                key = canonicalize_url(rec["url"])
+                if rec["op"] == "queue":
+                    queued.setdefault(key, rec["url"])
+                elif rec["op"] == "done":
+                    self.meta[key] = rec
+        self.pending = [url for key, url in queued.items() if key not in self.meta]
+        logging.info(f"Resuming: {self.pages_done} page(s) done, {len(self.pending)} pending")
+
+    @property
+    def pages_done(self) -> int:
+        return sum(1 for rec in self.meta.values() if rec.get("ok"))
+
+    def restore(self, frontier: "Frontier") -> list[str]:
+        """Mark everything already fetched as seen; returns URLs still to crawl."""
+        for rec in self.meta.values():
+            frontier.mark(rec["url"])
+        return self.pending
+
+    def queued(self, url: str):
+        self._write({"op": "queue", "url": url})
+
+    def done(self, url: str, ok: bool, **meta):
+        rec = {"op": "done", "url": url, "ok": ok, "ts": round(time.time(), 3), **meta}
+        self.meta[canonicalize_url(url)] = rec
+        self._write(rec)
+
+    def _write(self, rec: dict):
+        self._fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+# ─── Sitemap seeding ─────────────────────────────────────────
+def fetch_sitemap(url: str):
+    """Body chunks of a sitemap as they download (None if it could not be fetched)."""
+    r = fetch(url)
+    if r is None:
+        return None
+
+    def chunks():
+        try:
+            yield from r.iter_content(STREAM_CHUNK)
+        finally:
+            r.close()
+    return chunks()
+
+
+def sitemap_seeds(seeds: list[str], max_pages: int) -> tuple[list[str], list[str]]:
+    """
+    Read the sitemaps of every seed's site (robots.txt Sitemap lines, else
+    /sitemap.xml) and compare each <lastmod> with the time the page was
+    last saved. Returns (URLs to fetch: new or changed, saved URLs to
+    leave alone: listed with a <lastmod> no newer than their save).
+    Pages without <lastmod>, or saved but not listed, cannot be proven
+    unchanged and are fetched again when the crawl reaches them (a 304
+    with --cache). Stops reading once
+    `max_pages` URLs are due. Without any sitemap the seeds are returned
+    and nothing is skipped (plain crawl).
+    """
+    saved = {canonicalize_url(url): (url, ts) for url, ts in get_store().last_saved().items()}
+    reader = SitemapReader(fetch_sitemap)
+    due, due_keys, keep = [], set(), []
+    for origin in dict.fromkeys(f"{urlsplit(seed).scheme}://{urlsplit(seed).netloc}" for seed in seeds):
+        host = urlsplit(origin).netloc
+        roots = robots.sitemaps(origin) or [origin + "/sitemap.xml"]
+        print(f"{Colors.BLUE}🗺  Sitemaps → {', '.join(roots)}{Colors.END}")
+        for entry in reader.urls(roots):
+            if len(due) >= max_pages:
+                break
+            key = canonicalize_url(entry.loc)
+            if urlsplit(entry.loc).netloc != host or key in due_keys or not robots.allowed(entry.loc):
+                continue
+            previous = saved.get(key)
+            if previous and entry.lastmod is not None and entry.lastmod <= previous[1]:
+                keep.append(previous[0])
+                continue
+            due.append(entry.loc)
+            due_keys.add(key)
+    if not reader.listed:
+        logging.warning("No sitemap found – crawling from the start URL(s) instead")
+        return seeds, []
+    print(f"{Colors.BLUE}sitemap: {reader.sitemaps} sitemap(s), {reader.listed} URL(s) listed, "
+          f"{len(due)} new/changed, {len(keep)} unchanged since last save{Colors.END}")
+    return due, keep
+
+
+# ─── Async crawl engine ──────────────────────────────────────
+class HostScheduler:
+    """
+    Per-host politeness scheduler.
+    Every host gets its own queue and token bucket (1 token per `delay`
+    seconds, up to `burst`), so pages on different origins are fetched
+    in parallel while each origin still sees the configured spacing.
+    URLs put with low=True are served after the host's other URLs; queued
+    URLs that `skip` rejects when their turn comes are dropped without
+    spending a token.
+    """
+
+    def __init__(self, delay: float = RATE_DELAY, burst: int = 1, skip=None):
+        self.delay = delay
+        self.burst = burst
+        self.skip = skip
+        self._delays: dict[str, float] = {}                  # host → own delay (robots Crawl-delay)
+        self._queues: dict[str, tuple[deque, deque]] = {}    # host → (queue, low-priority queue)
+        self._buckets: dict[str, tuple[float, float]] = {}   # host → (tokens, stamp)
+        self._heap: list[tuple[float, str]] = []             # (ready_at, host)
+        self._active = 0
+        self._cond = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return sum(len(q) + len(low) for q, low in self._queues.values())
+
+    @property
+    def deferred(self) -> int:
+        """Queued low-priority URLs (included in len())."""
+        return sum(len(low) for _, low in self._queues.values())
+
+    def set_delay(self, host: str, delay: float):
+        """Use `delay` instead of the default spacing for `host`."""
+        self._delays[host] = delay
+
+    def _tokens(self, host: str, now: float) -> float:
+        tokens, stamp = self._buckets.get(host, (self.burst, now))
+        delay = self._delays.get(host, self.delay)
+        if delay <= 0:
+            return self.burst
+        return min(self.burst, tokens + (now - stamp) / delay)
+
+    def _ready_at(self, host: str) -> float:
+        now = time.monotonic()
+        tokens = self._tokens(host, now)
+        return now if tokens >= 1 else now + (1 - tokens) * self._delays.get(host, self.delay)
+
+    async def put(self, url: str, low: bool = False):
+        host = urlparse(url).netloc
+        async with self._cond:
+            queues = self._queues.get(host)
+            if queues is None:
+                queues = self._queues[host] = (deque(), deque())
+                heapq.heappush(self._heap, (self._ready_at(host), host))
+            queues[low].append(url)
+            self._cond.notify_all()
+
+    def _next(self, q: deque, low: deque) -> str | None:
+        while q or low:
+            url = (q or low).popleft()
+            if not (self.skip and self.skip(url)):
+                return url
+        return None
+
+    async def get(self) -> str | None:
+        """Next URL whose host has a token; None once the crawl has drained."""
+        async with self._cond:
+            while True:
+                timeout = None
+                if self._heap:
+                    ready_at, host = self._heap[0]
+                    now = time.monotonic()
+                    if ready_at <= now:
+                        heapq.heappop(self._heap)
+                        q, low = self._queues[host]
+                        url = self._next(q, low)
+                        if url is None:                 # everything left for the host was skipped
+                            del self._queues[host]
+                            continue
+                        self._buckets[host] = (self._tokens(host, now) - 1, now)
+                        if q or low:
+                            heapq.heappush(self._heap, (self._ready_at(host), host))
+                        else:
+                            del self._queues[host]
+                        self._active += 1
+                        return url
+                    timeout = ready_at - now
+                elif not self._active:
+                    return None
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def task_done(self):
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+
+async def crawl_async(seeds: list[str], max_pages: int = MAX_PAGES,
+                      delay: float = RATE_DELAY, concurrency: int = CONCURRENCY,
+                      journal: CrawlJournal | None = None, parse_workers: int = 0,
+                      seen: list[str] = ()) -> int:
+    """
+    Run `concurrency` fetches at once. fetch/save_page are blocking
+    (requests), so they run on a thread pool of the same size.
+    With parse_workers > 0 link extraction moves to that many processes
+    (bounded queue: fetchers wait when parsing falls behind).
+    Links are followed within the host of the page they were found on;
+    URLs in `seen` (e.g. unchanged sitemap pages) are never fetched.
+    """
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    adapter = HTTPAdapter(pool_maxsize=concurrency)
+    session = get_session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if metrics:
+        instrument_session(session, metrics)
+
+    scheduler = HostScheduler(delay, skip=traps and traps.skip)
+    frontier = Frontier()
+    for url in seen:
+        frontier.mark(url)
+    paced: set[str] = set()
+
+    async def admit(url: str) -> bool:
+        """robots.txt check – a host's first URL fetches its file off the loop and applies its Crawl-delay."""
+        if not robots.cached(url):
+            await loop.run_in_executor(pool, robots.get, url)
+        host = urlparse(url).netloc
+        if host not in paced:
+            paced.add(host)
+            crawl_delay = robots.crawl_delay(url)
+            if crawl_delay and crawl_delay > delay:
+                scheduler.set_delay(host, crawl_delay)
+        return robots.allowed(url)
 
-    to_visit = [BASE_URL]
-    visited = set()
     count = 0
-    start = time.time()
+    if journal:
+        count = journal.pages_done
+        for url in journal.restore(frontier):
+            if frontier.mark(url) and await admit(url):
+                await scheduler.put(url)
+    for url in seeds:
+        if frontier.mark(url) and await admit(url):
+            if journal:
+                journal.queued(url)
+            await scheduler.put(url)
+
+    async def worker():
+        nonlocal count
+        while count < max_pages:
+            url = await scheduler.get()
+            if url is None:
+                return
+            try:
+                r = await loop.run_in_executor(pool, fetch, url)
+                if r is None or count >= max_pages:
+                    if r is None and journal:
+                        journal.done(url, ok=False)
+                    elif r is not None:
+                        r.close()
+                    continue
+                count += 1                      # reserve the page before yielding, so workers can't overshoot
+                sink = [] if pipeline else None
+                rec, page, fingerprint = await loop.run_in_executor(pool, save_page, url, r, sink)
+                if sink:
+                    start = time.perf_counter()
+                    page, fingerprint = await pipeline.run(parse_page, r.url or url, b"".join(sink),
+                                                           r.encoding, bool(traps))
+                    if metrics:
+                        metrics.observe(urlparse(url).netloc, "parse", time.perf_counter() - start)
+                if journal:
+                    journal.done(url, ok=rec is not None, bytes=rec and rec["size"], blob=rec and rec["sha256"])
+                if rec is None:
+                    count -= 1
+                    continue
+
+                if page.canonical:
+                    frontier.mark(page.canonical)   # same document under its preferred URL
+                duplicate = note_page(url, fingerprint)
+                new_links = 0
+                for link in page.links:
+                    if count + len(scheduler) - scheduler.deferred < max_pages and frontier.mark(link) and await admit(link):
+                        route = traps.route(link, duplicate) if traps else None
+                        if route == DROP:
+                            continue
+                        if journal:
+                            journal.queued(link)
+                        await scheduler.put(link, low=route == DEFER)
+                        new_links += 1
 
-    print(f"{Colors.BLUE}🎯 Target → {BASE_URL}{Colors.END}")
-    print(f"{Colors.YELLOW}Limits → {MAX_PAGES} pages max | {RATE_DELAY}s delay{Colors.END}\n")
+                print(f"{Colors.BLUE}Progress → {count}/{max_pages} | Queue: {len(scheduler)} | New: {new_links}{Colors.END}")
+            finally:
+                await scheduler.task_done()
 
-    while to_visit and count < MAX_PAGES:
-        url = to_visit.pop(0)
-        if url in visited:
+    pipeline = ParsePipeline(parse_workers) if parse_workers else None
+    try:
+        if pipeline:
+            async with pipeline:
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+            print(f"{Colors.BLUE}{pipeline.summary()}{Colors.END}")
+        else:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return count
+
+
+def crawl(base_url: str, max_pages: int = MAX_PAGES, delay: float = RATE_DELAY,
+          journal: CrawlJournal | None = None, more_seeds: list[str] = (), seen: list[str] = ()) -> int:
+    to_visit = Frontier()
+    for url in seen:
+        to_visit.mark(url)
+    count = 0
+    if journal:
+        count = journal.pages_done
+        for url in journal.restore(to_visit):
+            if robots.allowed(url):
+                to_visit.add(url)
+    for url in (base_url, *more_seeds):
+        if to_visit.add(url) and journal:
+            journal.queued(url)
+
+    print(f"{Colors.BLUE}🎯 Target → {base_url}{f' (+{len(more_seeds)} more)' if more_seeds else ''}{Colors.END}")
+    print(f"{Colors.YELLOW}Limits → {max_pages} pages max | {delay}s delay{Colors.END}\n")
+
+    while to_visit and count < max_pages:
+        url = to_visit.pop()
+        if traps and traps.skip(url):           # its pattern turned out to be a trap after it was queued
             continue
-
-        html = fetch(url)
-        if not html:
-            visited.add(url)
+        r = fetch(url)
+        if r is None:
+            if journal:
+                journal.done(url, ok=False)
             continue
 
-        if save_html(url, html):
-            visited.add(url)
+        rec, page, fingerprint = save_page(url, r)
+        if journal:
+            journal.done(url, ok=rec is not None, bytes=rec and rec["size"], blob=rec and rec["sha256"])
+        if rec is not None:
             count += 1
 
+            if page.canonical:
+                to_visit.mark(page.canonical)
+            duplicate = note_page(url, fingerprint)
             new_links = 0
-            for link in extract_links(BASE_URL, html):
-                if link not in visited and link not in to_visit:
-                    if count + len(to_visit) < MAX_PAGES:
-                        to_visit.append(link)
-                        new_links += 1
-
-            print(f"{Colors.BLUE}Progress → {count}/{MAX_PAGES} | Queue: {len(to_visit)} | New: {new_links}{Colors.END}")
+            for link in page.links:
+                if count + len(to_visit) - to_visit.deferred < max_pages and robots.allowed(link) and to_visit.mark(link):
+                    route = traps.route(link, duplicate) if traps else None
+                    if route == DROP:
+                        continue
+                    to_visit.push(link, low=route == DEFER)
+                    if journal:
+                        journal.queued(link)
+                    new_links += 1
+
+            print(f"{Colors.BLUE}Progress → {count}/{max_pages} | Queue: {len(to_visit)} | New: {new_links}{Colors.END}")
 
         if to_visit:
-            print(f"{Colors.YELLOW}Waiting {RATE_DELAY}s …{Colors.END}")
-            time.sleep(RATE_DELAY)
+            wait = max(delay, robots.crawl_delay(url) or 0)      # robots.txt may ask for more
+            print(f"{Colors.YELLOW}Waiting {wait}s …{Colors.END}")
+            time.sleep(wait)
+
+    return count
+
+
+def main(seeds: list[str] | None = None, max_pages: int = MAX_PAGES,
+         delay: float = RATE_DELAY, use_async: bool = False,
+         concurrency: int = CONCURRENCY, checkpoint: str | None = None,
+         resume: bool = False, metrics_file: str | None = None, parse_workers: int = 0,
+         use_sitemap: bool = False, dedup: bool = True):
+    global traps
+    termux_setup()
+    print_banner()
+    if metrics:
+        instrument_session(get_session(), metrics)
+    if dedup and traps is None:
+        traps = TrapDetector()
+
+    print(f"{Colors.BLUE}🤖 Checking robots.txt...{Colors.END}")
+    seeds = [seed for seed in (seeds or [BASE_URL]) if allowed_by_robots(seed)]
+    if not seeds:
+        print(f"{Colors.RED}Aborting – robots.txt blocks every start URL.{Colors.END}")
+        return
+    for seed in seeds:
+        if robots.crawl_delay(seed):
+            print(f"{Colors.YELLOW}robots.txt asks {urlparse(seed).netloc} for a {robots.crawl_delay(seed)}s crawl delay{Colors.END}")
+    seen = []
+    if use_sitemap:
+        seeds, seen = sitemap_seeds(seeds, max_pages)
+        if not seeds:
+            print(f"{Colors.GREEN}Nothing changed since the last crawl.{Colors.END}")
+            return
+
+    journal = None
+    if checkpoint or resume:
+        journal = CrawlJournal(checkpoint or CHECKPOINT_FILE, resume=resume)
+
+    start = time.time()
+    try:
+        if use_async:
+            more = f" (+{len(seeds) - 3} more)" if len(seeds) > 3 else ""
+            print(f"{Colors.BLUE}🎯 Targets → {', '.join(seeds[:3])}{more}{Colors.END}")
+            print(f"{Colors.YELLOW}Limits → {max_pages} pages max | {delay}s delay per host | {concurrency} parallel{Colors.END}\n")
+            count = asyncio.run(crawl_async(seeds, max_pages, delay, concurrency, journal, parse_workers, seen))
+        else:
+            count = crawl(seeds[0], max_pages, delay, journal, seeds[1:], seen)
+    finally:
+        if journal:
+            journal.close()
+        if cache:
+            print(f"{Colors.BLUE}{cache.summary()}{Colors.END}")
+            cache.close()
+        print(f"{Colors.BLUE}{robots.summary()}{Colors.END}")
+        if traps:
+            print(f"{Colors.BLUE}{traps.summary()}{Colors.END}")
+        if store:
+            print(f"{Colors.BLUE}{store.summary()}{Colors.END}")
+            store.close()
+        if metrics:
+            print(f"{Colors.BLUE}{metrics.table()}{Colors.END}")
+            if metrics_file:
+                metrics.dump(metrics_file)
 
     elapsed = time.time() - start
     print(f"\n{Colors.GREEN}{Colors.BOLD}🎉 FINISHED !{Colors.END}")
     print(f"Scraped {count} page(s) in {elapsed:.1f} s")
-    print(f"Files → {Colors.BLUE}{OUTPUT_DIR}/{Colors.END}\n")
+    print(f"Pages → {Colors.BLUE}{os.path.join(OUTPUT_DIR, 'index.jsonl')}{Colors.END} "
+          f"(read one back: python kArmas_blobstore.py {OUTPUT_DIR} URL)\n")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"{SCRIPT_NAME} v{SCRIPT_VERSION}")
+    parser.add_argument("seeds", nargs="*", metavar="URL", help=f"Start URL(s) (default {BASE_URL})")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Concurrent crawl – delay is enforced per host instead of globally")
+    parser.add_argument("-c", "--concurrency", type=int, default=CONCURRENCY, help=f"Parallel fetches in --async mode (default {CONCURRENCY})")
+    parser.add_argument("--delay", type=float, default=RATE_DELAY, help=f"Seconds between requests to the same host (default {RATE_DELAY})")
+    parser.add_argument("--max-pages", type=int, default=MAX_PAGES, help=f"Page budget (default {MAX_PAGES})")
+    parser.add_argument("--checkpoint", metavar="FILE", help=f"Journal frontier/visited state to FILE (e.g. {CHECKPOINT_FILE})")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Continue the crawl recorded in the checkpoint journal (default {CHECKPOINT_FILE})")
+    parser.add_argument("--cache", action="store_true", help="Reuse cached pages, revalidating with ETag/Last-Modified")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE, help=f"Cache database (default {DEFAULT_CACHE})")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL, help=f"Seconds before a cached page is revalidated (default {DEFAULT_TTL})")
+    parser.add_argument("--metrics", metavar="FILE", help="Time connect/TLS/TTFB/body/parse/save per host; print a summary and write FILE (.prom = Prometheus text, else JSON)")
+    parser.add_argument("--parse-workers", type=int, default=0, metavar="N",
+                        help="--async only: extract links in N worker processes (default 0 = inline while streaming)")
+    parser.add_argument("--sitemap", action="store_true",
+                        help="Seed from the sites' sitemaps and only fetch pages new or changed (<lastmod>) since they were last saved")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Don't fingerprint pages or learn crawl traps (near-duplicate URL patterns are fetched like any other)")
+    parser.add_argument("--compress", choices=list(SUFFIXES), default=DEFAULT_COMPRESS,
+                        help=f"Compression for stored pages (default {DEFAULT_COMPRESS}; zstd needs the zstandard package)")
+    args = parser.parse_args()
+    setup_logging()
+    try:
+        store = BlobStore(OUTPUT_DIR, args.compress)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.cache:
+        cache = ResponseCache(args.cache_path, ttl=args.cache_ttl)
+    if args.metrics:
+        metrics = Metrics()
+
     try:
-        main()
+        main(args.seeds, max_pages=args.max_pages, delay=args.delay,
+             use_async=args.use_async, concurrency=args.concurrency,
+             checkpoint=args.checkpoint, resume=args.resume, metrics_file=args.metrics,
+             parse_workers=args.parse_workers, use_sitemap=args.sitemap, dedup=not args.no_dedup)
     except KeyboardInterrupt:
         print(f"\n{Colors.RED}⏹ Stopped by user{Colors.END}")
         sys.exit(0)